@@ -3,15 +3,16 @@
 import streamlit as st
 import tempfile
 import os
-from collections import defaultdict
 from warehouse_sim import config
 from warehouse_sim.core.environment import Environment
-from warehouse_sim.core.reservation import ReservationTable
 from warehouse_sim.core.task import TaskManager
-from warehouse_sim.core.strategies import get_planner
-from warehouse_sim.agents.robot import Robot
-from warehouse_sim.sim.visualizer import animate
+from warehouse_sim.core.strategies import get_heuristic, get_planner, get_reservation_table
+from warehouse_sim.agents.robot import spawn_robots
+from warehouse_sim.utils.logger import setup_global_logging
+from warehouse_sim.sim.trajectory import Trajectory, TrajectoryRecorder
+from warehouse_sim.sim.visualizer import export
 from warehouse_sim.core.conflict_resolver import ConflictResolver
+from warehouse_sim.core.planner.incremental import REPLAN_MODES
 
 st.set_page_config(page_title="WarehouseSim UI", layout="wide")
 st.title("🏭 WarehouseSim Interactive Simulation")
@@ -20,70 +21,65 @@ st.title("🏭 WarehouseSim Interactive Simulation")
 st.sidebar.header("Simulation Settings")
 num_robots = st.sidebar.slider("Number of Robots", 1, 50, config.NUM_ROBOTS)
 goal_strategy = st.sidebar.selectbox("Goal Strategy", ["random", "spread", "high_density"])
-planner_strategy = st.sidebar.selectbox("Planner Strategy", ["astar"])
+task_assignment = st.sidebar.selectbox("Task Assignment", ["greedy", "batch"])
+planner_strategy = st.sidebar.selectbox("Planner Strategy", ["astar", "sipp", "hpa", "topology", "mstar", "cbs", "ecbs"])
+heuristic_kind = st.sidebar.selectbox("Planner Heuristic", ["manhattan", "distance_map"])
+replan_mode = st.sidebar.selectbox("Re-plan Mode (blocked robots)", list(REPLAN_MODES),
+                                   index=REPLAN_MODES.index(config.REPLAN_MODE))
 export_format = st.sidebar.selectbox("Export Format", ["gif", "mp4", "both"])
-world_version = st.sidebar.selectbox("World Logic", ["default", "two-phase"])
+world_version = st.sidebar.selectbox("World Logic", ["default", "two-phase", "vectorized"])
+rolling_horizon = st.sidebar.checkbox("Rolling-horizon reservations", value=False)
+reservation_kind = st.sidebar.selectbox("Reservation Table", ["dict", "dense"])
+window = st.sidebar.number_input("Planning Window (0 = full path)", min_value=0, value=0, step=1)
+render_workers = st.sidebar.number_input("Render Workers", min_value=1, value=1, step=1)
+layout_path = st.sidebar.text_input("Layout File (image, .csv or .npy; empty = random)", value="")
 run_sim = st.sidebar.button("Run Simulation")
 
 if run_sim:
     st.info("Initializing simulation...")
+    event_log = setup_global_logging()
 
-    env = Environment(config.WAREHOUSE_WIDTH, config.WAREHOUSE_HEIGHT, config.GRID_RESOLUTION)
-    env.place_shelves()
-    env.place_pallets(config.NUM_PALLETS)
-
-    reservation_table = ReservationTable()
-    planner = get_planner(planner_strategy, env.occupancy, reservation_table)
-    task_manager = TaskManager(env, strategy=goal_strategy)
+    if layout_path:
+        env = Environment.from_file(layout_path)
+    else:
+        env = Environment(config.WAREHOUSE_WIDTH, config.WAREHOUSE_HEIGHT, config.GRID_RESOLUTION)
+        env.place_shelves()
+        env.place_pallets(config.NUM_PALLETS)
+
+    reservation_table = get_reservation_table(
+        reservation_kind, env, rolling_horizon=rolling_horizon, window=int(window) or None
+    )
+    heuristic = get_heuristic(heuristic_kind, env.occupancy)
+    planner = get_planner(planner_strategy, env.occupancy, reservation_table, heuristic=heuristic)
+    task_manager = TaskManager(env, strategy=goal_strategy, assignment=task_assignment, distances=heuristic)
     conflict_resolver = ConflictResolver("replan")
 
-    robots = []
-    used_starts = set()
-    for i in range(num_robots):
-        for _ in range(1000):
-            start = task_manager.get_goal((0, 0))
-            if start not in used_starts:
-                used_starts.add(start)
-                break
-        end = task_manager.get_goal(start)
-        robot = Robot(i, start, end, planner)
-        robots.append(robot)
+    robots = spawn_robots(planner, task_manager, num_robots)
 
     # Dynamically select World class
     if world_version == "two-phase":
         from warehouse_sim.sim.world_two_phase import World
+    elif world_version == "vectorized":
+        from warehouse_sim.sim.world_vectorized import World
     else:
         from warehouse_sim.sim.world import World
 
-    world = World(env, planner, robots, conflict_resolver=conflict_resolver, task_manager=task_manager)
+    world = World(env, planner, robots, conflict_resolver=conflict_resolver, task_manager=task_manager,
+                  replan_interval=int(window) or None, replan_mode=replan_mode)
     st.info(f"🧪 Running world logic: `{world_version}`")
 
 
     st.info("Running simulation...")
-    all_frames = []
-    overlap_logs = []
-
-    for _ in range(config.ANIMATION_MAX_STEPS):
-        world.step(task_manager.get_goal, task_manager.release_goal)
-        frame_snapshot = []
-        seen_positions = defaultdict(list)
-
-        for robot in robots:
-            pos = robot.current_position()
-            frame_snapshot.append(pos)
-            seen_positions[pos].append(robot.id)
-
-        for pos, ids in seen_positions.items():
-            if len(ids) > 1:
-                msg = f"[OVERLAP] Frame {world.frame}: Robots {ids} at {pos}"
-                overlap_logs.append(msg)
-
-        all_frames.append(frame_snapshot)
-
     with tempfile.TemporaryDirectory() as tmpdir:
+        trajectory_path = os.path.join(tmpdir, "trajectory")
+        with TrajectoryRecorder(trajectory_path, [robot.id for robot in robots]) as recorder:
+            for _ in range(config.ANIMATION_MAX_STEPS):
+                world.step(task_manager.get_goal, task_manager.release_goal)
+                recorder.record(world.positions(), world.states())
+
         gif_path = os.path.join(tmpdir, "output.gif")
         mp4_path = os.path.join(tmpdir, "output.mp4") if export_format in ("mp4", "both") else None
-        animate(world, all_frames, gif_path, filename_mov=mp4_path)
+        export(env, Trajectory(trajectory_path), gif_path, filename_mov=mp4_path, workers=int(render_workers))
 
         st.success("Simulation complete!")
         st.image(gif_path, caption="Simulation Result", use_container_width=True)
@@ -93,11 +89,14 @@ if run_sim:
                 st.download_button("Download MP4", f, file_name="warehouse_sim_output.mp4", mime="video/mp4")
 
     st.json(world.get_summary())
+    st.json(heuristic.stats())
+    st.json(event_log.counters())
 
-    if overlap_logs:
+    if world.validator.size:
         st.sidebar.markdown("---")
-        st.sidebar.subheader("📄 Overlap Log")
-        st.sidebar.text_area("Recent Overlaps", value="\n".join(overlap_logs[-50:]), height=200)
+        st.sidebar.subheader("📄 Violation Log")
+        st.sidebar.text_area("Recent Violations (vertex / swap / teleport)",
+                             value="\n".join(world.validator.describe(limit=50)), height=200)
     else:
         st.sidebar.markdown("---")
-        st.sidebar.success("✅ No overlaps detected!")
+        st.sidebar.success("✅ No overlaps, swaps or teleports detected!")
@@ -4,44 +4,70 @@ Robot agent class encapsulating position, path, and task logic.
 """
 
 from enum import Enum, auto
+from warehouse_sim.utils.logger import event_log
 
 class RobotState(Enum):
     IDLE = auto()
     MOVING = auto()
     WAITING = auto()
 
+# Compact codes used by recorded trajectories (the vectorized world's IDLE/MOVING match)
+STATE_CODES = {RobotState.IDLE: 0, RobotState.MOVING: 1, RobotState.WAITING: 2}
+
 class Robot:
-    def __init__(self, robot_id, start, end, planner):
+    def __init__(self, robot_id, start, end, planner, path=None):
+        """
+        Args:
+            path (list, optional): Path already planned and reserved for this
+                robot (e.g. by a batch planner). Planned here when omitted.
+        """
         self.id = robot_id
         self.start = start
         self.end = end
         self.planner = planner
-        self.path = self.planner.plan_and_reserve(start, end, robot_id=self.id) or []
+        if path is None:
+            planned = self.planner.plan_and_reserve(start, end, robot_id=self.id)
+        else:
+            planned = path
+        self.path = planned or [start]  # Stay put if the first goal is unreachable
         self.step_index = 0
-        self.state = RobotState.MOVING if self.path else RobotState.IDLE
+        self.state = RobotState.MOVING if planned else RobotState.IDLE
         self.completed_tasks = 0
-        self.waiting_for_reassignment = False
+        self.waiting_for_reassignment = not planned
 
     def current_position(self):
         if self.step_index < len(self.path):
             return self.path[self.step_index]
-        return self.end
+        return self.path[-1]
+
+    def update(self, frame, get_goal_fn, release_goal_fn, defer_reassign=False):
+        """
+        Advance along the path and, once it is exhausted, pick a new task.
 
-    def update(self, frame, get_goal_fn, release_goal_fn):
+        With ``defer_reassign`` the robot only flags that it needs a new task,
+        so the world can plan every such robot in one batch (see reassign_batch).
+        """
         if self.state == RobotState.MOVING:
             self.step_index += 1
             if self.step_index >= len(self.path):
                 self.state = RobotState.IDLE
                 self.waiting_for_reassignment = True
 
-        if self.state == RobotState.IDLE and self.waiting_for_reassignment:
+        if self.needs_reassignment() and not defer_reassign:
             release_goal_fn(self.end)
             self.reassign(get_goal_fn)
 
+    def needs_reassignment(self):
+        return self.state == RobotState.IDLE and self.waiting_for_reassignment
+
     def reassign(self, get_goal_fn):
         new_start = self.current_position()
         new_end = get_goal_fn(new_start)
         new_path = self.planner.plan_and_reserve(new_start, new_end, robot_id=self.id)
+        self.apply_plan(new_start, new_end, new_path)
+
+    def apply_plan(self, new_start, new_end, new_path):
+        """Adopt a freshly planned (and already reserved) trip."""
         if new_path:
             self.start = new_start
             self.end = new_end
@@ -50,6 +76,112 @@ class Robot:
             self.state = RobotState.MOVING
             self.waiting_for_reassignment = False
             self.completed_tasks += 1
+        else:
+            # Keep the failed goal so the next update releases it and retries.
+            self.end = new_end
+
+    def adopt_route(self, new_path):
+        """Swap in a re-planned route to the same goal (no task change)."""
+        self.path = new_path
+        self.step_index = 0
+
+    def log_event(self, code, frame, cell=None, to_cell=None, other=None):
+        """Record a structured event (see utils.logger for the codes)."""
+        event_log.record(frame, self.id, code, cell, to_cell, other)
+
+
+def spawn_robots(planner, task_manager, num_robots):
+    """
+    Create ``num_robots`` robots on distinct start cells and plan their first
+    trips as one batch, so joint planners can coordinate them.
+    """
+    starts, ends = [], []
+    used_starts = set()
+    for i in range(num_robots):
+        for _ in range(1000):
+            start = task_manager.get_goal((0, 0))
+            if start not in used_starts:
+                used_starts.add(start)
+                break
+        starts.append(start)
+        if not task_manager.batch:
+            ends.append(task_manager.get_goal(start))
+    if task_manager.batch:
+        ends = task_manager.get_goals(starts)  # First tasks matched to the fleet as a whole
+    requests = [(i, start, end) for i, (start, end) in enumerate(zip(starts, ends))]
+
+    paths = planner.plan_batch_and_reserve(requests)
+    return [
+        Robot(i, start, end, planner, path=paths.get(i) or [])
+        for i, start, end in requests
+    ]
+
+
+def reassign_batch(robots, planner, get_goal_fn, release_goal_fn, assign_fn=None):
+    """
+    Give every robot in ``robots`` a new goal and plan all of them with one
+    ``planner.plan_batch_and_reserve`` call, so joint planners (CBS, M*) can
+    coordinate robots that become free in the same frame.
+
+    With ``assign_fn`` (``TaskManager.get_goals``) the goals are chosen
+    together from the starts instead of one ``get_goal_fn`` call per robot.
+    """
+    if not robots:
+        return
+    for robot in robots:
+        release_goal_fn(robot.end)
+    starts = [robot.current_position() for robot in robots]
+    goals = assign_fn(starts) if assign_fn else [get_goal_fn(start) for start in starts]
+    requests = [(robot.id, start, goal) for robot, start, goal in zip(robots, starts, goals)]
+
+    paths = planner.plan_batch_and_reserve(requests)
+    for robot, (_, start, goal) in zip(robots, requests):
+        robot.apply_plan(start, goal, paths.get(robot.id))
+
+
+def replan_batch(robots, planner):
+    """
+    Re-plan ``robots`` from where they stand to their current goals, as done
+    every few frames in windowed (RHCR) mode. Their future reservations are
+    released first; a robot that cannot be re-planned re-commits the rest of
+    its old route.
+    """
+    if not robots:
+        return
+    table = planner.reservation_table
+    now = table.now
+    requests = []
+    for robot in robots:
+        table.release_robot(robot.id, now)
+        requests.append((robot.id, robot.current_position(), robot.end))
+
+    paths = planner.plan_batch_and_reserve(requests)
+    for robot in robots:
+        path = paths.get(robot.id)
+        if not path:
+            path = robot.path[robot.step_index:]
+            planner.reserve_plan(path, robot_id=robot.id, t0=now)
+        robot.adopt_route(path)
+
+
+def replan_blocked(planner, robot_id, start, goal, route, replanner=None, blocked=()):
+    """
+    Re-plan one robot the conflict resolver asked to REPLAN, keeping its goal.
+    Its future reservations are released first; if no path is found the rest
+    of its old ``route`` (starting at ``start``) is reserved again from now.
+
+    With ``replanner`` (an ``IncrementalReplanner``) the robot's kept search is
+    repaired around ``blocked`` instead of searching from scratch.
 
-    def log_event(self, tag, message):
-        print(f"[Robot {self.id}] [{tag}] {message}")
+    Returns:
+        list or None: The new path, or None when re-planning failed.
+    """
+    if replanner is not None:
+        return replanner.replan_and_reserve(robot_id, start, goal, blocked=blocked, route=route)
+    table = planner.reservation_table
+    now = table.now
+    table.release_robot(robot_id, now)
+    path = planner.plan_and_reserve(start, goal, robot_id=robot_id)
+    if not path and route:
+        planner.reserve_plan(route, robot_id=robot_id, t0=now)
+    return path
@@ -0,0 +1,70 @@
+## warehouse_sim/bench/common.py
+"""
+Shared fixtures for benchmarks: seeded layouts, query sampling and summaries.
+"""
+
+import random
+import statistics
+
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.core.environment import Environment
+
+
+def make_environment(seed=0, layout=None, writable=False):
+    """
+    Build the default random layout with a fixed seed, or load ``layout`` (a
+    layout file; ``writable`` lets benchmarks place objects on it).
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    if layout:
+        return Environment.from_file(layout, writable=writable)
+    env = Environment(config.WAREHOUSE_WIDTH, config.WAREHOUSE_HEIGHT, config.GRID_RESOLUTION)
+    env.place_shelves()
+    env.place_pallets(config.NUM_PALLETS)
+    return env
+
+
+def make_rack_environment(rack_depth=2, aisle_width=1, cross_aisle_every=20):
+    """
+    Narrow-aisle layout on the default site: full-length rack rows
+    ``rack_depth`` cells deep, ``aisle_width``-cell aisles between them and a
+    two-cell cross aisle every ``cross_aisle_every`` cells, inside a two-cell
+    free perimeter.
+    """
+    env = Environment(config.WAREHOUSE_WIDTH, config.WAREHOUSE_HEIGHT, config.GRID_RESOLUTION)
+    width, height = env.grid_width, env.grid_height
+    for y in range(2, height - 2 - rack_depth + 1, rack_depth + aisle_width):
+        x = 2
+        while x < width - 2:
+            end = min(x + cross_aisle_every, width - 2)
+            env.occupancy[x:end, y:y + rack_depth] = 1
+            env.objects.append(("shelf", (x, y, end - x, rack_depth)))
+            x = end + 2
+    return env
+
+
+def sample_pairs(env, count, seed=0):
+    """Return ``count`` distinct (start, goal) pairs of free cells."""
+    rng = random.Random(seed)
+    free = [tuple(map(int, cell)) for cell in np.argwhere(env.occupancy == 0)]
+    pairs = []
+    while len(pairs) < count:
+        start, goal = rng.sample(free, 2)
+        pairs.append((start, goal))
+    return pairs
+
+
+def summarize(values):
+    """Mean / median / p95 / max of a list of numbers."""
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+    return {
+        "n": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+        "max": ordered[-1],
+    }
@@ -0,0 +1,134 @@
+## warehouse_sim/bench/planners.py
+"""
+Single-path planner benchmark: latency and expansions per search.
+
+Every planner sees the same seeded layout and the same background traffic
+(paths reserved by an A* planner before timing starts).
+
+With ``--edits N``, planners that keep an abstraction of the grid (HPA*) are
+then checked against occupancy changes: N pallets are placed through the
+environment's change hook, which rebuilds only the clusters around them, and
+the queries are timed again. Paths crossing the new obstacles are counted.
+
+    python -m warehouse_sim.bench.planners --planners astar sipp hpa --layout site.png
+    python -m warehouse_sim.bench.planners --planners hpa --edits 20
+"""
+
+import argparse
+import json
+
+from warehouse_sim import config
+from warehouse_sim.bench.common import make_environment, sample_pairs, summarize
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.strategies import get_heuristic, get_planner, get_reservation_table
+
+
+def bench_planner(strategy, seed=0, queries=50, background=20, heuristic="manhattan",
+                  reservation_table="dict", layout=None, edits=0):
+    env = make_environment(seed, layout=layout, writable=bool(edits))
+    table = get_reservation_table(reservation_table, env)
+    provider = get_heuristic(heuristic, env.occupancy)
+
+    traffic = AStarPlanner(env.occupancy, table, heuristic=provider)
+    for robot_id, (start, goal) in enumerate(sample_pairs(env, background, seed=seed + 1)):
+        traffic.plan_and_reserve(start, goal, robot_id=robot_id)
+
+    planner = get_planner(strategy, env.occupancy, table, heuristic=provider)
+    pairs = sample_pairs(env, queries, seed=seed + 2)
+    latencies, expansions, lengths, found = [], [], [], 0
+    for start, goal in pairs:
+        result = planner.search(start, goal)
+        latencies.append(result.elapsed * 1000.0)
+        expansions.append(result.expansions)
+        if result.found:
+            found += 1
+            lengths.append(len(result.path))
+
+    result = {
+        "planner": strategy,
+        "heuristic": heuristic,
+        "reservation_table": reservation_table,
+        "layout": layout,
+        "queries": queries,
+        "background_paths": background,
+        "success_rate": found / queries if queries else 0.0,
+        "latency_ms": summarize(latencies),
+        "expansions": summarize(expansions),
+        "path_length": summarize(lengths),
+    }
+    if edits and hasattr(planner, "update"):
+        result["edits"] = bench_edits(env, planner, pairs, edits)
+    return result
+
+
+def bench_edits(env, planner, pairs, edits):
+    """Place ``edits`` pallets through the change hook, then re-run ``pairs``."""
+    env.add_listener(planner.update)
+    built = planner.abstraction_stats()["clusters_built"]
+    placed = sum(env.place_object(*config.PALLET_SIZE) is not None for _ in range(edits))
+    stats = planner.abstraction_stats()
+
+    latencies, invalid = [], 0
+    for start, goal in pairs:
+        if env.occupancy[start] or env.occupancy[goal]:
+            continue  # Buried under a new pallet
+        result = planner.search(start, goal)
+        latencies.append(result.elapsed * 1000.0)
+        if result.found and any(env.occupancy[cell] for cell in result.path):
+            invalid += 1
+    return {
+        "objects_placed": placed,
+        "clusters_built_before": built,
+        "clusters_touched": stats["clusters_touched"],
+        "clusters_dropped": stats["clusters_dropped"],
+        "clusters_kept": stats["clusters_built"],
+        "clusters_rebuilt": planner.abstraction_stats()["clusters_built"] - stats["clusters_built"],
+        "latency_ms": summarize(latencies),
+        "invalid_paths": invalid,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Planner latency / expansion benchmark")
+    parser.add_argument("--planners", nargs="+", default=["astar", "sipp", "hpa"])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--background", type=int, default=20,
+                        help="Paths reserved before timing starts")
+    parser.add_argument("--heuristic", type=str, default="manhattan",
+                        choices=["manhattan", "distance_map"])
+    parser.add_argument("--reservation-table", type=str, default="dict",
+                        choices=["dict", "dense"])
+    parser.add_argument("--layout", type=str, default=None,
+                        help="Layout file to plan on (default: the seeded random layout)")
+    parser.add_argument("--edits", type=int, default=0,
+                        help="Then place this many pallets and re-run the queries (planners with update())")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = [
+        bench_planner(name, seed=args.seed, queries=args.queries, background=args.background,
+                      heuristic=args.heuristic, reservation_table=args.reservation_table, layout=args.layout,
+                      edits=args.edits)
+        for name in args.planners
+    ]
+    for r in results:
+        print(f"{r['planner']:>8}: {r['latency_ms']['mean']:8.2f} ms/plan, "
+              f"{r['expansions']['mean']:9.1f} expansions/plan, "
+              f"success {r['success_rate']:.0%}")
+        if "edits" in r:
+            e = r["edits"]
+            print(f"{'':>8}  after {e['objects_placed']} pallets: {e['clusters_touched']} clusters touched, "
+                  f"{e['clusters_dropped']} of {e['clusters_built_before']} built dropped, "
+                  f"{e['clusters_rebuilt']} rebuilt, {e['latency_ms'].get('mean', 0.0):.2f} ms/plan, "
+                  f"{e['invalid_paths']} paths through new obstacles")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
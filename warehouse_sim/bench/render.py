@@ -0,0 +1,85 @@
+## warehouse_sim/bench/render.py
+"""
+Rendering time for a recorded run: seconds to write the GIF (and optionally
+the MP4) for a fixed number of frames, with the raster or matplotlib renderer.
+
+    python -m warehouse_sim.bench.render --robots 20 --frames 100 --renderer raster
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from warehouse_sim.agents.robot import spawn_robots
+from warehouse_sim.bench.common import make_environment
+from warehouse_sim.core.strategies import get_planner, get_reservation_table
+from warehouse_sim.core.task import TaskManager
+from warehouse_sim.sim.world import World
+
+
+def record_run(num_robots, frames, seed=0):
+    """Step a seeded default world and return it with its per-frame positions."""
+    env = make_environment(seed)
+    planner = get_planner("astar", env.occupancy, get_reservation_table("dict", env, rolling_horizon=True))
+    task_manager = TaskManager(env, strategy="random")
+    world = World(env, planner, spawn_robots(planner, task_manager, num_robots), task_manager=task_manager)
+    all_frames = []
+    for _ in range(frames):
+        world.step(task_manager.get_goal, task_manager.release_goal)
+        all_frames.append([tuple(pos) for pos in world.positions().tolist()])
+    return world, all_frames
+
+
+def bench_render(num_robots=20, frames=100, seed=0, mp4=False, renderer="raster", workers=1):
+    from warehouse_sim.sim.visualizer import animate, export
+
+    world, all_frames = record_run(num_robots, frames, seed=seed)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gif_path = os.path.join(tmpdir, "bench.gif")
+        mp4_path = os.path.join(tmpdir, "bench.mp4") if mp4 else None
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if renderer == "raster":
+                export(world.environment, all_frames, gif_path, filename_mov=mp4_path, workers=workers)
+            else:
+                animate(world, all_frames, gif_path, filename_mov=mp4_path)
+        elapsed = time.perf_counter() - started
+    return {
+        "renderer": renderer,
+        "workers": workers,
+        "num_robots": num_robots,
+        "frames": frames,
+        "mp4": mp4,
+        "render_s": elapsed,
+        "ms_per_frame": elapsed / frames * 1000.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rendering benchmark")
+    parser.add_argument("--robots", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--renderer", type=str, default="raster", choices=["raster", "matplotlib"])
+    parser.add_argument("--workers", type=int, default=1, help="Render worker processes (raster only)")
+    parser.add_argument("--mp4", action="store_true", help="Also time the MP4 export")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    r = bench_render(args.robots, args.frames, seed=args.seed, mp4=args.mp4, renderer=args.renderer,
+                     workers=args.workers)
+    print(f"render ({r['renderer']}): {r['render_s']:.2f} s for {r['frames']} frames ({r['ms_per_frame']:.1f} ms/frame)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(r, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
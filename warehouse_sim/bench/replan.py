@@ -0,0 +1,123 @@
+## warehouse_sim/bench/replan.py
+"""
+Repeated-block re-planning benchmark: cost of the REPLAN conflict action when
+the same robots are blocked again and again on the way to their goals, with
+a fresh A* search each time against the kept, repaired D* Lite searches (a
+robot's first block is a plain search in both modes; its search is built on
+the second).
+
+Each robot plans a trip through background traffic, then walks it a few
+cells at a time; at every stop another robot holds the next cells of its
+route and it is re-planned to the same goal. Both modes see the same layout,
+traffic and trips.
+
+    python -m warehouse_sim.bench.replan --layouts random racks
+"""
+
+import argparse
+import json
+import time
+
+from warehouse_sim.agents.robot import replan_blocked
+from warehouse_sim.bench.common import make_environment, make_rack_environment, sample_pairs, summarize
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.incremental import IncrementalReplanner
+from warehouse_sim.core.strategies import get_heuristic, get_reservation_table
+
+LAYOUTS = {
+    "random": make_environment,
+    "racks": lambda seed: make_rack_environment(),
+}
+MODES = ("full", "incremental")
+BLOCKER_ID = -1
+
+
+def bench_replan(layout, mode, seed=0, robots=20, blocks=8, advance=3, background=20, heuristic="manhattan"):
+    env = LAYOUTS[layout](seed)
+    table = get_reservation_table("dict", env)
+    provider = get_heuristic(heuristic, env.occupancy)
+    planner = AStarPlanner(env.occupancy, table, heuristic=provider)
+    for robot_id, (start, goal) in enumerate(sample_pairs(env, background, seed=seed + 1), start=robots):
+        planner.plan_and_reserve(start, goal, robot_id=robot_id)
+    replanner = IncrementalReplanner(planner) if mode == "incremental" else None
+
+    first, repeat, expansions, failures = [], [], [], 0
+    lengths = []
+    for robot_id, (start, goal) in enumerate(sample_pairs(env, robots, seed=seed + 2)):
+        path = planner.plan_and_reserve(start, goal, robot_id=robot_id)
+        for block in range(blocks):
+            if not path or len(path) <= advance + 2:
+                break
+            route = path[advance:]
+            ahead = route[1:3]
+            for t, cell in enumerate(ahead, start=1):
+                table.reserve_cell(cell[0], cell[1], t, robot_id=BLOCKER_ID)
+
+            searched = replanner.repair_expansions if replanner else 0
+            started = time.perf_counter()
+            new_path = replan_blocked(planner, robot_id, route[0], goal, route,
+                                      replanner=replanner, blocked=ahead[:1])
+            elapsed = (time.perf_counter() - started) * 1000.0
+            expansions.append(planner.last_result.expansions + (replanner.repair_expansions - searched if replanner else 0))
+            (first if block == 0 else repeat).append(elapsed)
+
+            table.release_robot(BLOCKER_ID, 0)
+            if new_path:
+                lengths.append(len(new_path))
+                path = new_path
+            else:
+                failures += 1
+                path = route
+
+    result = {
+        "layout": layout,
+        "mode": mode,
+        "heuristic": heuristic,
+        "robots": robots,
+        "replans": len(first) + len(repeat),
+        "failures": failures,
+        "first_block_ms": summarize(first),
+        "repeat_block_ms": summarize(repeat),
+        "expansions": summarize(expansions),
+        "path_length": summarize(lengths),
+    }
+    if replanner:
+        result["replanner"] = replanner.stats()
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Repeated-block re-planning benchmark")
+    parser.add_argument("--layouts", nargs="+", default=sorted(LAYOUTS), choices=sorted(LAYOUTS))
+    parser.add_argument("--robots", type=int, default=20)
+    parser.add_argument("--blocks", type=int, default=8, help="Blocks per robot trip")
+    parser.add_argument("--advance", type=int, default=3, help="Cells walked between blocks")
+    parser.add_argument("--background", type=int, default=20,
+                        help="Paths reserved before timing starts")
+    parser.add_argument("--heuristic", type=str, default="manhattan",
+                        choices=["manhattan", "distance_map"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = [
+        bench_replan(layout, mode, seed=args.seed, robots=args.robots, blocks=args.blocks,
+                     advance=args.advance, background=args.background, heuristic=args.heuristic)
+        for layout in args.layouts
+        for mode in MODES
+    ]
+    for r in results:
+        print(f"{r['layout']:>8} {r['mode']:>11}: {r['replans']} re-plans, "
+              f"{r['first_block_ms'].get('mean', 0.0):7.2f} ms first block, "
+              f"{r['repeat_block_ms'].get('mean', 0.0):7.2f} ms repeat blocks, "
+              f"{r['expansions'].get('mean', 0.0):8.1f} expansions, {r['failures']} failed")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+## warehouse_sim/bench/reservation.py
+"""
+Reservation table throughput: operations per second for the calls planners
+and worlds make, on a table pre-filled with seeded background traffic.
+
+    python -m warehouse_sim.bench.reservation --tables dict dense
+"""
+
+import argparse
+import json
+import random
+import time
+
+from warehouse_sim.bench.common import make_environment, sample_pairs
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.strategies import get_reservation_table
+
+
+def _rate(fn, calls):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    return calls / elapsed if elapsed > 0 else float("inf")
+
+
+def bench_reservation(kind, seed=0, background=30, queries=20000):
+    env = make_environment(seed)
+    table = get_reservation_table(kind, env)
+    planner = AStarPlanner(env.occupancy, table)
+    paths = []
+    for robot_id, (start, goal) in enumerate(sample_pairs(env, background, seed=seed + 1)):
+        path = planner.plan_and_reserve(start, goal, robot_id=robot_id)
+        if path:
+            paths.append(path)
+
+    rng = random.Random(seed + 2)
+    width, height = env.grid_width, env.grid_height
+    probes = [(rng.randrange(width), rng.randrange(height), rng.randrange(200)) for _ in range(queries)]
+    moves = [((x, y), (min(x + 1, width - 1), y), t) for x, y, t in probes]
+
+    def lookups():
+        for x, y, t in probes:
+            table.is_reserved(x, y, t)
+
+    def edge_lookups():
+        for from_pos, to_pos, t in moves:
+            table.is_edge_reserved(from_pos, to_pos, t)
+
+    def conflicts():
+        for robot_id, path in enumerate(paths):
+            table.first_conflict(path, t0=0, robot_id=robot_id)
+
+    def writes():
+        for robot_id, path in enumerate(paths):
+            table.reserve_path(path, robot_id=robot_id + background, t0=1)
+            table.reserve_edges(path, t0=1, robot_id=robot_id + background)
+
+    cells = sum(len(p) for p in paths)
+    return {
+        "table": kind,
+        "background_paths": len(paths),
+        "is_reserved_per_s": _rate(lookups, len(probes)),
+        "is_edge_reserved_per_s": _rate(edge_lookups, len(moves)),
+        "first_conflict_cells_per_s": _rate(conflicts, cells),
+        "reserve_path_cells_per_s": _rate(writes, cells),
+        "advance_per_s": _rate(lambda: [table.advance(t) for t in range(1, 201)], 200),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reservation table throughput benchmark")
+    parser.add_argument("--tables", nargs="+", default=["dict", "dense"])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = [bench_reservation(kind, seed=args.seed, queries=args.queries) for kind in args.tables]
+    for r in results:
+        print(f"{r['table']:>6}: {r['is_reserved_per_s']:12,.0f} lookups/s, "
+              f"{r['reserve_path_cells_per_s']:12,.0f} reserved cells/s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+## warehouse_sim/bench/suite.py
+"""
+Full benchmark suite: planners, corridor topology, blocked-robot re-planning,
+reservation tables, goal assignment, world stepping and rendering on
+fixed-seed layouts, written as one JSON document so results can be compared
+between commits.
+
+    python -m warehouse_sim.bench.suite --output bench_head.json
+    python -m warehouse_sim.bench.suite --output bench_new.json --compare bench_head.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+
+import numpy as np
+from warehouse_sim.bench.planners import bench_planner
+from warehouse_sim.bench.render import bench_render
+from warehouse_sim.bench.replan import LAYOUTS as REPLAN_LAYOUTS, MODES, bench_replan
+from warehouse_sim.bench.reservation import bench_reservation
+from warehouse_sim.bench.tasks import STRATEGIES, bench_tasks
+from warehouse_sim.bench.topology import LAYOUTS, bench_topology
+from warehouse_sim.bench.world import bench_world
+
+FULL = {"robots": [10, 50, 100, 250, 500], "frames": 100, "queries": 50, "render_frames": 100}
+QUICK = {"robots": [10, 50], "frames": 30, "queries": 10, "render_frames": 20}
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(seed=0, quick=False, render=True):
+    sizes = QUICK if quick else FULL
+    results = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "seed": seed,
+            "quick": quick,
+        },
+        "planners": [
+            bench_planner(name, seed=seed, queries=sizes["queries"], heuristic=heuristic)
+            for name in ("astar", "sipp", "hpa")
+            for heuristic in ("manhattan", "distance_map")
+        ],
+        "topology": [bench_topology(layout, seed=seed, queries=sizes["queries"]) for layout in sorted(LAYOUTS)],
+        "replan": [
+            bench_replan(layout, mode, seed=seed, robots=sizes["queries"] // 2)
+            for layout in sorted(REPLAN_LAYOUTS)
+            for mode in MODES
+        ],
+        "reservation": [bench_reservation(kind, seed=seed) for kind in ("dict", "dense")],
+        "tasks": [
+            bench_tasks(strategy, count, seed=seed, queries=sizes["queries"])
+            for count in sizes["robots"]
+            for strategy in STRATEGIES
+        ],
+        "world": [
+            bench_world(version, count, seed=seed, frames=sizes["frames"])
+            for count in sizes["robots"]
+            for version in ("default", "two-phase", "vectorized")
+        ],
+    }
+    if render:
+        results["render"] = [
+            bench_render(frames=sizes["render_frames"], seed=seed, renderer=renderer)
+            for renderer in ("raster", "matplotlib")
+        ]
+    return results
+
+
+def _flatten(node, prefix=""):
+    """Map "section.key/label..." -> number for every numeric leaf."""
+    flat = {}
+    if isinstance(node, dict):
+        label = "/".join(str(node[k]) for k in ("planner", "heuristic", "table", "strategy", "world_version",
+                                                "renderer", "layout", "mode", "num_robots")
+                         if k in node)
+        for key, value in node.items():
+            name = f"{prefix}[{label}].{key}" if label else f"{prefix}.{key}"
+            flat.update(_flatten(value, name))
+    elif isinstance(node, list):
+        for item in node:
+            flat.update(_flatten(item, prefix))
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        flat[prefix.lstrip(".")] = node
+    return flat
+
+
+def compare(current, baseline):
+    """Print every metric present in both runs with its relative change."""
+    now, before = _flatten(current), _flatten(baseline)
+    for key in sorted(now.keys() & before.keys()):
+        if key.startswith("meta."):
+            continue
+        old, new = before[key], now[key]
+        change = (new - old) / old * 100.0 if old else float("nan")
+        print(f"{key:<80} {old:>14.4g} -> {new:>14.4g}  ({change:+6.1f}%)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark suite")
+    parser.add_argument("--output", type=str, default="bench_results.json")
+    parser.add_argument("--compare", type=str, default=None, help="Baseline JSON to diff against")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast sanity run")
+    parser.add_argument("--no-render", action="store_true", help="Skip the rendering benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = run_suite(seed=args.seed, quick=args.quick, render=not args.no_render)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[BENCH] Wrote {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+## warehouse_sim/bench/tasks.py
+"""
+Goal assignment latency against fleet size: with ``num_robots`` goals held,
+time each release-then-assign cycle for every goal strategy. With
+``--assignment`` it instead times batch assignment of robots to tasks
+(cost matrix and solver) and compares travel distance against handing the
+same tasks out in arrival order.
+
+    python -m warehouse_sim.bench.tasks --robots 10 100 1000 --strategies spread
+    python -m warehouse_sim.bench.tasks --assignment --robots 500 --tasks 2000
+"""
+
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+from warehouse_sim.bench.common import make_environment, summarize
+from warehouse_sim.core.assignment import solve_assignment
+from warehouse_sim.core.planner.heuristics import DistanceMapHeuristic
+from warehouse_sim.core.task import TaskManager
+
+STRATEGIES = ["random", "spread", "high_density"]
+
+
+def bench_tasks(strategy, num_robots, seed=0, queries=200):
+    env = make_environment(seed)
+    task_manager = TaskManager(env, strategy=strategy)
+    rng = random.Random(seed)
+    goals = [task_manager.get_goal((0, 0)) for _ in range(num_robots)]
+
+    latencies = []
+    for _ in range(queries):
+        k = rng.randrange(len(goals))
+        task_manager.release_goal(goals[k])
+        started = time.perf_counter()
+        goals[k] = task_manager.get_goal(goals[k])
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return {
+        "strategy": strategy,
+        "num_robots": num_robots,
+        "queries": queries,
+        "latency_us": summarize(latencies),
+    }
+
+
+def bench_assignment(num_robots, num_tasks, seed=0):
+    env = make_environment(seed)
+    rng = random.Random(seed)
+    free = [tuple(map(int, cell)) for cell in np.argwhere(env.occupancy == 0)]
+    cells = rng.sample(free, num_robots + num_tasks)
+    robots, tasks = cells[:num_robots], cells[num_robots:]
+    height = env.grid_height
+    codes = np.array([x * height + y for x, y in tasks], dtype=np.int64)
+
+    distances = DistanceMapHeuristic(env.occupancy, cache_size=num_robots)
+    started = time.perf_counter()
+    cost = np.stack([distances.distance_map(robot).ravel()[codes] for robot in robots])
+    cost[~np.isfinite(cost)] = env.grid_width * height
+    cost_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows, cols = solve_assignment(cost)
+    solve_s = time.perf_counter() - started
+    try:
+        import scipy  # noqa: F401
+        solver = "scipy"
+    except ImportError:
+        solver = "auction"
+
+    # Baseline: each robot takes the next task in arrival order, as greedy mode does
+    in_order = cost[np.arange(min(num_robots, num_tasks)), np.arange(min(num_robots, num_tasks))]
+    return {
+        "num_robots": num_robots,
+        "num_tasks": num_tasks,
+        "solver": solver,
+        "cost_matrix_s": cost_s,
+        "solve_s": solve_s,
+        "mean_travel_batch": float(cost[rows, cols].mean()),
+        "mean_travel_in_order": float(in_order.mean()),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Goal assignment benchmark")
+    parser.add_argument("--strategies", nargs="+", default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument("--robots", nargs="+", type=int, default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--assignment", action="store_true",
+                        help="Benchmark batch assignment of --robots robots to --tasks tasks instead")
+    parser.add_argument("--tasks", nargs="+", type=int, default=[2000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    if args.assignment:
+        for count in args.robots:
+            for tasks in args.tasks:
+                r = bench_assignment(count, tasks, seed=args.seed)
+                results.append(r)
+                print(f"{count} robots x {tasks} tasks ({r['solver']}): cost matrix {r['cost_matrix_s']:.2f} s, "
+                      f"solve {r['solve_s']:.3f} s, mean travel {r['mean_travel_batch']:.1f} cells "
+                      f"(in order: {r['mean_travel_in_order']:.1f})")
+        args.strategies = []
+    for strategy in args.strategies:
+        for count in args.robots:
+            r = bench_tasks(strategy, count, seed=args.seed, queries=args.queries)
+            results.append(r)
+            latency = r["latency_us"]
+            print(f"{strategy:>12} n={count:<5}: mean {latency['mean']:9.1f} us, "
+                  f"p95 {latency['p95']:9.1f} us")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+## warehouse_sim/bench/topology.py
+"""
+Corridor topology benchmark: graph size after extraction, then nodes
+expanded per search by the topology planner against grid A*.
+
+Both planners see the same layout, queries and background traffic, on the
+seeded random layout (wide aisles, few corridor cells) and on a narrow-aisle
+rack layout (one-cell aisles between full-length racks).
+
+    python -m warehouse_sim.bench.topology --layouts random racks
+"""
+
+import argparse
+import json
+import time
+
+from warehouse_sim.bench.common import make_environment, make_rack_environment, sample_pairs, summarize
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.topology import TopologyPlanner
+from warehouse_sim.core.strategies import get_heuristic, get_reservation_table
+from warehouse_sim.core.topology import TopologyGraph
+
+LAYOUTS = {
+    "random": make_environment,
+    "racks": lambda seed: make_rack_environment(),
+}
+
+
+def bench_topology(layout, seed=0, queries=50, background=20, heuristic="manhattan"):
+    env = LAYOUTS[layout](seed)
+    started = time.perf_counter()
+    topology = TopologyGraph(env.occupancy)
+    build_s = time.perf_counter() - started
+
+    planners = {}
+    for name in ("astar", "topology"):
+        table = get_reservation_table("dict", env)
+        provider = get_heuristic(heuristic, env.occupancy)
+        traffic = AStarPlanner(env.occupancy, table, heuristic=provider)
+        for robot_id, (start, goal) in enumerate(sample_pairs(env, background, seed=seed + 1)):
+            traffic.plan_and_reserve(start, goal, robot_id=robot_id)
+
+        if name == "astar":
+            planner = AStarPlanner(env.occupancy, table, heuristic=provider)
+        else:
+            planner = TopologyPlanner(env.occupancy, table, heuristic=provider, topology=topology)
+        latencies, expansions, lengths, found = [], [], [], 0
+        for start, goal in sample_pairs(env, queries, seed=seed + 2):
+            result = planner.search(start, goal)
+            latencies.append(result.elapsed * 1000.0)
+            expansions.append(result.expansions)
+            if result.found:
+                found += 1
+                lengths.append(len(result.path))
+        planners[name] = {
+            "success_rate": found / queries if queries else 0.0,
+            "latency_ms": summarize(latencies),
+            "expansions": summarize(expansions),
+            "path_length": summarize(lengths),
+        }
+    planners["topology"]["fallbacks"] = planner.fallbacks
+
+    return {
+        "layout": layout,
+        "heuristic": heuristic,
+        "queries": queries,
+        "background_paths": background,
+        "build_s": build_s,
+        "graph": topology.stats(),
+        "planners": planners,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Corridor topology benchmark")
+    parser.add_argument("--layouts", nargs="+", default=sorted(LAYOUTS), choices=sorted(LAYOUTS))
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--background", type=int, default=20,
+                        help="Paths reserved before timing starts")
+    parser.add_argument("--heuristic", type=str, default="manhattan",
+                        choices=["manhattan", "distance_map"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = [
+        bench_topology(layout, seed=args.seed, queries=args.queries, background=args.background,
+                       heuristic=args.heuristic)
+        for layout in args.layouts
+    ]
+    for r in results:
+        graph = r["graph"]
+        print(f"{r['layout']:>8}: {graph['nodes']} nodes / {graph['free_cells']} free cells, "
+              f"{graph['corridors']} corridors (mean length {graph['mean_corridor_length']}), "
+              f"built in {r['build_s'] * 1000:.1f} ms")
+        for name, stats in r["planners"].items():
+            print(f"{'':>10}{name:>8}: {stats['expansions']['mean']:9.1f} expansions/plan, "
+                  f"{stats['latency_ms']['mean']:8.2f} ms/plan, success {stats['success_rate']:.0%}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
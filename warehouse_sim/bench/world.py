@@ -0,0 +1,79 @@
+## warehouse_sim/bench/world.py
+"""
+World stepping throughput: frames per second against robot count for each
+world version, on the same seeded layout and goal sequence.
+
+    python -m warehouse_sim.bench.world --robots 10 50 100 --world-versions default vectorized
+"""
+
+import argparse
+import importlib
+import json
+import time
+
+from warehouse_sim.agents.robot import spawn_robots
+from warehouse_sim.bench.common import make_environment
+from warehouse_sim.core.conflict_resolver import ConflictResolver
+from warehouse_sim.core.strategies import get_heuristic, get_planner, get_reservation_table
+from warehouse_sim.core.task import TaskManager
+from warehouse_sim.sim.sweep import WORLD_MODULES
+
+
+def bench_world(world_version, num_robots, seed=0, frames=100, planner="astar",
+                reservation_table="dense", heuristic="distance_map"):
+    env = make_environment(seed)
+    table = get_reservation_table(reservation_table, env, rolling_horizon=True)
+    provider = get_heuristic(heuristic, env.occupancy)
+    planner_obj = get_planner(planner, env.occupancy, table, heuristic=provider)
+    task_manager = TaskManager(env, strategy="random")
+    World = importlib.import_module(WORLD_MODULES[world_version]).World
+
+    robots = spawn_robots(planner_obj, task_manager, num_robots)
+    world = World(env, planner_obj, robots, conflict_resolver=ConflictResolver("wait_then_replan"),
+                  task_manager=task_manager)
+    plan_before = planner_obj.stats.time_s
+    started = time.perf_counter()
+    for _ in range(frames):
+        world.step(task_manager.get_goal, task_manager.release_goal)
+    elapsed = time.perf_counter() - started
+
+    plan_time = planner_obj.stats.time_s - plan_before
+    return {
+        "world_version": world_version,
+        "num_robots": num_robots,
+        "frames": frames,
+        "fps": frames / elapsed,
+        "planner_time_s": plan_time,
+        "step_ms_excl_planning": max(0.0, elapsed - plan_time) / frames * 1000.0,
+        "completed_tasks": sum(world.get_summary()["completed_tasks"].values()),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="World stepping benchmark")
+    parser.add_argument("--world-versions", nargs="+", default=["default", "two-phase", "vectorized"],
+                        choices=sorted(WORLD_MODULES))
+    parser.add_argument("--robots", nargs="+", type=int, default=[10, 50, 100, 250, 500])
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--planner", type=str, default="astar")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None, help="Write JSON results here")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for count in args.robots:
+        for version in args.world_versions:
+            r = bench_world(version, count, seed=args.seed, frames=args.frames, planner=args.planner)
+            results.append(r)
+            print(f"{version:>10} n={count:<4}: {r['fps']:8.1f} fps, "
+                  f"{r['step_ms_excl_planning']:7.2f} ms/frame excluding planning")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
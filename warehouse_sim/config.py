@@ -13,6 +13,9 @@ GRID_RESOLUTION = 0.5
 GRID_WIDTH = int(WAREHOUSE_WIDTH / GRID_RESOLUTION)
 GRID_HEIGHT = int(WAREHOUSE_HEIGHT / GRID_RESOLUTION)
 
+# Layout files (Environment.from_file)
+LAYOUT_CACHE_DIR = "cache/layouts"  # Converted grids and derived data, by content hash
+
 # Object sizes (meters)
 SHELF_SIZE = (4, 2)
 PALLET_SIZE = (2, 1.5)
@@ -21,7 +24,34 @@ PALLET_SIZE = (2, 1.5)
 NUM_PALLETS = 80
 NUM_ROBOTS = 10
 
+# Goal assignment
+SPREAD_MIN_DISTANCE = 10  # Meters (Manhattan) between goals under the spread strategy
+TASK_POOL_SIZE = 32  # Pending tasks matched against idle robots in batch assignment mode
+TASK_AGE_WEIGHT = 1  # Cells of travel a pending task's batch cost drops per frame it waits past the grace
+TASK_AGE_GRACE = 100  # Frames a pending task waits before batch assignment starts favouring it
+
 # Simulation settings
 ANIMATION_MAX_STEPS = 1000
 ANIMATION_INTERVAL_MS = 300
+RENDER_CELL_PX = 8  # Pixels per grid cell in the raster renderer
 GOAL_RESERVATION_DURATION = 50
+EVENT_LOG_CAPACITY = 65536  # Records buffered by utils.logger before a flush
+TRAJECTORY_CHUNK_FRAMES = 256  # Frames sim.trajectory maps into memory at a time
+
+# Reservation table settings
+DENSE_RESERVATION_HORIZON = 512  # Frames held by the NumPy ring-buffer table
+
+# Planner settings
+HEURISTIC_CACHE_SIZE = 128  # Goal distance maps kept by DistanceMapHeuristic
+PLANNER_MAX_TIME_HORIZON = 400   # Frames past "now" a search may look ahead
+PLANNER_MAX_EXPANSIONS = 50000   # States popped before a search gives up
+PLANNER_TIME_BUDGET_S = 1.0      # Wall-clock seconds per search (None = unbounded)
+MSTAR_MAX_EXPANSIONS = 20000     # Joint-state expansions before M* falls back to A*
+CBS_MAX_NODES = 500              # Constraint-tree nodes CBS expands per batch
+ECBS_SUBOPTIMALITY = 1.5         # Focal weight used by the "ecbs" strategy
+PARALLEL_MIN_BATCH = 4           # Smaller batches are planned in-process
+HPA_CLUSTER_SIZE = 16            # Cluster side (cells) of the hierarchical planner
+HPA_ENTRANCE_SPLIT = 6           # Border openings this wide get an entrance at each end
+REPLAN_MODE = "auto"             # Blocked robots: "incremental" (kept D* Lite), "full", or "auto" (incremental on A*)
+REPLAN_SCAN_RADIUS = 3           # Cells held by others this close to a blocked robot count as blocked
+REPLAN_BLOCK_PENALTY = 8         # Extra cost of entering a blocked cell in the repaired distances
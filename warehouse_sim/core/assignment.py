@@ -0,0 +1,105 @@
+## warehouse_sim/core/assignment.py
+"""
+Minimum-cost one-to-one assignment of robots to tasks.
+
+Uses ``scipy.optimize.linear_sum_assignment`` (Hungarian / Jonker-Volgenant)
+when SciPy is installed, and otherwise a NumPy auction solver that is exact
+for the integer grid distances used here.
+"""
+
+import numpy as np
+
+SCALING_RATIO = 0.8  # Rows / columns above which the auction uses eps-scaling
+SCALING_FACTOR = 5
+
+
+def solve_assignment(cost):
+    """
+    Args:
+        cost (np.ndarray): (robots, tasks) matrix of finite costs.
+
+    Returns:
+        tuple: (rows, cols) index arrays; every row is matched when
+        robots <= tasks, otherwise every column.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if not cost.size:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        return auction(cost)
+    rows, cols = linear_sum_assignment(cost)
+    return rows.astype(np.int64), cols.astype(np.int64)
+
+
+def auction(cost):
+    """
+    Jacobi auction (Bertsekas) minimizing total ``cost``: every unmatched row
+    bids at once for its best column, raising that column's price by the gap
+    to its second best plus ``eps``. With integer costs and a final ``eps`` <
+    1 / rows the result is optimal.
+
+    When tasks far outnumber robots a single phase at the final ``eps``
+    settles quickly. Near-square problems turn into long price wars at that
+    step size, so they are padded to square and solved with eps-scaling:
+    phases from a coarse ``eps`` down to the final one, keeping prices.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n >= SCALING_RATIO * m:
+        benefit = np.zeros((m, m))  # Dummy rows take the unused columns at no cost
+        benefit[:n] = -cost
+        eps = max(np.abs(cost).max(), 1.0) / SCALING_FACTOR
+    else:
+        benefit = -cost
+        eps = 0.0
+    final = 1.0 / (len(benefit) + 1)
+    prices = np.zeros(m)
+    while True:
+        eps = max(eps, final)
+        assigned = _bid(benefit, prices, eps)
+        if eps == final:
+            break
+        eps /= SCALING_FACTOR
+    assigned = assigned[:n]
+
+    rows = np.arange(n, dtype=np.int64)
+    if transposed:
+        order = np.argsort(assigned)
+        return assigned[order], rows[order]
+    return rows, assigned
+
+
+def _bid(benefit, prices, eps):
+    """One auction phase from an empty assignment; updates ``prices`` in place."""
+    n, m = benefit.shape
+    owner = np.full(m, -1, dtype=np.int64)
+    assigned = np.full(n, -1, dtype=np.int64)
+    while True:
+        bidders = np.flatnonzero(assigned < 0)
+        if not len(bidders):
+            return assigned
+        values = benefit[bidders] - prices
+        best = np.argmax(values, axis=1)
+        rows = np.arange(len(bidders))
+        first = values[rows, best]
+        if m > 1:
+            values[rows, best] = -np.inf
+            second = values.max(axis=1)
+        else:
+            second = first
+        bids = prices[best] + (first - second) + eps
+
+        # Highest bid wins each contested column
+        order = np.lexsort((-bids, best))
+        winners = order[np.concatenate(([True], best[order][1:] != best[order][:-1]))]
+        columns = best[winners]
+        previous = owner[columns]
+        assigned[previous[previous >= 0]] = -1
+        owner[columns] = bidders[winners]
+        assigned[bidders[winners]] = columns
+        prices[columns] = bids[winners]
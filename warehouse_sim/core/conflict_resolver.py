@@ -7,6 +7,18 @@ Supports configurable strategies with retry, cooldown, and replan triggers.
 
 from enum import Enum, auto
 
+STRATEGIES = ("wait_then_replan", "always_wait", "always_replan", "idle_on_block")
+ALIASES = {"wait": "always_wait", "replan": "always_replan", "idle": "idle_on_block"}  # Short CLI names
+
+
+def strategy_name(strategy):
+    """Canonical strategy name for ``strategy`` (or its short alias); ValueError if unknown."""
+    name = ALIASES.get(strategy, strategy)
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown conflict strategy: {strategy} "
+                         f"(expected one of {', '.join(STRATEGIES + tuple(ALIASES))})")
+    return name
+
 class ResolutionAction(Enum):
     WAIT = auto()
     REPLAN = auto()
@@ -26,13 +38,14 @@ class ConflictResolver:
                 - "always_wait"
                 - "always_replan"
                 - "idle_on_block"
+                or the short aliases "wait", "replan" and "idle".
             max_retries (int): How many times to try waiting before replanning.
             cooldown (int): Cooldown period before next action after replanning.
         """
-        self.strategy = strategy
+        self.strategy = strategy_name(strategy)
         self.max_retries = max_retries
         self.cooldown = cooldown
-        self.robot_state = {}  # robot_id -> {retries, cooldown_remaining}
+        self.robot_state = {}  # robot_id -> {retries, cooldown_remaining}, while blocked
 
     def resolve(self, robot_id, frame):
         """
@@ -79,19 +92,16 @@ class ConflictResolver:
     def reset(self, robot_id):
         """
         Reset retry and cooldown state for a robot (e.g., after successful move).
+        The entry is dropped, so only robots still blocked are tracked.
         """
-        if robot_id in self.robot_state:
-            self.robot_state[robot_id] = {
-                "retries": 0,
-                "cooldown_remaining": 0
-            }
+        self.robot_state.pop(robot_id, None)
 
     def update_config(self, strategy=None, max_retries=None, cooldown=None):
         """
         Dynamically update strategy or thresholds.
         """
         if strategy:
-            self.strategy = strategy
+            self.strategy = strategy_name(strategy)
         if max_retries is not None:
             self.max_retries = max_retries
         if cooldown is not None:
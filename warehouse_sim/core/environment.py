@@ -1,20 +1,67 @@
 """
 Environment grid layout, shelf/pallet placement, and occupancy tracking.
+
+Layouts are either generated (``place_shelves`` / ``place_pallets`` on an
+empty grid) or loaded from a file with ``Environment.from_file`` (see
+``core.layout``), in which case the occupancy grid is a read-only memory map
+unless ``writable=True`` asks for a copy-on-write one that can be edited.
+Edits made through ``place_*`` are reported to listeners registered with
+``add_listener`` (the worlds register the planner's ``update`` when it keeps
+an abstraction of the grid, as HPA* does).
 """
 
 import numpy as np
 import random
 from warehouse_sim import config
+from warehouse_sim.core.layout import label_components, load_layout
 
 class Environment:
-    def __init__(self, width_m, height_m, resolution):
+    def __init__(self, width_m, height_m, resolution, occupancy=None):
+        """
+        Args:
+            width_m (float): Site size in meters.
+            height_m (float):
+            resolution (float): Meters per grid cell.
+            occupancy (np.ndarray, optional): Existing (W, H) grid (1 = blocked);
+                its shape overrides the size derived from the meters.
+        """
         self.width_m = width_m
         self.height_m = height_m
         self.resolution = resolution
-        self.grid_width = int(width_m / resolution)
-        self.grid_height = int(height_m / resolution)
-        self.occupancy = np.zeros((self.grid_width, self.grid_height), dtype=np.uint8)
+        if occupancy is None:
+            occupancy = np.zeros((int(width_m / resolution), int(height_m / resolution)), dtype=np.uint8)
+        self.grid_width, self.grid_height = occupancy.shape
+        self.occupancy = occupancy
         self.objects = []
+        self.listeners = []  # Called with the (N, 2) cells whose occupancy changed
+        self._free = None  # Derived data, computed on first use (or taken from the layout cache)
+        self._components = None
+        self._component_sizes = None
+
+    @classmethod
+    def from_file(cls, path, resolution=None, cache_dir=config.LAYOUT_CACHE_DIR, writable=False):
+        """
+        Load a layout from an image, CSV or ``.npy`` file (see ``core.layout``).
+
+        Args:
+            path (str): Layout file; an optional ``<layout>.json`` sidecar adds
+                ``resolution`` and ``objects``.
+            resolution (float, optional): Meters per cell; defaults to the
+                sidecar's value, then ``config.GRID_RESOLUTION``.
+            cache_dir (str): Where converted grids and derived data are kept.
+            writable (bool): Allow ``place_*`` edits of the loaded grid. Pages
+                are copied as they are written, so the file and its cache stay
+                untouched. The default grid is read-only and edits raise.
+        """
+        layout = load_layout(path, cache_dir=cache_dir, writable=writable)
+        resolution = resolution or layout.resolution or config.GRID_RESOLUTION
+        width, height = layout.occupancy.shape
+        env = cls(width * resolution, height * resolution, resolution, occupancy=layout.occupancy)
+        env.objects = list(layout.objects)
+        env._free = layout.free
+        env._components = layout.components
+        env._component_sizes = layout.component_sizes
+        return env
 
     def is_free(self, x, y):
         return self.occupancy[x, y] == 0
@@ -22,11 +69,13 @@ class Environment:
     def place_object(self, width_m, height_m):
         gw = int(width_m / self.resolution)
         gh = int(height_m / self.resolution)
+        self._check_writable()
         for _ in range(1000):
             gx = random.randint(1, self.grid_width - gw - 1)
             gy = random.randint(1, self.grid_height - gh - 1)
             if np.all(self.occupancy[gx:gx+gw, gy:gy+gh] == 0):
                 self.occupancy[gx:gx+gw, gy:gy+gh] = 1
+                self._changed(gx, gy, gw, gh)
                 return gx, gy, gw, gh
         return None
 
@@ -34,11 +83,13 @@ class Environment:
         shelf_gw = int(config.SHELF_SIZE[0] / self.resolution)
         shelf_gh = int(config.SHELF_SIZE[1] / self.resolution)
         aisle_spacing = shelf_gh + 4
+        self._check_writable()
         for row in range(2, self.grid_height - shelf_gh - 2, aisle_spacing):
             for _ in range(random.randint(3, 5)):
                 gx = random.randint(1, self.grid_width - shelf_gw - 1)
                 if np.all(self.occupancy[gx:gx+shelf_gw, row:row+shelf_gh] == 0):
                     self.occupancy[gx:gx+shelf_gw, row:row+shelf_gh] = 1
+                    self._changed(gx, row, shelf_gw, shelf_gh)
                     self.objects.append(("shelf", (gx, row, shelf_gw, shelf_gh)))
 
     def place_pallets(self, num):
@@ -47,6 +98,47 @@ class Environment:
             if obj:
                 self.objects.append(("pallet", obj))
 
+    def add_listener(self, callback):
+        """Call ``callback(cells)`` with the (N, 2) changed cells after every ``place_*`` edit."""
+        self.listeners.append(callback)
+
+    def _changed(self, gx, gy, gw, gh):
+        self._free = self._components = None
+        if self.listeners:
+            xs, ys = np.mgrid[gx:gx+gw, gy:gy+gh]
+            cells = np.column_stack([xs.ravel(), ys.ravel()])
+            for callback in self.listeners:
+                callback(cells)
+
+    def _check_writable(self):
+        if not self.occupancy.flags.writeable:
+            raise ValueError("Occupancy grid is read-only; load the layout with "
+                             "Environment.from_file(..., writable=True) to edit it")
+
+    def free_cells(self):
+        """Encoded free cells (``x * grid_height + y``), ascending."""
+        if self._free is None:
+            self._free = np.flatnonzero(self.occupancy == 0)
+        return self._free
+
+    def components(self):
+        """
+        Returns:
+            tuple: ((W, H) int32 4-connected component labels, -1 on blocked
+            cells; list of cells per label).
+        """
+        if self._components is None:
+            self._components, self._component_sizes = label_components(self.occupancy == 0)
+        return self._components, self._component_sizes
+
+    def reachable_cells(self):
+        """Encoded free cells of the largest connected component, ascending."""
+        labels, sizes = self.components()
+        if not sizes:
+            return self.free_cells()
+        free = self.free_cells()
+        return free[labels.ravel()[free] == int(np.argmax(sizes))]
+
     def to_world_coords(self, gx, gy):
         return gx * self.resolution, gy * self.resolution
 
@@ -0,0 +1,213 @@
+## warehouse_sim/core/layout.py
+"""
+Warehouse layouts loaded from files, with a content-addressed cache.
+
+Supported sources:
+
+- ``.npy``: an occupancy array already indexed ``[x, y]`` like
+  ``Environment.occupancy`` (nonzero = blocked); read through a memory map
+- images (``.png``, ``.bmp``, ...; needs Pillow): dark pixels (< 128) are
+  blocked, the top row of the picture is the far (max y) edge of the grid
+- ``.csv``: one row per picture row as for images, nonzero = blocked
+
+An optional sidecar ``<layout>.json`` next to the file holds metadata:
+
+    {"resolution": 0.25,
+     "objects": [{"label": "shelf", "rect": [gx, gy, gw, gh]}, ...]}
+
+with rectangles in grid cells. The first load converts the source to a
+uint8 occupancy grid and derives the free-cell list and 4-connected
+components, all stored under ``cache_dir/<sha256 of the file>/``. Later loads
+of the same content (under any name) only hash the file and memory-map
+those arrays.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from warehouse_sim import config
+
+CACHE_VERSION = 1  # Bump when the derived data changes
+IMAGE_THRESHOLD = 128  # Grey levels below this are obstacles
+_CHUNK_BYTES = 1 << 20
+
+
+class Layout:
+    """
+    Occupancy and derived data for one layout file (memory-mapped, read-only
+    unless loaded with ``writable=True``).
+
+    Attributes:
+        occupancy (np.ndarray): (W, H) uint8, 1 = blocked.
+        free (np.ndarray): Encoded free cells ``x * H + y``, ascending.
+        components (np.ndarray): (W, H) int32 component label, -1 = blocked.
+        component_sizes (list): Cells per component label.
+        resolution (float or None): Meters per cell from the sidecar.
+        objects (list): ``(label, (gx, gy, gw, gh))`` from the sidecar.
+        key (str): Content hash the cache entry is stored under.
+    """
+
+    def __init__(self, directory, metadata, writable=False):
+        self.key = os.path.basename(directory)
+        # Copy-on-write: edited pages live in this process only, the cache file is never changed
+        self.occupancy = np.load(os.path.join(directory, "occupancy.npy"), mmap_mode="c" if writable else "r")
+        self.free = _load(os.path.join(directory, "free.npy"))
+        self.components = np.load(os.path.join(directory, "components.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "derived.json")) as f:
+            self.component_sizes = json.load(f)["component_sizes"]
+        self.resolution = metadata.get("resolution")
+        self.objects = [(obj["label"], tuple(obj["rect"])) for obj in metadata.get("objects", [])]
+
+
+def _load(filename):
+    # np.load cannot memory-map a zero-size array
+    array = np.load(filename, mmap_mode="r")
+    return array if array.size else np.load(filename)
+
+
+def load_layout(path, cache_dir=config.LAYOUT_CACHE_DIR, writable=False):
+    """
+    Load ``path`` through the cache, building the entry on first use.
+
+    Args:
+        writable (bool): Map the occupancy copy-on-write instead of read-only.
+
+    Returns:
+        Layout
+    """
+    key = content_hash(path)
+    directory = os.path.join(cache_dir, key)
+    if not os.path.isdir(directory):
+        _build_entry(path, directory)
+    return Layout(directory, read_metadata(path), writable=writable)
+
+
+def content_hash(path):
+    """sha256 of the file contents (and the cache version), read in chunks."""
+    digest = hashlib.sha256(f"layout-v{CACHE_VERSION}:".encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_metadata(path):
+    """The sidecar ``<layout>.json`` as a dict, or {} when there is none."""
+    sidecar = os.path.splitext(path)[0] + ".json"
+    if not os.path.exists(sidecar):
+        return {}
+    with open(sidecar) as f:
+        return json.load(f)
+
+
+def read_occupancy(path):
+    """
+    Source file as a (W, H) array where nonzero means blocked. ``.npy`` files
+    come back memory-mapped; images and CSVs are decoded in memory.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        grid = np.load(path, mmap_mode="r")
+    elif extension == ".csv":
+        grid = _picture_to_grid(np.loadtxt(path, delimiter=",", ndmin=2) != 0)
+    else:
+        from PIL import Image
+        with Image.open(path) as image:
+            grey = np.asarray(image.convert("L"))
+        grid = _picture_to_grid(grey < IMAGE_THRESHOLD)
+    if grid.ndim != 2:
+        raise ValueError(f"Layout {path} is not a 2-D grid (shape {grid.shape})")
+    return grid
+
+
+def _picture_to_grid(picture):
+    """(rows, cols) picture, top row first -> (W, H) grid with y pointing up."""
+    return np.ascontiguousarray(picture[::-1].T)
+
+
+def _build_entry(path, directory):
+    """Convert and derive into a temporary directory, then rename it into place."""
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=".building-")
+    try:
+        source = read_occupancy(path)
+        occupancy = np.lib.format.open_memmap(os.path.join(staging, "occupancy.npy"), mode="w+",
+                                              dtype=np.uint8, shape=source.shape)
+        # Column blocks keep memory flat when the source is a large memmap
+        step = max(1, _CHUNK_BYTES * 16 // max(1, source.shape[1]))
+        for x in range(0, source.shape[0], step):
+            occupancy[x:x + step] = source[x:x + step] != 0
+        occupancy.flush()
+
+        np.save(os.path.join(staging, "free.npy"), np.flatnonzero(occupancy == 0))
+        components, sizes = label_components(occupancy == 0)
+        np.save(os.path.join(staging, "components.npy"), components)
+        with open(os.path.join(staging, "derived.json"), "w") as f:
+            json.dump({"shape": list(occupancy.shape), "component_sizes": sizes}, f)
+        del occupancy
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+            shutil.rmtree(staging)  # Another process built the same entry first
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def label_components(free):
+    """
+    4-connected components of a boolean (W, H) grid.
+
+    Returns:
+        tuple: (labels, sizes): int32 labels with -1 on blocked cells, numbered
+        from 0 in order of each component's first cell, and the cell count of
+        each label.
+    """
+    try:
+        from scipy import ndimage
+    except ImportError:
+        labels = _label_components(free)
+    else:
+        labels, _ = ndimage.label(free)  # Default structure is 4-connected; 0 = background
+        labels = labels.astype(np.int32) - 1
+    sizes = np.bincount(labels[labels >= 0].ravel()).tolist()
+    return labels, sizes
+
+
+def _label_components(free):
+    """
+    NumPy fallback: every free cell starts as its own root; each round hooks
+    the larger root of every free edge onto the smaller one, then compresses
+    pointers until all roots are stable. Converges in a few tens of rounds on
+    warehouse grids.
+    """
+    width, height = free.shape
+    index = np.arange(width * height).reshape(width, height)
+    flat = free.ravel()
+    u = np.concatenate([index[:-1][free[:-1] & free[1:]], index[:, :-1][free[:, :-1] & free[:, 1:]]])
+    v = np.concatenate([index[1:][free[:-1] & free[1:]], index[:, 1:][free[:, :-1] & free[:, 1:]]])
+
+    parent = np.arange(width * height)
+    while True:
+        ru, rv = parent[u], parent[v]
+        differ = ru != rv
+        if not differ.any():
+            break
+        np.minimum.at(parent, np.maximum(ru[differ], rv[differ]), np.minimum(ru[differ], rv[differ]))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    roots = np.unique(parent[flat])  # Smallest cell of each component, ascending
+    labels = np.full(width * height, -1, dtype=np.int32)
+    labels[flat] = np.searchsorted(roots, parent[flat])
+    return labels.reshape(width, height)
@@ -1,69 +1,127 @@
 ## warehouse_sim/core/planner/astar.py
 """
 A* planner with space-time reservation handling.
+
+Searches are bounded by a time horizon, an expansion budget and a wall-clock
+budget so an unreachable or permanently reserved goal fails fast instead of
+stalling the world step.
 """
 
 import heapq
+import time
 from warehouse_sim import config
-from warehouse_sim.core.planner.base import BasePlanner
+from warehouse_sim.core.planner.base import BasePlanner, PlannerStats, PlanResult, PlanStatus
+from warehouse_sim.core.planner.heuristics import ManhattanHeuristic
 
 class AStarPlanner(BasePlanner):
-    def __init__(self, occupancy_grid, reservation_table):
+    def __init__(self, occupancy_grid, reservation_table, heuristic=None,
+                 max_time_horizon=config.PLANNER_MAX_TIME_HORIZON,
+                 max_expansions=config.PLANNER_MAX_EXPANSIONS,
+                 time_budget=config.PLANNER_TIME_BUDGET_S):
         self.grid = occupancy_grid
         self.reservation_table = reservation_table
+        self.heuristic_provider = heuristic or ManhattanHeuristic()
+        self.max_time_horizon = max_time_horizon
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+        self.stats = PlannerStats()
+        self.last_result = None
 
     def heuristic(self, a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+        return self.heuristic_provider.for_goal(b)(a)
 
     def plan(self, start, goal):
+        return self.search(start, goal).path
+
+    def search(self, start, goal):
+        """
+        Run a bounded space-time A* search.
+
+        Returns:
+            PlanResult: The path (or None) with a status and expansion count.
+        """
+        started = time.perf_counter()
+        result = self._search(start, goal, started)
+        result.elapsed = time.perf_counter() - started
+        self.last_result = result
+        self.stats.record(result)
+        return result
+
+    def _search(self, start, goal, started):
+        h = self.heuristic_provider.for_goal(goal)
+        if h(start) == float('inf'):
+            return PlanResult(None, PlanStatus.NO_PATH)  # Goal is walled off from start
+
+        width, height = self.grid.shape
+        table = self.reservation_table
         moves = [(-1, 0), (1, 0), (0, -1), (0, 1), (0, 0)]  # up, down, left, right, wait
+        t0 = table.now
+        t_max = t0 + self.max_time_horizon if self.max_time_horizon is not None else None
+        deadline = started + self.time_budget if self.time_budget is not None else None
+
         open_set = []
-        heapq.heappush(open_set, (0, 0, start))  # (f_score, time, position)
+        heapq.heappush(open_set, (0, t0, start))  # (f_score, time, position)
 
         came_from = {}
-        g_score = {(start, 0): 0}
+        g_score = {(start, t0): 0}
+        closed = set()
+        expansions = 0
+        pushes = 1
+        pruned = False
 
         while open_set:
             _, t, current = heapq.heappop(open_set)
+            if (current, t) in closed:
+                continue
+            closed.add((current, t))
 
             if current == goal:
                 path = [current]
                 while (current, t) in came_from:
                     current, t = came_from[(current, t)]
                     path.append(current)
-                return list(reversed(path))
+                return PlanResult(list(reversed(path)), PlanStatus.FOUND, expansions, heap_pushes=pushes)
 
+            expansions += 1
+            if self.max_expansions is not None and expansions >= self.max_expansions:
+                return PlanResult(None, PlanStatus.EXPANSION_LIMIT, expansions, heap_pushes=pushes)
+            if deadline is not None and expansions % 256 == 0 and time.perf_counter() > deadline:
+                return PlanResult(None, PlanStatus.TIME_LIMIT, expansions, heap_pushes=pushes)
+            if t_max is not None and t >= t_max:
+                pruned = True
+                continue
+
+            tentative_g = g_score[(current, t)] + 1
             for dx, dy in moves:
                 nx, ny = current[0] + dx, current[1] + dy
 
-                if not (0 <= nx < config.GRID_WIDTH and 0 <= ny < config.GRID_HEIGHT):
+                if not (0 <= nx < width and 0 <= ny < height):
                     continue
                 if self.grid[nx, ny] == 1:
                     continue
-                if self.reservation_table.is_reserved(nx, ny, t + 1):
-                    continue
-                if self.reservation_table.is_edge_reserved(current, (nx, ny), t + 1):
-                    continue
 
                 next_pos = (nx, ny)
                 key = (next_pos, t + 1)
-                tentative_g = g_score.get((current, t), float('inf')) + 1
+                if key in closed:
+                    continue
+                if table.is_reserved(nx, ny, t + 1):
+                    continue
+                if table.is_edge_reserved(current, next_pos, t + 1):
+                    continue
 
                 if tentative_g < g_score.get(key, float('inf')):
                     g_score[key] = tentative_g
-                    f_score = tentative_g + self.heuristic(next_pos, goal)
+                    f_score = tentative_g + h(next_pos)
                     heapq.heappush(open_set, (f_score, t + 1, next_pos))
+                    pushes += 1
                     came_from[key] = (current, t)
 
-        return None
+        status = PlanStatus.HORIZON_EXCEEDED if pruned else PlanStatus.NO_PATH
+        return PlanResult(None, status, expansions, heap_pushes=pushes)
 
     def plan_and_reserve(self, start, goal, robot_id=None):
+        t0 = self.reservation_table.now
         path = self.plan(start, goal)
         if path:
-            self.reservation_table.reserve_path(path, robot_id=robot_id)
-            self.reservation_table.reserve_edges(path)
-            self.reservation_table.reserve_goal_forever(
-                path[-1][0], path[-1][1], start_time=len(path), robot_id=robot_id
-            )
-            self.reservation_table.reserve_cell(start[0], start[1], 0, robot_id=robot_id)
+            self.reserve_plan(path, robot_id=robot_id, t0=t0)
         return path
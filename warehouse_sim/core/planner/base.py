@@ -1,5 +1,61 @@
 # warehouse_sim/core/planner/base.py
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum, auto
+from warehouse_sim.utils.debug import profiler
+
+class PlanStatus(Enum):
+    FOUND = auto()
+    NO_PATH = auto()            # Search space exhausted
+    HORIZON_EXCEEDED = auto()   # Exhausted, but states past the time horizon were pruned
+    EXPANSION_LIMIT = auto()
+    TIME_LIMIT = auto()
+
+
+@dataclass
+class PlanResult:
+    path: list
+    status: PlanStatus
+    expansions: int = 0
+    elapsed: float = 0.0
+    heap_pushes: int = 0
+
+    @property
+    def found(self):
+        return self.status == PlanStatus.FOUND
+
+
+class PlannerStats:
+    """Running totals over every search a planner has performed."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.expansions = 0
+        self.time_s = 0.0
+        self.by_status = {}
+
+    def record(self, result):
+        self.calls += 1
+        self.expansions += result.expansions
+        self.time_s += result.elapsed
+        if profiler.enabled:
+            profiler.count("planner.searches")
+            profiler.count("planner.expansions", result.expansions)
+            profiler.count("planner.heap_pushes", result.heap_pushes)
+        if not result.found:
+            self.failures += 1
+        self.by_status[result.status.name] = self.by_status.get(result.status.name, 0) + 1
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "expansions": self.expansions,
+            "time_s": round(self.time_s, 4),
+            "by_status": dict(self.by_status),
+        }
+
 
 class BasePlanner(ABC):
     @abstractmethod
@@ -11,3 +67,29 @@ class BasePlanner(ABC):
     def plan_and_reserve(self, start, goal, robot_id=None):
         """Plan a path and reserve it in space-time."""
         pass
+
+    def plan_batch_and_reserve(self, requests):
+        """
+        Plan and reserve several robots that need paths in the same frame.
+
+        Args:
+            requests (list): ``[(robot_id, start, goal), ...]``
+
+        Returns:
+            dict: robot_id -> path (None if planning failed).
+
+        The default plans one robot after another in request order; joint
+        planners override this.
+        """
+        return {
+            robot_id: self.plan_and_reserve(start, goal, robot_id=robot_id)
+            for robot_id, start, goal in requests
+        }
+
+    def reserve_plan(self, path, robot_id=None, t0=0):
+        """Reserve a planned path, its edges and the parked-goal dwell from ``t0``."""
+        table = self.reservation_table
+        table.reserve_path(path, robot_id=robot_id, t0=t0)
+        table.reserve_edges(path, t0=t0, robot_id=robot_id)
+        table.reserve_goal_forever(path[-1][0], path[-1][1], start_time=t0 + len(path), robot_id=robot_id)
+        table.reserve_cell(path[0][0], path[0][1], t0, robot_id=robot_id)
@@ -0,0 +1,359 @@
+## warehouse_sim/core/planner/cbs.py
+"""
+Conflict-Based Search (CBS) with an optional bounded-suboptimal ECBS mode.
+
+The high level keeps a constraint tree: every node holds one path per agent
+plus the vertex/edge constraints that produced them, and splits on the first
+conflict between two paths. The low level is a space-time A* over the
+occupancy grid that also honours the shared reservation table.
+
+With ``suboptimality`` w > 1 both levels run focal search (ECBS): among the
+nodes whose cost is within w times the current lower bound, the one with the
+fewest conflicts against the other agents is expanded first. w = 1 is plain
+CBS with conflict-count tie-breaking.
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from warehouse_sim import config
+from warehouse_sim.core.planner.base import BasePlanner, PlannerStats, PlanResult, PlanStatus
+from warehouse_sim.core.planner.heuristics import ManhattanHeuristic
+
+MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1), (0, 0)]
+INF = float('inf')
+
+
+class _Node:
+    """Constraint-tree node."""
+
+    __slots__ = ("constraints", "paths", "lower_bounds", "cost", "lower_bound", "conflicts")
+
+    def __init__(self, constraints, paths, lower_bounds):
+        self.constraints = constraints    # agent -> (vertex set, edge set)
+        self.paths = paths                # agent -> path
+        self.lower_bounds = lower_bounds  # agent -> f_min of its low-level search
+        self.cost = sum(len(p) - 1 for p in paths)
+        self.lower_bound = sum(lower_bounds)
+        self.conflicts = None
+
+
+class CBSPlanner(BasePlanner):
+    def __init__(self, occupancy_grid, reservation_table, heuristic=None, suboptimality=1.0,
+                 max_nodes=config.CBS_MAX_NODES,
+                 max_time_horizon=config.PLANNER_MAX_TIME_HORIZON,
+                 max_expansions=config.PLANNER_MAX_EXPANSIONS,
+                 time_budget=config.PLANNER_TIME_BUDGET_S):
+        """
+        Args:
+            suboptimality (float): ECBS weight w >= 1 (1 = optimal CBS).
+            max_nodes (int): Constraint-tree nodes expanded before giving up.
+            max_expansions (int): Budget of each low-level search.
+            time_budget (float): Wall-clock seconds for a whole batch.
+        """
+        self.grid = occupancy_grid
+        self.reservation_table = reservation_table
+        self.heuristic_provider = heuristic or ManhattanHeuristic()
+        self.suboptimality = max(1.0, suboptimality)
+        self.max_nodes = max_nodes
+        self.max_time_horizon = max_time_horizon
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+        self.stats = PlannerStats()
+        self.last_result = None
+
+    def plan(self, start, goal):
+        started = time.perf_counter()
+        path, _, status, expansions = self._low_level(start, goal, set(), set(), {}, started)
+        result = PlanResult(path, status, expansions, time.perf_counter() - started)
+        self.last_result = result
+        self.stats.record(result)
+        return path
+
+    def plan_and_reserve(self, start, goal, robot_id=None):
+        t0 = self.reservation_table.now
+        path = self.plan(start, goal)
+        if path:
+            self.reserve_plan(path, robot_id=robot_id, t0=t0)
+        return path
+
+    def plan_batch_and_reserve(self, requests):
+        """
+        Plan ``[(robot_id, start, goal), ...]`` jointly and reserve the result.
+        Falls back to sequential planning if the search exceeds its limits.
+        """
+        if len(requests) <= 1:
+            return super().plan_batch_and_reserve(requests)
+
+        t0 = self.reservation_table.now
+        result = self.search([start for _, start, _ in requests], [goal for _, _, goal in requests])
+        if not result.found:
+            logging.warning(f"[CBS] Batch of {len(requests)} {result.status.name} after "
+                            f"{result.expansions} nodes, falling back to sequential planning")
+            return super().plan_batch_and_reserve(requests)
+
+        paths = {}
+        for (robot_id, _, _), path in zip(requests, result.path):
+            self.reserve_plan(path, robot_id=robot_id, t0=t0)
+            paths[robot_id] = path
+        return paths
+
+    def search(self, starts, goals):
+        """
+        Run (E)CBS for a batch of agents.
+
+        Returns:
+            PlanResult: ``path`` is a list of per-agent paths (or None);
+            ``expansions`` counts constraint-tree nodes.
+        """
+        started = time.perf_counter()
+        result = self._high_level(list(starts), list(goals), started)
+        result.elapsed = time.perf_counter() - started
+        self.last_result = result
+        self.stats.record(result)
+        return result
+
+    # --- High level ---
+
+    def _high_level(self, starts, goals, started):
+        n = len(starts)
+        w = self.suboptimality
+        deadline = started + self.time_budget if self.time_budget is not None else None
+
+        constraints = [(set(), set()) for _ in range(n)]
+        paths, lower_bounds = [], []
+        for i in range(n):
+            path, f_min, status, _ = self._low_level(
+                starts[i], goals[i], *constraints[i], self._occupancy_of(paths), started
+            )
+            if path is None:
+                return PlanResult(None, status)
+            paths.append(path)
+            lower_bounds.append(f_min)
+
+        root = _Node(constraints, paths, lower_bounds)
+        root.conflicts = self._count_conflicts(root.paths)
+        open_nodes = [root]
+        expanded = 0
+
+        while open_nodes:
+            if deadline is not None and time.perf_counter() > deadline:
+                return PlanResult(None, PlanStatus.TIME_LIMIT, expanded)
+            if expanded >= self.max_nodes:
+                return PlanResult(None, PlanStatus.EXPANSION_LIMIT, expanded)
+
+            # Focal selection: fewest conflicts among nodes within w of the best bound.
+            bound = w * min(node.lower_bound for node in open_nodes)
+            node = min(
+                (nd for nd in open_nodes if nd.cost <= bound),
+                key=lambda nd: (nd.conflicts, nd.cost),
+                default=None,
+            ) or min(open_nodes, key=lambda nd: (nd.lower_bound, nd.conflicts))
+            open_nodes.remove(node)
+
+            conflict = self._first_conflict(node.paths)
+            if conflict is None:
+                return PlanResult(node.paths, PlanStatus.FOUND, expanded)
+            expanded += 1
+
+            kind, a, b, where, t = conflict
+            for agent, constraint in self._split(kind, a, b, where, t):
+                vertex, edge = node.constraints[agent]
+                vertex, edge = set(vertex), set(edge)
+                (vertex if constraint[0] == "vertex" else edge).add(constraint[1])
+
+                others = node.paths[:agent] + node.paths[agent + 1:]
+                path, f_min, _, _ = self._low_level(
+                    starts[agent], goals[agent], vertex, edge, self._occupancy_of(others), started
+                )
+                if path is None:
+                    continue
+
+                child_constraints = list(node.constraints)
+                child_constraints[agent] = (vertex, edge)
+                child_paths = list(node.paths)
+                child_paths[agent] = path
+                child_bounds = list(node.lower_bounds)
+                child_bounds[agent] = f_min
+                child = _Node(child_constraints, child_paths, child_bounds)
+                child.conflicts = self._count_conflicts(child.paths)
+                open_nodes.append(child)
+
+        return PlanResult(None, PlanStatus.NO_PATH, expanded)
+
+    @staticmethod
+    def _split(kind, a, b, where, t):
+        if kind == "vertex":
+            return [(a, ("vertex", (where, t))), (b, ("vertex", (where, t)))]
+        from_a, to_a = where
+        return [(a, ("edge", (from_a, to_a, t))), (b, ("edge", (to_a, from_a, t)))]
+
+    @staticmethod
+    def _at(path, t):
+        return path[t] if t < len(path) else path[-1]  # Parked at the goal afterwards
+
+    def _first_conflict(self, paths):
+        horizon = max(len(p) for p in paths)
+        for t in range(horizon):
+            seen = {}
+            for i, path in enumerate(paths):
+                pos = self._at(path, t)
+                if pos in seen:
+                    return ("vertex", seen[pos], i, pos, t)
+                seen[pos] = i
+            if t == 0:
+                continue
+            for i, path in enumerate(paths):
+                prev, pos = self._at(path, t - 1), self._at(path, t)
+                if prev == pos:
+                    continue
+                j = seen.get(prev)
+                if j is not None and j != i and self._at(paths[j], t - 1) == pos:
+                    return ("edge", i, j, (prev, pos), t)
+        return None
+
+    def _count_conflicts(self, paths):
+        count = 0
+        horizon = max(len(p) for p in paths)
+        for t in range(horizon):
+            seen = {}
+            for i, path in enumerate(paths):
+                pos = self._at(path, t)
+                if pos in seen:
+                    count += 1
+                else:
+                    seen[pos] = i
+                if t > 0:
+                    prev = self._at(path, t - 1)
+                    j = seen.get(prev)
+                    if prev != pos and j is not None and j != i and self._at(paths[j], t - 1) == pos:
+                        count += 1
+        return count
+
+    def _occupancy_of(self, paths):
+        """Index other agents' paths for ECBS conflict counting (empty for plain CBS)."""
+        if self.suboptimality <= 1.0 or not paths:
+            return {}
+        occupied = {}
+        for path in paths:
+            for t, pos in enumerate(path):
+                occupied[(pos, t)] = occupied.get((pos, t), 0) + 1
+                if t > 0 and path[t - 1] != pos:
+                    occupied[(path[t - 1], pos, t)] = 1
+        occupied["parked"] = {p[-1]: len(p) - 1 for p in paths}
+        return occupied
+
+    # --- Low level ---
+
+    def _low_level(self, start, goal, vertex_constraints, edge_constraints, others, started):
+        """
+        Space-time (focal) A* for one agent under CBS constraints.
+
+        Returns:
+            (path, f_min, status, expansions): ``path`` is relative to t = 0
+            (the table's ``now``) and ``f_min`` is the lower bound used by ECBS.
+        """
+        h_goal = self.heuristic_provider.for_goal(goal)
+        if h_goal(start) == INF:
+            return None, INF, PlanStatus.NO_PATH, 0
+
+        width, height = self.grid.shape
+        table = self.reservation_table
+        now = table.now
+        w = self.suboptimality
+        t_max = self.max_time_horizon if self.max_time_horizon is not None else INF
+        deadline = started + self.time_budget if self.time_budget is not None else None
+        # The agent may only finish once nothing constrains its goal cell any more.
+        settle = max((t for cell, t in vertex_constraints if cell == goal), default=-1)
+
+        def h(pos, t):
+            return max(h_goal(pos), settle + 1 - t)
+
+        def conflicts_at(prev, pos, t):
+            if not others:
+                return 0
+            count = others.get((pos, t), 0) + others.get((pos, prev, t), 0)
+            parked_since = others["parked"].get(pos)
+            if parked_since is not None and t > parked_since:
+                count += 1
+            return count
+
+        counter = itertools.count()
+        root = (start, 0)
+        g_score = {root: 0}
+        came_from = {}
+        closed = set()
+        n_conf = {root: 0}
+        open_heap = [(h(start, 0), next(counter), root)]
+        focal = [(0, h(start, 0), 0, next(counter), root)]  # (conflicts, f, -t, tie, node)
+        pending = []  # Generated nodes not yet inside the focal bound
+        expansions = 0
+        pruned = False
+
+        while open_heap:
+            while open_heap and open_heap[0][2] in closed:
+                heapq.heappop(open_heap)
+            if not open_heap:
+                break
+            f_min = open_heap[0][0]
+            bound = w * f_min
+            while pending and pending[0][0] <= bound:
+                f, _, node = heapq.heappop(pending)
+                if node not in closed:
+                    heapq.heappush(focal, (n_conf[node], f, -node[1], next(counter), node))
+            while focal and focal[0][4] in closed:
+                heapq.heappop(focal)
+            if not focal:
+                _, _, node = open_heap[0]
+                heapq.heappush(focal, (n_conf[node], f_min, -node[1], next(counter), node))
+            state = heapq.heappop(focal)[4]
+            closed.add(state)
+            current, t = state
+
+            if current == goal and t > settle:
+                path = [current]
+                while state in came_from:
+                    state = came_from[state]
+                    path.append(state[0])
+                return list(reversed(path)), f_min, PlanStatus.FOUND, expansions
+
+            expansions += 1
+            if self.max_expansions is not None and expansions >= self.max_expansions:
+                return None, INF, PlanStatus.EXPANSION_LIMIT, expansions
+            if deadline is not None and expansions % 256 == 0 and time.perf_counter() > deadline:
+                return None, INF, PlanStatus.TIME_LIMIT, expansions
+            if t >= t_max:
+                pruned = True
+                continue
+
+            for dx, dy in MOVES:
+                nx, ny = current[0] + dx, current[1] + dy
+                if not (0 <= nx < width and 0 <= ny < height) or self.grid[nx, ny] == 1:
+                    continue
+                next_pos = (nx, ny)
+                key = (next_pos, t + 1)
+                if key in closed:
+                    continue
+                if key in vertex_constraints or (current, next_pos, t + 1) in edge_constraints:
+                    continue
+                if table.is_reserved(nx, ny, now + t + 1):
+                    continue
+                if table.is_edge_reserved(current, next_pos, now + t + 1):
+                    continue
+
+                tentative_g = g_score[state] + 1
+                if tentative_g < g_score.get(key, INF):
+                    g_score[key] = tentative_g
+                    came_from[key] = state
+                    n_conf[key] = n_conf[state] + conflicts_at(current, next_pos, t + 1)
+                    f = tentative_g + h(next_pos, t + 1)
+                    tie = next(counter)
+                    heapq.heappush(open_heap, (f, tie, key))
+                    if f <= bound:
+                        heapq.heappush(focal, (n_conf[key], f, -(t + 1), tie, key))
+                    else:
+                        heapq.heappush(pending, (f, tie, key))
+
+        status = PlanStatus.HORIZON_EXCEEDED if pruned else PlanStatus.NO_PATH
+        return None, INF, status, expansions
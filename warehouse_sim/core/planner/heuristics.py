@@ -0,0 +1,124 @@
+## warehouse_sim/core/planner/heuristics.py
+"""
+Heuristic providers for grid planners.
+
+A provider hands out a per-goal distance function via ``for_goal(goal)`` so a
+planner resolves the goal once per search instead of once per expansion.
+"""
+
+from collections import OrderedDict, deque
+
+import numpy as np
+from warehouse_sim import config
+
+
+class ManhattanHeuristic:
+    def for_goal(self, goal):
+        gx, gy = goal
+        return lambda pos: abs(pos[0] - gx) + abs(pos[1] - gy)
+
+    def stats(self):
+        return {"type": "manhattan"}
+
+
+class DistanceMapHeuristic:
+    def __init__(self, occupancy_grid, cache_size=config.HEURISTIC_CACHE_SIZE):
+        """
+        True shortest-path distances over the static occupancy grid, computed
+        by a backward BFS from each goal and kept in a bounded LRU cache.
+
+        Args:
+            occupancy_grid (np.ndarray): Grid of 0 (free) / 1 (obstacle).
+            cache_size (int): Maximum number of goal maps held at once.
+        """
+        self.grid = occupancy_grid
+        self.cache_size = cache_size
+        self._maps = OrderedDict()  # goal -> [np.ndarray of distances, flat list or None]
+        self.hits = 0
+        self.misses = 0
+
+    def distance_map(self, goal):
+        """Return the (W, H) array of distances to ``goal`` (inf = unreachable)."""
+        return self._entry(goal)[0]
+
+    def flat_map(self, goal):
+        """
+        Distances to ``goal`` as a flat list indexed ``x * H + y``, built once
+        per cached map. Entries point at one shared float per distinct value,
+        so the list costs a pointer per cell.
+        """
+        entry = self._entry(goal)
+        if entry[1] is None:
+            dist = entry[0].ravel()
+            finite = np.isfinite(dist)
+            top = int(dist[finite].max()) + 1 if finite.any() else 0
+            values = [float(v) for v in range(top)] + [float('inf')]
+            codes = np.where(finite, dist, top).astype(np.int64)
+            entry[1] = list(map(values.__getitem__, codes.tolist()))
+        return entry[1]
+
+    def _entry(self, goal):
+        entry = self._maps.get(goal)
+        if entry is not None:
+            self.hits += 1
+            self._maps.move_to_end(goal)
+            return entry
+
+        self.misses += 1
+        entry = [self._bfs(goal), None]
+        self._maps[goal] = entry
+        if len(self._maps) > self.cache_size:
+            self._maps.popitem(last=False)
+        return entry
+
+    def for_goal(self, goal):
+        flat = self.flat_map(goal)
+        height = self.grid.shape[1]
+        return lambda pos: flat[pos[0] * height + pos[1]]
+
+    def invalidate(self):
+        """Drop all cached maps (call after the occupancy grid changes)."""
+        self._maps.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "type": "distance_map",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "cached_goals": len(self._maps),
+        }
+
+    def _bfs(self, goal):
+        width, height = self.grid.shape
+        free = (self.grid == 0).ravel().tolist()
+        dist = [-1] * (width * height)
+        start = goal[0] * height + goal[1]
+        dist[start] = 0
+        queue = deque([start])
+
+        while queue:
+            idx = queue.popleft()
+            d = dist[idx] + 1
+            x, y = divmod(idx, height)
+            if x > 0 and free[idx - height] and dist[idx - height] < 0:
+                dist[idx - height] = d
+                queue.append(idx - height)
+            if x < width - 1 and free[idx + height] and dist[idx + height] < 0:
+                dist[idx + height] = d
+                queue.append(idx + height)
+            if y > 0 and free[idx - 1] and dist[idx - 1] < 0:
+                dist[idx - 1] = d
+                queue.append(idx - 1)
+            if y < height - 1 and free[idx + 1] and dist[idx + 1] < 0:
+                dist[idx + 1] = d
+                queue.append(idx + 1)
+
+        result = np.array(dist, dtype=np.float64).reshape(width, height)
+        result[result < 0] = np.inf
+        return result
@@ -0,0 +1,397 @@
+## warehouse_sim/core/planner/hpa.py
+"""
+Hierarchical A* (HPA*) for large grids.
+
+The grid is cut into square clusters. Wherever two neighbouring clusters
+share a free stretch of border, one or two entrance cell pairs connect them
+(one in the middle of short stretches, one at each end of long ones). Inside
+a cluster every entrance is linked to every other by its shortest distance
+within the cluster. A trip is first searched on this abstract graph
+(entrances, plus the start and goal joined to their own cluster's
+entrances). Each hop is then refined as a space-time A* against the
+reservation table, confined to the hop's cluster and guided by exact
+in-cluster distances, so the full-grid search never runs. Hops that begin
+after a windowed table's last frame see no reservations and follow the
+in-cluster distances directly.
+
+Borders and intra-cluster distances are computed the first time a search
+touches them. ``update`` drops them for clusters whose occupancy changed.
+Short trips (same cluster, or closer than one cluster) and trips whose
+refinement gets stuck use the plain space-time A* of ``AStarPlanner``.
+"""
+
+import heapq
+import time
+from collections import deque
+
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.base import PlanResult, PlanStatus
+
+INF = float('inf')
+
+
+class _Cluster:
+    """Entrances of one cluster and their distance maps within it."""
+
+    def __init__(self, bounds, entrances, grid):
+        self.bounds = bounds  # (x0, y0, x1, y1), exclusive ends
+        self.entrances = entrances
+        self.maps = {cell: _local_bfs(grid, bounds, cell) for cell in entrances}
+        self.edges = {
+            cell: [(other, self.distance(self.maps[cell], other)) for other in entrances
+                   if other != cell and self.distance(self.maps[cell], other) < INF]
+            for cell in entrances
+        }
+
+    def distance(self, local_map, cell):
+        x0, y0, _, y1 = self.bounds
+        return local_map[(cell[0] - x0) * (y1 - y0) + cell[1] - y0]
+
+
+def _local_bfs(grid, bounds, source):
+    """Distances from ``source`` to every cell of ``bounds`` moving only inside it (flat list, INF = unreachable)."""
+    x0, y0, x1, y1 = bounds
+    height = y1 - y0
+    free = (grid[x0:x1, y0:y1] == 0).ravel().tolist()
+    dist = [INF] * len(free)
+    start = (source[0] - x0) * height + source[1] - y0
+    dist[start] = 0
+    queue = deque([start])
+    size = len(free)
+    while queue:
+        idx = queue.popleft()
+        d = dist[idx] + 1
+        y = idx % height
+        for nxt in (idx - height, idx + height, idx - 1 if y > 0 else -1, idx + 1 if y < height - 1 else -1):
+            if 0 <= nxt < size and free[nxt] and dist[nxt] == INF:
+                dist[nxt] = d
+                queue.append(nxt)
+    return dist
+
+
+class HPAStarPlanner(AStarPlanner):
+    def __init__(self, occupancy_grid, reservation_table, heuristic=None,
+                 cluster_size=config.HPA_CLUSTER_SIZE, **limits):
+        """
+        Args:
+            occupancy_grid (np.ndarray): Grid of 0 (free) / 1 (obstacle).
+            reservation_table: Shared reservation table.
+            heuristic: Heuristic provider for the flat A* fallback.
+            cluster_size (int): Cluster side in cells.
+            **limits: max_time_horizon, max_expansions and time_budget as for
+                AStarPlanner; the horizon applies to each refined hop, the
+                other two to the whole trip.
+        """
+        super().__init__(occupancy_grid, reservation_table, heuristic=heuristic, **limits)
+        self.cluster_size = cluster_size
+        width, height = occupancy_grid.shape
+        self.clusters_x = -(-width // cluster_size)
+        self.clusters_y = -(-height // cluster_size)
+        self._borders = {}   # (cluster, neighbour on +x or +y) -> [(cell, cell across), ...]
+        self._clusters = {}  # cluster -> _Cluster
+        self._snapshot = np.array(occupancy_grid, dtype=np.uint8)
+        self.abstract_searches = 0
+        self.fallbacks = 0  # Trips re-planned on the full grid after a refinement failed
+        self.clusters_touched = 0  # Clusters containing changed cells, over every update
+        self.clusters_dropped = 0  # Built clusters discarded by updates (rebuilt on next use)
+
+    # --- Abstraction ---
+
+    def cluster_of(self, cell):
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def _bounds(self, cluster):
+        width, height = self.grid.shape
+        x0, y0 = cluster[0] * self.cluster_size, cluster[1] * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, width), min(y0 + self.cluster_size, height)
+
+    def _border(self, cluster, axis):
+        """Entrance pairs between ``cluster`` and its neighbour along +x (axis 0) or +y (axis 1)."""
+        key = (cluster, axis)
+        pairs = self._borders.get(key)
+        if pairs is not None:
+            return pairs
+        pairs = []
+        x0, y0, x1, y1 = self._bounds(cluster)
+        if axis == 0 and cluster[0] + 1 < self.clusters_x:
+            inside = [(x1 - 1, y) for y in range(y0, y1)]
+            across = [(x1, y) for y in range(y0, y1)]
+        elif axis == 1 and cluster[1] + 1 < self.clusters_y:
+            inside = [(x, y1 - 1) for x in range(x0, x1)]
+            across = [(x, y1) for x in range(x0, x1)]
+        else:
+            inside = across = []
+        open_ = [self.grid[a] == 0 and self.grid[b] == 0 for a, b in zip(inside, across)]
+        k = 0
+        while k < len(open_):
+            if not open_[k]:
+                k += 1
+                continue
+            end = k
+            while end + 1 < len(open_) and open_[end + 1]:
+                end += 1
+            if end - k + 1 < config.HPA_ENTRANCE_SPLIT:
+                picks = [(k + end) // 2]
+            else:
+                picks = [k, end]
+            pairs.extend((inside[i], across[i]) for i in picks)
+            k = end + 1
+        self._borders[key] = pairs
+        return pairs
+
+    def _crossings(self, cluster):
+        """cell -> cells across the border, for every entrance of ``cluster``."""
+        cx, cy = cluster
+        crossings = {}
+        for axis in (0, 1):
+            for inside, across in self._border(cluster, axis):
+                crossings.setdefault(inside, []).append(across)
+        for neighbour, axis in (((cx - 1, cy), 0), ((cx, cy - 1), 1)):
+            if neighbour[0] >= 0 and neighbour[1] >= 0:
+                for across, inside in self._border(neighbour, axis):
+                    crossings.setdefault(inside, []).append(across)
+        return crossings
+
+    def _cluster(self, cluster):
+        data = self._clusters.get(cluster)
+        if data is None:
+            crossings = self._crossings(cluster)
+            data = _Cluster(self._bounds(cluster), list(crossings), self.grid)
+            data.crossings = crossings
+            self._clusters[cluster] = data
+        return data
+
+    def update(self, cells=None):
+        """
+        Rebuild the abstraction around changed cells (call after editing the
+        occupancy grid). Without ``cells`` the grid is compared with the copy
+        taken at the last update. Returns the number of clusters invalidated.
+        """
+        if cells is None:
+            cells = np.argwhere(self._snapshot != self.grid)
+        touched = {self.cluster_of((int(x), int(y))) for x, y in cells}
+        for cx, cy in touched:
+            for axis in (0, 1):
+                self._borders.pop(((cx, cy), axis), None)
+            self._borders.pop(((cx - 1, cy), 0), None)
+            self._borders.pop(((cx, cy - 1), 1), None)
+            for neighbour in ((cx, cy), (cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                if self._clusters.pop(neighbour, None) is not None:
+                    self.clusters_dropped += 1
+        self._snapshot[...] = self.grid
+        self.clusters_touched += len(touched)
+        return len(touched)
+
+    def abstraction_stats(self):
+        return {
+            "cluster_size": self.cluster_size,
+            "clusters": self.clusters_x * self.clusters_y,
+            "clusters_built": len(self._clusters),
+            "clusters_touched": self.clusters_touched,
+            "clusters_dropped": self.clusters_dropped,
+            "abstract_searches": self.abstract_searches,
+            "fallbacks": self.fallbacks,
+        }
+
+    # --- Search ---
+
+    def _search(self, start, goal, started):
+        close = abs(start[0] - goal[0]) + abs(start[1] - goal[1]) <= self.cluster_size
+        if close or self.cluster_of(start) == self.cluster_of(goal):
+            return super()._search(start, goal, started)
+
+        route, expansions = self._abstract_route(start, goal)
+        if route is None:
+            return PlanResult(None, PlanStatus.NO_PATH, expansions)
+        result = self._refine_route(start, route, started, expansions)
+        if result.found or result.status == PlanStatus.TIME_LIMIT:
+            return result
+        self.fallbacks += 1
+        flat = super()._search(start, goal, started)
+        flat.expansions += result.expansions
+        flat.heap_pushes += result.heap_pushes
+        return flat
+
+    def _abstract_route(self, start, goal):
+        """
+        Cheapest entrance sequence from ``start`` to ``goal``.
+
+        Returns:
+            tuple: ([(cell, distance map to reach it or None), ...] ending at
+            ``goal``, or None; abstract expansions).
+        """
+        self.abstract_searches += 1
+        start_cluster, goal_cluster = self.cluster_of(start), self.cluster_of(goal)
+        start_data, goal_data = self._cluster(start_cluster), self._cluster(goal_cluster)
+        from_start = _local_bfs(self.grid, start_data.bounds, start)
+        to_goal = _local_bfs(self.grid, goal_data.bounds, goal)
+        start_edges = [(cell, start_data.distance(from_start, cell)) for cell in start_data.entrances]
+        goal_entrances = {cell: goal_data.distance(to_goal, cell) for cell in goal_data.entrances}
+
+        gx, gy = goal
+        g_score = {start: 0}
+        came_from = {}
+        open_set = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+        closed = set()
+        expansions = 0
+        while open_set:
+            _, g, node = heapq.heappop(open_set)
+            if node in closed:
+                continue
+            closed.add(node)
+            if node == goal:
+                break
+            expansions += 1
+            if node == start:
+                edges = start_edges + [(across, 1) for across in start_data.crossings.get(start, [])]
+            else:
+                data = self._cluster(self.cluster_of(node))
+                edges = data.edges[node] + [(across, 1) for across in data.crossings[node]]
+                if node in goal_entrances:
+                    edges = edges + [(goal, goal_entrances[node])]
+            for neighbour, cost in edges:
+                if cost == INF or neighbour in closed:
+                    continue
+                tentative = g + cost
+                if tentative < g_score.get(neighbour, INF):
+                    g_score[neighbour] = tentative
+                    came_from[neighbour] = node
+                    f = tentative + abs(neighbour[0] - gx) + abs(neighbour[1] - gy)
+                    heapq.heappush(open_set, (f, tentative, neighbour))
+        if goal not in closed:
+            return None, expansions
+
+        nodes = [goal]
+        while nodes[-1] != start:
+            nodes.append(came_from[nodes[-1]])
+        nodes.reverse()
+        route = []
+        for previous, node in zip(nodes, nodes[1:]):
+            if self.cluster_of(previous) != self.cluster_of(node):
+                route.append((node, None, None))  # One step across a border
+            elif node == goal:
+                route.append((goal, goal_data.bounds, to_goal))
+            else:
+                data = self._cluster(self.cluster_of(node))
+                route.append((node, data.bounds, data.maps[node]))
+        return route, expansions
+
+    def _refine_route(self, start, route, started, expansions):
+        """Turn the abstract route into one cell per frame, hop by hop, from the table's "now"."""
+        table = self.reservation_table
+        window_end = getattr(table, "window_end", None)
+        deadline = started + self.time_budget if self.time_budget is not None else None
+        path = [start]
+        pushes = 0
+        for target, bounds, local_map in route:
+            t = table.now + len(path) - 1
+            if bounds is None:
+                segment, used, pushed, status = self._cross(path[-1], target, t)
+            elif window_end is not None and t > window_end:
+                segment, used, pushed, status = self._descend(path[-1], bounds, local_map), 0, 0, None
+            else:
+                budget = None if self.max_expansions is None else self.max_expansions - expansions
+                segment, used, pushed, status = self._refine_hop(path[-1], target, t, bounds, local_map,
+                                                                 budget, deadline)
+            expansions += used
+            pushes += pushed
+            if segment is None:
+                return PlanResult(None, status, expansions, heap_pushes=pushes)
+            path.extend(segment[1:])
+        return PlanResult(path, PlanStatus.FOUND, expansions, heap_pushes=pushes)
+
+    def _cross(self, cell, target, t):
+        """Step across a border, waiting on ``cell`` until the move is free."""
+        table = self.reservation_table
+        limit = self.max_time_horizon if self.max_time_horizon is not None else config.PLANNER_MAX_TIME_HORIZON
+        for wait in range(limit):
+            arrive = t + wait + 1
+            if not table.is_reserved(target[0], target[1], arrive) and \
+                    not table.is_edge_reserved(cell, target, arrive):
+                return [cell] * (wait + 1) + [target], 0, 0, None
+            if table.is_reserved(cell[0], cell[1], arrive):
+                break  # Cannot stay put either
+        return None, 0, 0, PlanStatus.NO_PATH
+
+    @staticmethod
+    def _descend(cell, bounds, local_map):
+        """Shortest in-cluster path to the map's source, ignoring reservations."""
+        x0, y0, x1, y1 = bounds
+        height = y1 - y0
+        path = [cell]
+        d = local_map[(cell[0] - x0) * height + cell[1] - y0]
+        while d > 0:
+            x, y = path[-1]
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if x0 <= nx < x1 and y0 <= ny < y1 and local_map[(nx - x0) * height + ny - y0] == d - 1:
+                    path.append((nx, ny))
+                    break
+            d -= 1
+        return path
+
+    def _refine_hop(self, start, goal, t0, bounds, local_map, budget, deadline):
+        """
+        Space-time A* from ``start`` at ``t0`` to ``goal`` without leaving
+        ``bounds``, using the exact in-cluster distances as the heuristic.
+
+        Returns:
+            tuple: (path or None, expansions, heap pushes, failure status).
+        """
+        x0, y0, x1, y1 = bounds
+        height = y1 - y0
+        table = self.reservation_table
+        t_max = t0 + self.max_time_horizon if self.max_time_horizon is not None else None
+
+        def h(cell):
+            return local_map[(cell[0] - x0) * height + cell[1] - y0]
+
+        open_set = [(h(start), t0, start)]
+        came_from = {}
+        g_score = {(start, t0): 0}
+        closed = set()
+        expansions = 0
+        pushes = 1
+        pruned = False
+        while open_set:
+            _, t, current = heapq.heappop(open_set)
+            if (current, t) in closed:
+                continue
+            closed.add((current, t))
+            if current == goal:
+                path = [current]
+                while (current, t) in came_from:
+                    current, t = came_from[(current, t)]
+                    path.append(current)
+                return list(reversed(path)), expansions, pushes, None
+
+            expansions += 1
+            if budget is not None and expansions >= budget:
+                return None, expansions, pushes, PlanStatus.EXPANSION_LIMIT
+            if deadline is not None and expansions % 256 == 0 and time.perf_counter() > deadline:
+                return None, expansions, pushes, PlanStatus.TIME_LIMIT
+            if t_max is not None and t >= t_max:
+                pruned = True
+                continue
+
+            tentative_g = g_score[(current, t)] + 1
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1), (0, 0)):
+                nx, ny = current[0] + dx, current[1] + dy
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                d = local_map[(nx - x0) * height + ny - y0]
+                if d == INF:
+                    continue  # Obstacle, or cut off from the goal inside this cluster
+                next_pos = (nx, ny)
+                key = (next_pos, t + 1)
+                if key in closed or table.is_reserved(nx, ny, t + 1) or \
+                        table.is_edge_reserved(current, next_pos, t + 1):
+                    continue
+                if tentative_g < g_score.get(key, INF):
+                    g_score[key] = tentative_g
+                    came_from[key] = (current, t)
+                    heapq.heappush(open_set, (tentative_g + d, t + 1, next_pos))
+                    pushes += 1
+
+        return None, expansions, pushes, PlanStatus.HORIZON_EXCEEDED if pruned else PlanStatus.NO_PATH
@@ -0,0 +1,287 @@
+## warehouse_sim/core/planner/incremental.py
+"""
+Incremental re-planning for robots that are blocked on their way to a goal.
+
+A robot's first block on a trip is re-planned with an ordinary search. From
+then on it keeps a D* Lite search rooted at its goal: g / rhs distances over
+the static grid, where cells other robots hold around it are made expensive
+(not walled off, since they usually clear within a few frames). When the
+same robot is blocked again, only the cells whose blocked state changed since
+the last call are updated and the search is resumed from where the robot now
+stands, so repeated blocks in a busy aisle repair a few vertices instead of
+searching from scratch. The repaired distances then steer the world's own
+space-time A* planner (its heuristic fills in where they are not settled),
+which produces the path actually reserved and records the search in its
+stats. Robots that are only blocked once never pay for building a search.
+
+State is dropped when a robot's goal changes.
+"""
+
+import heapq
+import time
+from warehouse_sim import config
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.base import PlanStatus
+
+INF = float('inf')
+TIE_BREAK = 1.001  # Scales h so equal-f states go deepest first (at most one move longer below 1000)
+REPLAN_MODES = ("auto", "incremental", "full")
+
+
+def use_incremental(mode, planner):
+    """
+    Whether blocked robots of ``planner`` are re-planned incrementally.
+
+    ``auto`` does so only for the plain space-time A* planner; other planners
+    keep their own searches. ``incremental`` also accepts A*-based planners
+    (HPA*, topology), whose searches are then steered by the repaired
+    distances.
+
+    Raises:
+        ValueError: Unknown ``mode``, or ``incremental`` for a planner that
+            is not A*-based.
+    """
+    if mode not in REPLAN_MODES:
+        raise ValueError(f"Unknown replan mode: {mode} (expected one of {', '.join(REPLAN_MODES)})")
+    if mode == "auto":
+        return type(planner) is AStarPlanner
+    if mode == "incremental" and not isinstance(planner, AStarPlanner):
+        raise ValueError(f"Incremental re-planning needs an A*-based planner, not {type(planner).__name__}")
+    return mode == "incremental"
+
+
+class DStarLite:
+    """
+    D* Lite distances from every cell to ``goal`` on a 4-connected grid.
+    Entering a cell in ``blocked`` costs ``1 + penalty``; every other move
+    costs 1. Searches backwards from the goal towards ``start``.
+    """
+
+    def __init__(self, grid, goal, start, penalty=config.REPLAN_BLOCK_PENALTY, neighbours=None):
+        """
+        Args:
+            neighbours (dict, optional): Cell -> free 4-neighbours cache,
+                filled lazily and shareable between searches on ``grid``.
+        """
+        self.grid = grid
+        self._adjacent = {} if neighbours is None else neighbours
+        self.goal = goal
+        self.start = start
+        self.penalty = penalty
+        self.blocked = set()
+        self.km = 0
+        self.g = {}
+        self.rhs = {goal: 0}
+        self.open = [(self._key(goal), goal)]
+        self.expansions = 0  # Vertices expanded since the search was created
+
+    def _h(self, cell):
+        return abs(cell[0] - self.start[0]) + abs(cell[1] - self.start[1])
+
+    def _key(self, cell):
+        m = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        return (m + self._h(cell) + self.km, m)
+
+    def _neighbours(self, cell):
+        adjacent = self._adjacent.get(cell)
+        if adjacent is None:
+            width, height = self.grid.shape
+            x, y = cell
+            adjacent = tuple((nx, ny) for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1))
+                             if 0 <= nx < width and 0 <= ny < height and self.grid[nx, ny] != 1)
+            self._adjacent[cell] = adjacent
+        return adjacent
+
+    def _update(self, cell):
+        g = self.g
+        if cell != self.goal:
+            blocked, penalty = self.blocked, self.penalty
+            best = INF
+            for n in self._neighbours(cell):
+                d = g.get(n, INF) + (1 + penalty if n in blocked else 1)
+                if d < best:
+                    best = d
+            self.rhs[cell] = best
+        if g.get(cell, INF) != self.rhs.get(cell, INF):
+            heapq.heappush(self.open, (self._key(cell), cell))
+
+    def move_to(self, start):
+        """The robot now stands on ``start`` (keys are offset, nothing is re-queued)."""
+        self.km += self._h(start)
+        self.start = start
+
+    def set_blocked(self, cells):
+        """Replace the blocked set, updating only the cells whose state changed."""
+        cells = set(cells)
+        cells.discard(self.goal)
+        changed = cells ^ self.blocked
+        self.blocked = cells
+        for cell in changed:
+            for n in self._neighbours(cell):  # Edges into ``cell`` changed cost
+                self._update(n)
+
+    def compute(self, max_expansions=None):
+        """
+        Resume the search until ``start`` is consistent.
+
+        Returns:
+            int: Vertices expanded by this call.
+        """
+        expansions = 0
+        start = self.start
+        g, rhs, open_set = self.g, self.rhs, self.open
+        while open_set:
+            key, cell = open_set[0]
+            g_cell, rhs_cell = g.get(cell, INF), rhs.get(cell, INF)
+            if g_cell == rhs_cell:
+                heapq.heappop(open_set)  # Stale entry
+                continue
+            if key >= self._key(start) and rhs.get(start, INF) == g.get(start, INF):
+                break
+            current = self._key(cell)
+            if key != current:
+                heapq.heapreplace(open_set, (current, cell))  # Queued before a move or a cost change
+                continue
+            heapq.heappop(open_set)
+            expansions += 1
+            if max_expansions is not None and expansions >= max_expansions:
+                break
+            if g_cell > rhs_cell:
+                g[cell] = rhs_cell
+            else:
+                g[cell] = INF
+                self._update(cell)
+            for n in self._neighbours(cell):
+                self._update(n)
+        self.expansions += expansions
+        return expansions
+
+
+class _RepairHeuristic:
+    """Settled D* Lite distances where known, the planner's own heuristic elsewhere."""
+
+    def __init__(self, search, fallback):
+        self.search = search
+        self.fallback = fallback
+
+    def for_goal(self, goal):
+        static = self.fallback.for_goal(goal)
+        g, rhs = self.search.g, self.search.rhs
+
+        # The repaired distances are close to exact, which leaves long plateaus
+        # of equal f that A* (ties broken towards earlier frames) would sweep.
+        def h(cell):
+            d = g.get(cell, INF)
+            if d == INF or d != rhs.get(cell, INF):
+                d = static(cell)
+            return d * TIE_BREAK
+        return h
+
+
+class IncrementalReplanner:
+    def __init__(self, planner, scan_radius=config.REPLAN_SCAN_RADIUS, penalty=config.REPLAN_BLOCK_PENALTY,
+                 max_repair_expansions=config.PLANNER_MAX_EXPANSIONS):
+        """
+        Args:
+            planner (AStarPlanner): The world's planner. Its grid, reservation
+                table, heuristic (used where the repaired distances are not
+                settled) and limits are used as they are; repair work is
+                added to its stats.
+            scan_radius (int): Cells held by other robots within this
+                Chebyshev distance of the blocked robot count as blocked.
+            penalty (int): Extra cost of entering a blocked cell.
+            max_repair_expansions (int): Cap on D* Lite expansions per call.
+        """
+        self.planner = planner
+        self.grid = planner.grid
+        self.reservation_table = planner.reservation_table
+        self.scan_radius = scan_radius
+        self.penalty = penalty
+        self.max_repair_expansions = max_repair_expansions
+        self._neighbours = {}  # Shared by every robot's search
+        self.searches = {}  # robot_id -> DStarLite towards that robot's current goal
+        self.first_blocks = 0  # Calls searched plainly (no search kept for the goal yet)
+        self.repairs = 0       # Calls that resumed (or first computed) a kept search
+        self.repair_expansions = 0
+        self.repair_time_s = 0.0
+
+    def replan_and_reserve(self, robot_id, start, goal, blocked=(), route=None):
+        """
+        Re-plan ``robot_id`` from ``start`` to its unchanged ``goal`` and
+        reserve the result. Its reservations from now on are released first;
+        if no path is found, ``route`` (the rest of the old path, starting at
+        ``start``) is reserved again from now so the robot keeps its slot.
+
+        Args:
+            blocked (iterable): Cells the robot was just refused, added to the
+                ones found held around it.
+
+        Returns:
+            list or None: The new path, or None when re-planning failed.
+        """
+        table = self.reservation_table
+        now = table.now
+        table.release_robot(robot_id, now)
+
+        planner = self.planner
+        search = self._search_for(robot_id, start, goal)
+        if search is None:
+            result = planner.search(start, goal)
+        else:
+            started = time.perf_counter()
+            search.set_blocked(self._held_cells(robot_id, start, now + 1) | set(blocked))
+            expansions = search.compute(self.max_repair_expansions)
+            elapsed = time.perf_counter() - started
+            self.repair_expansions += expansions
+            self.repair_time_s += elapsed
+            planner.stats.expansions += expansions  # Repair work counts towards the planner's totals
+            planner.stats.time_s += elapsed
+
+            provider = planner.heuristic_provider
+            planner.heuristic_provider = _RepairHeuristic(search, provider)
+            try:
+                result = planner.search(start, goal)
+            finally:
+                planner.heuristic_provider = provider
+
+        if result.status == PlanStatus.FOUND:
+            planner.reserve_plan(result.path, robot_id=robot_id, t0=now)
+            return result.path
+        if route:
+            planner.reserve_plan(route, robot_id=robot_id, t0=now)
+        return None
+
+    def _search_for(self, robot_id, start, goal):
+        """The robot's kept search moved to ``start``, or None (after keeping a new one) on a first block."""
+        search = self.searches.get(robot_id)
+        if search is not None and search.goal == goal:
+            self.repairs += 1
+            search.move_to(start)
+            return search
+        self.first_blocks += 1
+        self.searches[robot_id] = DStarLite(self.grid, goal, start, penalty=self.penalty,
+                                            neighbours=self._neighbours)
+        return None
+
+    def _held_cells(self, robot_id, center, t):
+        """Cells around ``center`` another robot holds at frame ``t``."""
+        table = self.reservation_table
+        width, height = self.grid.shape
+        r = self.scan_radius
+        cx, cy = center
+        held = set()
+        for x in range(max(0, cx - r), min(width, cx + r + 1)):
+            for y in range(max(0, cy - r), min(height, cy + r + 1)):
+                owner = table.get_owner(x, y, t)
+                if owner is not None and owner != robot_id:
+                    held.add((x, y))
+        return held
+
+    def stats(self):
+        return {
+            "robots": len(self.searches),
+            "first_blocks": self.first_blocks,
+            "repairs": self.repairs,
+            "repair_expansions": self.repair_expansions,
+            "repair_time_s": round(self.repair_time_s, 4),
+        }
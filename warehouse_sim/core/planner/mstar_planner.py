@@ -1,80 +1,324 @@
 """
-M* Path Planner (stub)
-Designed for collision-aware multi-agent planning.
+M* Path Planner
+Collision-aware multi-agent planning by subdimensional expansion.
+
+Every agent follows its individually optimal policy (a BFS distance map to its
+goal) until it collides with another agent or with an existing reservation.
+Colliding agents are added to the collision set of the search vertex, and the
+set is back-propagated to all predecessors, which are re-expanded with the
+full move set for exactly those agents. The joint search therefore only
+branches in the coupled subspace where robots actually interact. Batches are
+first split into independent groups so each M* search only carries the
+agents that can actually meet.
 """
 
 from warehouse_sim import config
 import heapq
+import itertools
 import logging
+import time
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.base import BasePlanner, PlannerStats, PlanResult, PlanStatus
+from warehouse_sim.core.planner.heuristics import DistanceMapHeuristic
+
+MOVES = [(-1, 0), (1, 0), (0, -1), (0, 1), (0, 0)]
+INF = float("inf")
+
 
-class MStarPlanner:
-    def __init__(self, occupancy_grid, reservation_table):
+class MStarPlanner(BasePlanner):
+    def __init__(self, occupancy_grid, reservation_table, heuristic=None,
+                 max_time_horizon=config.PLANNER_MAX_TIME_HORIZON,
+                 max_expansions=config.MSTAR_MAX_EXPANSIONS,
+                 time_budget=config.PLANNER_TIME_BUDGET_S):
         self.grid = occupancy_grid
-        self.res_table = reservation_table
+        self.reservation_table = reservation_table
+        # The individual policies need true distances, whatever the single-agent heuristic.
+        if isinstance(heuristic, DistanceMapHeuristic):
+            self.distance_maps = heuristic
+        else:
+            self.distance_maps = DistanceMapHeuristic(occupancy_grid)
+        self.single = AStarPlanner(occupancy_grid, reservation_table, heuristic=heuristic,
+                                   max_time_horizon=max_time_horizon, time_budget=time_budget)
+        self.max_time_horizon = max_time_horizon
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+        self.stats = PlannerStats()
+        self.last_result = None
 
     def plan(self, start, goal):
         """
-        Fallback single-agent A* path. Used for individual agents initially.
+        Single-agent path (plain space-time A*).
         """
         logging.info(f"[M*] Planning single-agent path from {start} to {goal}")
-        return self._a_star(start, goal)
+        return self.single.plan(start, goal)
+
+    def plan_and_reserve(self, start, goal, robot_id=None):
+        t0 = self.reservation_table.now
+        path = self.plan(start, goal)
+        if path:
+            self.reserve_plan(path, robot_id=robot_id, t0=t0)
+        return path
 
     def plan_multiple(self, agents):
         """
-        Plan all agents' paths with shared space-time awareness.
-        Placeholder: independent A* plans (to be replaced with full M* logic).
+        Plan all agents' paths jointly and reserve them.
+
+        Args:
+            agents (list): Objects with ``id``, ``start`` and ``end`` attributes.
+
+        Returns:
+            dict: robot_id -> path for every agent that could be planned.
         """
-        logging.info(f"[M*] Planning for {len(agents)} agents (stub mode)")
-        planned_paths = {}
-        for agent in agents:
-            path = self._a_star(agent.start, agent.end)
-            if path:
-                planned_paths[agent.id] = path
-                self._reserve_path(path, agent.id)
-            else:
-                logging.warning(f"[M*] No path found for Robot {agent.id}")
-        return planned_paths
+        paths = self.plan_batch_and_reserve([(a.id, a.start, a.end) for a in agents])
+        return {robot_id: path for robot_id, path in paths.items() if path}
 
-    def _a_star(self, start, goal):
+    def plan_batch_and_reserve(self, requests):
         """
-        Basic A* for fallback or early development. Integrate M* conflict sets later.
+        Jointly plan ``[(robot_id, start, goal), ...]`` with M* and reserve the
+        result.
+
+        Agents whose individually optimal paths never meet are split into
+        independent groups first; singletons get plain A*, and each coupled
+        group gets its own M* search against the reservations of the groups
+        planned before it. A group falls back to sequential A* if its joint
+        search gives up.
         """
-        moves = [(-1, 0), (1, 0), (0, -1), (0, 1), (0, 0)]
-        open_set = []
-        heapq.heappush(open_set, (0, 0, start))
-        came_from = {}
-        g_score = {(start, 0): 0}
+        paths = {}
+        for group in self._independent_groups(requests):
+            if len(group) == 1:
+                paths.update(super().plan_batch_and_reserve(group))
+                continue
 
-        while open_set:
-            _, t, current = heapq.heappop(open_set)
-
-            if current == goal:
-                path = [current]
-                while (current, t) in came_from:
-                    current, t = came_from[(current, t)]
-                    path.append(current)
-                return list(reversed(path))
-
-            for dx, dy in moves:
-                nx, ny = current[0] + dx, current[1] + dy
-                if not (0 <= nx < config.GRID_WIDTH and 0 <= ny < config.GRID_HEIGHT):
+            logging.info(f"[M*] Planning for {len(group)} coupled agents")
+            t0 = self.reservation_table.now
+            result = self.search([start for _, start, _ in group], [goal for _, _, goal in group])
+            if not result.found:
+                logging.warning(f"[M*] Joint search {result.status.name} after {result.expansions} "
+                                f"expansions, falling back to sequential A*")
+                paths.update(super().plan_batch_and_reserve(group))
+                continue
+
+            for (robot_id, _, _), path in zip(group, result.path):
+                self.reserve_plan(path, robot_id=robot_id, t0=t0)
+                paths[robot_id] = path
+        return paths
+
+    def _policy_path(self, start, goal):
+        """Follow the individual policy from ``start``; None if the goal is unreachable."""
+        dist = self.distance_maps.distance_map(goal)
+        if dist[start] == INF:
+            return None
+        width, height = self.grid.shape
+        path = [start]
+        pos = start
+        while pos != goal:
+            best = pos
+            for dx, dy in MOVES[:4]:
+                nx, ny = pos[0] + dx, pos[1] + dy
+                if 0 <= nx < width and 0 <= ny < height and dist[nx, ny] < dist[best]:
+                    best = (nx, ny)
+            pos = best
+            path.append(pos)
+        return path
+
+    def _independent_groups(self, requests):
+        """Partition requests into groups whose individual policy paths interact."""
+        policy = [self._policy_path(start, goal) or [start] for _, start, goal in requests]
+        horizon = max(len(p) for p in policy) if policy else 0
+        group_of = list(range(len(requests)))
+
+        def find(i):
+            while group_of[i] != i:
+                group_of[i] = group_of[group_of[i]]
+                i = group_of[i]
+            return i
+
+        def at(i, t):
+            return policy[i][min(t, len(policy[i]) - 1)]  # Parked at the goal afterwards
+
+        for t in range(horizon):
+            occupied = {}
+            for i in range(len(requests)):
+                pos = at(i, t)
+                j = occupied.setdefault(pos, i)
+                if j != i:
+                    group_of[find(i)] = find(j)
+                if t > 0:
+                    prev = at(i, t - 1)
+                    k = occupied.get(prev)
+                    if k is not None and k != i and at(k, t - 1) == pos and prev != pos:
+                        group_of[find(i)] = find(k)
+
+        groups = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(find(i), []).append(request)
+        return list(groups.values())
+
+    def search(self, starts, goals):
+        """
+        Run M* for a group of agents.
+
+        Returns:
+            PlanResult: ``path`` is a list of per-agent paths (or None).
+        """
+        started = time.perf_counter()
+        result = self._mstar(tuple(starts), tuple(goals), started)
+        result.elapsed = time.perf_counter() - started
+        self.last_result = result
+        self.stats.record(result)
+        return result
+
+    def _mstar(self, starts, goals, started):
+        n = len(starts)
+        width, height = self.grid.shape
+        dist = [self.distance_maps.flat_map(goal) for goal in goals]  # Indexed x * height + y
+        if any(dist[i][s[0] * height + s[1]] == INF for i, s in enumerate(starts)):
+            return PlanResult(None, PlanStatus.NO_PATH)
+
+        table = self.reservation_table
+        t0 = table.now
+        t_max = t0 + self.max_time_horizon if self.max_time_horizon is not None else INF
+        deadline = started + self.time_budget if self.time_budget is not None else None
+
+        def heuristic(positions):
+            return sum(dist[i][p[0] * height + p[1]] for i, p in enumerate(positions))
+
+        def valid_moves(i, pos, t):
+            moves = []
+            for dx, dy in MOVES:
+                nx, ny = pos[0] + dx, pos[1] + dy
+                if not (0 <= nx < width and 0 <= ny < height) or self.grid[nx, ny] == 1:
                     continue
-                if self.grid[nx, ny] == 1:
+                nxt = (nx, ny)
+                if table.is_reserved(nx, ny, t + 1) or table.is_edge_reserved(pos, nxt, t + 1):
                     continue
-                if self.res_table.is_reserved(nx, ny, t + 1):
+                moves.append(nxt)
+            return moves
+
+        def policy_move(i, pos):
+            if pos == goals[i]:
+                return pos
+            best, best_d = pos, dist[i][pos[0] * height + pos[1]]
+            for dx, dy in MOVES[:4]:
+                nx, ny = pos[0] + dx, pos[1] + dy
+                if 0 <= nx < width and 0 <= ny < height and dist[i][nx * height + ny] < best_d:
+                    best, best_d = (nx, ny), dist[i][nx * height + ny]
+            return best
+
+        root = (starts, t0)
+        g_score = {root: 0}
+        parent = {}
+        collision = {root: frozenset()}
+        back_set = {root: set()}
+        expanded = {}  # vertex -> collision set it was last expanded with
+        counter = itertools.count()
+        open_set = [(heuristic(starts), heuristic(starts), next(counter), root)]  # (f, h, tie, vertex)
+        expansions = 0
+        pruned = False
+
+        def backprop(vertex, new_set):
+            stack = [(vertex, new_set)]
+            while stack:
+                v, incoming = stack.pop()
+                if incoming <= collision[v]:
                     continue
-                next_pos = (nx, ny)
-                key = (next_pos, t + 1)
-                tentative_g = g_score.get((current, t), float("inf")) + 1
-                if tentative_g < g_score.get(key, float("inf")):
-                    g_score[key] = tentative_g
-                    f_score = tentative_g + abs(goal[0] - nx) + abs(goal[1] - ny)
-                    heapq.heappush(open_set, (f_score, t + 1, next_pos))
-                    came_from[key] = (current, t)
-
-        return None
-
-    def _reserve_path(self, path, robot_id):
-        self.res_table.reserve_path(path, robot_id=robot_id)
-        self.res_table.reserve_edges(path)
-        self.res_table.reserve_goal_forever(path[-1][0], path[-1][1], len(path), robot_id=robot_id)
+                collision[v] = collision[v] | incoming
+                h = heuristic(v[0])
+                heapq.heappush(open_set, (g_score[v] + h, h, next(counter), v))
+                for u in back_set[v]:
+                    stack.append((u, collision[v]))
+
+        while open_set:
+            f, h, _, vertex = heapq.heappop(open_set)
+            if f - h > g_score[vertex] or expanded.get(vertex) == collision[vertex]:
+                continue  # Superseded by a cheaper entry, or nothing new to couple since the last expansion
+            positions, t = vertex
+
+            if positions == goals:
+                return PlanResult(self._extract(parent, vertex, goals), PlanStatus.FOUND, expansions)
+
+            expansions += 1
+            if self.max_expansions is not None and expansions >= self.max_expansions:
+                return PlanResult(None, PlanStatus.EXPANSION_LIMIT, expansions)
+            if deadline is not None and expansions % 64 == 0 and time.perf_counter() > deadline:
+                return PlanResult(None, PlanStatus.TIME_LIMIT, expansions)
+            if t >= t_max:
+                pruned = True
+                continue
+
+            coupled = collision[vertex]
+            expanded[vertex] = coupled
+            options = []
+            blocked = set()
+            for i, pos in enumerate(positions):
+                if i in coupled:
+                    options.append(valid_moves(i, pos, t))
+                    continue
+                nxt = policy_move(i, pos)
+                if table.is_reserved(nxt[0], nxt[1], t + 1) or table.is_edge_reserved(pos, nxt, t + 1):
+                    blocked.add(i)  # The policy runs into reserved space-time
+                options.append([nxt])
+            if blocked:
+                backprop(vertex, frozenset(blocked))
+                continue
+
+            for combo in itertools.product(*options):
+                colliding = self._collisions(positions, combo)
+                if colliding:
+                    backprop(vertex, colliding)
+                    continue
+
+                successor = (combo, t + 1)
+                back_set.setdefault(successor, set()).add(vertex)
+                if successor not in collision:
+                    collision[successor] = frozenset()
+                elif collision[successor]:
+                    backprop(vertex, collision[successor])
+
+                step_cost = sum(
+                    0 if positions[i] == goals[i] and combo[i] == goals[i] else 1
+                    for i in range(n)
+                )
+                tentative_g = g_score[vertex] + step_cost
+                if tentative_g < g_score.get(successor, INF):
+                    g_score[successor] = tentative_g
+                    parent[successor] = vertex
+                    h = heuristic(combo)
+                    heapq.heappush(open_set, (tentative_g + h, h, next(counter), successor))
+
+        status = PlanStatus.HORIZON_EXCEEDED if pruned else PlanStatus.NO_PATH
+        return PlanResult(None, status, expansions)
+
+    @staticmethod
+    def _collisions(before, after):
+        """Return the set of agents involved in vertex or swap collisions."""
+        colliding = set()
+        seen = {}
+        for i, pos in enumerate(after):
+            if pos in seen:
+                colliding.update((i, seen[pos]))
+            else:
+                seen[pos] = i
+        origin = {pos: i for i, pos in enumerate(before)}
+        for i, pos in enumerate(after):
+            j = origin.get(pos)
+            if j is not None and j != i and after[j] == before[i]:
+                colliding.update((i, j))
+        return frozenset(colliding)
+
+    @staticmethod
+    def _extract(parent, vertex, goals):
+        """Split the joint path into per-agent paths, trimming idle time at the goal."""
+        joint = [vertex[0]]
+        while vertex in parent:
+            vertex = parent[vertex]
+            joint.append(vertex[0])
+        joint.reverse()
+
+        paths = []
+        for i, goal in enumerate(goals):
+            path = [positions[i] for positions in joint]
+            while len(path) > 1 and path[-1] == goal and path[-2] == goal:
+                path.pop()
+            paths.append(path)
+        return paths
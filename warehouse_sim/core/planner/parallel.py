@@ -0,0 +1,160 @@
+## warehouse_sim/core/planner/parallel.py
+"""
+Process-pool planning for robots that need paths in the same frame.
+
+The occupancy grid and a dense snapshot of the reservation table live in
+shared memory, so a task only carries ``(now, requests)``. Workers plan every
+request against the snapshot independently; the parent then commits results
+in robot-id order, checking each path against the live table (which by then
+holds the robots committed before it) and re-planning only the ones that
+conflict. The outcome is deterministic for a given batch.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.base import BasePlanner, PlanResult
+from warehouse_sim.core.planner.heuristics import DistanceMapHeuristic
+from warehouse_sim.core.planner.hpa import HPAStarPlanner
+from warehouse_sim.core.planner.sipp import SIPPPlanner
+from warehouse_sim.core.planner.topology import TopologyPlanner
+from warehouse_sim.core.reservation_dense import DenseReservationTable
+
+_PLANNERS = {"astar": AStarPlanner, "sipp": SIPPPlanner, "hpa": HPAStarPlanner, "topology": TopologyPlanner}
+
+_worker = {}  # Per-process planner state, set up by _init_worker
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(grid_spec, cells_spec, edges_spec, planner_kind, heuristic_kind, limits):
+    from warehouse_sim.core.strategies import get_heuristic
+
+    grid_shm, grid = _attach(*grid_spec)
+    cells_shm, cells = _attach(*cells_spec)
+    edges_shm, edges = _attach(*edges_spec)
+    table = DenseReservationTable.from_arrays(cells, edges)
+    planner = _PLANNERS[planner_kind](grid, table, heuristic=get_heuristic(heuristic_kind, grid), **limits)
+    _worker.update(shm=(grid_shm, cells_shm, edges_shm), table=table, planner=planner)
+
+
+def _plan_chunk(now, requests):
+    table, planner = _worker["table"], _worker["planner"]
+    table.now = now
+    results = []
+    for robot_id, start, goal in requests:
+        result = planner.search(start, goal)
+        results.append((robot_id, result.path, result.status, result.expansions, result.elapsed,
+                        result.heap_pushes))
+    return results
+
+
+class ParallelPlanner(BasePlanner):
+    def __init__(self, planner, workers, min_batch=config.PARALLEL_MIN_BATCH):
+        """
+        Args:
+            planner (AStarPlanner | SIPPPlanner | HPAStarPlanner | TopologyPlanner): In-process planner; its grid,
+                table, heuristic and limits are mirrored in every worker and
+                it handles single requests, small batches and re-plans.
+            workers (int): Number of worker processes.
+            min_batch (int): Batches smaller than this skip the pool.
+        """
+        kind = next((k for k, cls in _PLANNERS.items() if type(planner) is cls), None)
+        if kind is None:
+            raise ValueError(f"Parallel planning supports {sorted(_PLANNERS)}, not {type(planner).__name__}")
+
+        self.planner = planner
+        self.grid = planner.grid
+        self.reservation_table = planner.reservation_table
+        self.stats = planner.stats
+        self.workers = workers
+        self.min_batch = min_batch
+        self.replanned = 0  # Pool results rejected at commit time
+
+        horizon = getattr(self.reservation_table, "horizon", config.DENSE_RESERVATION_HORIZON)
+        width, height = self.grid.shape
+        grid_shm, grid = self._share(self.grid.shape, self.grid.dtype)
+        grid[:] = self.grid
+        cells_shm, cells = self._share((horizon, width, height), np.int32)
+        edges_shm, edges = self._share((horizon, width, height), np.int8)
+        self._shm = [grid_shm, cells_shm, edges_shm]
+        self.snapshot = DenseReservationTable.from_arrays(cells, edges)
+
+        heuristic = "distance_map" if isinstance(planner.heuristic_provider, DistanceMapHeuristic) else "manhattan"
+        limits = {
+            "max_time_horizon": planner.max_time_horizon,
+            "max_expansions": planner.max_expansions,
+            "time_budget": planner.time_budget,
+        }
+        if kind == "hpa":
+            limits["cluster_size"] = planner.cluster_size
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                (grid_shm.name, grid.shape, grid.dtype),
+                (cells_shm.name, cells.shape, cells.dtype),
+                (edges_shm.name, edges.shape, edges.dtype),
+                kind, heuristic, limits,
+            ),
+        )
+
+    @staticmethod
+    def _share(shape, dtype):
+        nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    def plan(self, start, goal):
+        return self.planner.plan(start, goal)
+
+    def plan_and_reserve(self, start, goal, robot_id=None):
+        return self.planner.plan_and_reserve(start, goal, robot_id=robot_id)
+
+    def plan_batch_and_reserve(self, requests):
+        """
+        Plan ``[(robot_id, start, goal), ...]`` on the pool, then commit in
+        robot-id order, re-planning in-process any path that conflicts with a
+        robot committed before it.
+        """
+        if len(requests) < self.min_batch or self.workers < 2:
+            return super().plan_batch_and_reserve(sorted(requests, key=lambda r: r[0]))
+
+        table = self.reservation_table
+        now = table.now
+        self.snapshot.load_from(table)
+
+        chunks = [requests[i::self.workers] for i in range(self.workers)]
+        futures = [self.pool.submit(_plan_chunk, now, chunk) for chunk in chunks if chunk]
+        planned = {}
+        for future in futures:
+            for robot_id, path, status, expansions, elapsed, pushes in future.result():
+                self.stats.record(PlanResult(path, status, expansions, elapsed, heap_pushes=pushes))
+                planned[robot_id] = path
+
+        paths = {}
+        for robot_id, start, goal in sorted(requests, key=lambda r: r[0]):
+            path = planned.get(robot_id)
+            if path and table.first_conflict(path, t0=now, robot_id=robot_id) is not None:
+                self.replanned += 1
+                logging.info(f"[Parallel] Robot {robot_id} conflicts with an earlier commit, re-planning")
+                path = self.planner.plan_and_reserve(start, goal, robot_id=robot_id)
+            elif path:
+                self.reserve_plan(path, robot_id=robot_id, t0=now)
+            paths[robot_id] = path
+        return paths
+
+    def close(self):
+        """Shut the pool down and release the shared memory."""
+        self.pool.shutdown()
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
@@ -0,0 +1,166 @@
+## warehouse_sim/core/planner/sipp.py
+"""
+Safe Interval Path Planning (SIPP).
+
+Instead of one search state per (cell, timestep), SIPP keeps one state per
+(cell, safe interval): a maximal run of frames during which the cell is not
+reserved. Waiting is implicit, so long free stretches cost a single expansion.
+Intervals are derived from the shared reservation table, which already holds
+the parked-goal dwell written by ``reserve_goal_forever``.
+"""
+
+import heapq
+import time
+from warehouse_sim import config
+from warehouse_sim.core.planner.base import BasePlanner, PlannerStats, PlanResult, PlanStatus
+from warehouse_sim.core.planner.heuristics import ManhattanHeuristic
+
+INF = float('inf')
+
+
+class SIPPPlanner(BasePlanner):
+    def __init__(self, occupancy_grid, reservation_table, heuristic=None,
+                 max_time_horizon=config.PLANNER_MAX_TIME_HORIZON,
+                 max_expansions=config.PLANNER_MAX_EXPANSIONS,
+                 time_budget=config.PLANNER_TIME_BUDGET_S):
+        self.grid = occupancy_grid
+        self.reservation_table = reservation_table
+        self.heuristic_provider = heuristic or ManhattanHeuristic()
+        self.max_time_horizon = max_time_horizon
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+        self.stats = PlannerStats()
+        self.last_result = None
+
+    def plan(self, start, goal):
+        return self.search(start, goal).path
+
+    def plan_and_reserve(self, start, goal, robot_id=None):
+        t0 = self.reservation_table.now
+        path = self.plan(start, goal)
+        if path:
+            self.reserve_plan(path, robot_id=robot_id, t0=t0)
+        return path
+
+    def search(self, start, goal):
+        """
+        Run a bounded SIPP search.
+
+        Returns:
+            PlanResult: The path (or None) with a status and expansion count.
+        """
+        started = time.perf_counter()
+        result = self._search(start, goal, started)
+        result.elapsed = time.perf_counter() - started
+        self.last_result = result
+        self.stats.record(result)
+        return result
+
+    def safe_intervals(self, cell, t_start, t_end):
+        """
+        Return the free intervals [(lo, hi), ...] of ``cell`` from ``t_start``.
+        Reservations are only consulted up to ``t_end``; the last interval is
+        open-ended (hi = inf).
+        """
+        intervals = []
+        lo = t_start
+        for t in self.reservation_table.reserved_times(cell[0], cell[1], t_start, t_end):
+            if t > lo:
+                intervals.append((lo, t - 1))
+            lo = t + 1
+        intervals.append((lo, INF))
+        return intervals
+
+    def _search(self, start, goal, started):
+        h = self.heuristic_provider.for_goal(goal)
+        if h(start) == INF:
+            return PlanResult(None, PlanStatus.NO_PATH)
+
+        width, height = self.grid.shape
+        table = self.reservation_table
+        t0 = table.now
+        t_max = t0 + self.max_time_horizon if self.max_time_horizon is not None else INF
+        deadline = started + self.time_budget if self.time_budget is not None else None
+        interval_cache = {}
+
+        def intervals_of(cell):
+            intervals = interval_cache.get(cell)
+            if intervals is None:
+                intervals = self.safe_intervals(cell, t0 + 1, t_max + 1)
+                interval_cache[cell] = intervals
+            return intervals
+
+        # The robot already stands on its start cell at t0; it may stay there
+        # until the next reservation of that cell.
+        start_intervals = intervals_of(start)
+        start_end = start_intervals[0][1] if start_intervals[0][0] == t0 + 1 else t0
+        interval_cache[start] = [(t0, start_end)] + [iv for iv in start_intervals if iv[0] > start_end]
+
+        open_set = [(h(start), t0, start, 0)]  # (f_score, arrival time, cell, interval index)
+        arrival = {(start, 0): t0}
+        came_from = {}
+        closed = set()
+        expansions = 0
+        pushes = 1
+        pruned = False
+
+        while open_set:
+            _, t, current, iv_index = heapq.heappop(open_set)
+            state = (current, iv_index)
+            if state in closed:
+                continue
+            closed.add(state)
+
+            if current == goal:
+                return PlanResult(self._unroll(came_from, state, t), PlanStatus.FOUND, expansions, heap_pushes=pushes)
+
+            expansions += 1
+            if self.max_expansions is not None and expansions >= self.max_expansions:
+                return PlanResult(None, PlanStatus.EXPANSION_LIMIT, expansions, heap_pushes=pushes)
+            if deadline is not None and expansions % 256 == 0 and time.perf_counter() > deadline:
+                return PlanResult(None, PlanStatus.TIME_LIMIT, expansions, heap_pushes=pushes)
+            if t >= t_max:
+                pruned = True
+                continue
+
+            leave_by = intervals_of(current)[iv_index][1]  # Last frame we may still stand here
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                nx, ny = current[0] + dx, current[1] + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                if self.grid[nx, ny] == 1:
+                    continue
+
+                next_pos = (nx, ny)
+                for next_index, (lo, hi) in enumerate(intervals_of(next_pos)):
+                    if lo > leave_by + 1:
+                        break
+                    if hi < t + 1 or (next_pos, next_index) in closed:
+                        continue
+                    # Earliest arrival that avoids a swap on the connecting edge.
+                    t_arrive = max(t + 1, lo)
+                    latest = min(leave_by + 1, hi, t_max)
+                    while t_arrive <= latest and table.is_edge_reserved(current, next_pos, t_arrive):
+                        t_arrive += 1
+                    if t_arrive > latest:
+                        continue
+
+                    key = (next_pos, next_index)
+                    if t_arrive < arrival.get(key, INF):
+                        arrival[key] = t_arrive
+                        came_from[key] = (state, t)
+                        heapq.heappush(open_set, (t_arrive + h(next_pos), t_arrive, next_pos, next_index))
+                        pushes += 1
+
+        status = PlanStatus.HORIZON_EXCEEDED if pruned else PlanStatus.NO_PATH
+        return PlanResult(None, status, expansions, heap_pushes=pushes)
+
+    @staticmethod
+    def _unroll(came_from, state, t):
+        """Expand (cell, arrival time) hops into one cell per frame, inserting waits."""
+        path = [state[0]]
+        while state in came_from:
+            parent, t_parent = came_from[state]
+            path.extend([parent[0]] * (t - t_parent))
+            state, t = parent, t_parent
+        return list(reversed(path))
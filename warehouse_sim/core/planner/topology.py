@@ -0,0 +1,132 @@
+## warehouse_sim/core/planner/topology.py
+"""
+Space-time A* over the corridor topology graph (see ``core.topology``).
+
+Search states are (node, time). Robots may only wait on nodes (and on their
+start cell). Entering a corridor commits to running it to the next node, so
+the whole run is checked against the reservation table at once instead of
+expanding every corridor cell and every wait inside it. A run that passes
+the goal stops there. Paths come back expanded to one cell per frame. When
+the graph search fails for a reason other than the time budget, the trip is
+re-planned with the plain grid A*.
+"""
+
+import heapq
+import time
+from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.base import PlanResult, PlanStatus
+from warehouse_sim.core.topology import TopologyGraph
+
+INF = float('inf')
+
+
+class TopologyPlanner(AStarPlanner):
+    def __init__(self, occupancy_grid, reservation_table, heuristic=None, topology=None, **limits):
+        """
+        Args:
+            topology (TopologyGraph, optional): Prebuilt graph of
+                ``occupancy_grid``; extracted here when omitted.
+            **limits: max_time_horizon, max_expansions and time_budget as for
+                AStarPlanner.
+        """
+        super().__init__(occupancy_grid, reservation_table, heuristic=heuristic, **limits)
+        self.topology = topology or TopologyGraph(occupancy_grid)
+        self.fallbacks = 0  # Trips re-planned on the grid after the graph search failed
+
+    def _search(self, start, goal, started):
+        result = self._graph_search(start, goal, started)
+        if result.found or result.status == PlanStatus.TIME_LIMIT:
+            return result
+        self.fallbacks += 1
+        flat = super()._search(start, goal, started)
+        flat.expansions += result.expansions
+        flat.heap_pushes += result.heap_pushes
+        return flat
+
+    def _graph_search(self, start, goal, started):
+        h = self.heuristic_provider.for_goal(goal)
+        if h(start) == INF:
+            return PlanResult(None, PlanStatus.NO_PATH)
+
+        topology = self.topology
+        table = self.reservation_table
+        t0 = table.now
+        t_max = t0 + self.max_time_horizon if self.max_time_horizon is not None else None
+        deadline = started + self.time_budget if self.time_budget is not None else None
+
+        open_set = [(h(start), t0, start)]
+        came_from = {}  # (cell, t) -> ((previous cell, previous t), cells stepped through)
+        g_score = {(start, t0): 0}
+        closed = set()
+        expansions = 0
+        pushes = 1
+        pruned = False
+
+        while open_set:
+            _, t, current = heapq.heappop(open_set)
+            if (current, t) in closed:
+                continue
+            closed.add((current, t))
+
+            if current == goal:
+                return PlanResult(self._unroll(came_from, (current, t)), PlanStatus.FOUND, expansions,
+                                  heap_pushes=pushes)
+
+            expansions += 1
+            if self.max_expansions is not None and expansions >= self.max_expansions:
+                return PlanResult(None, PlanStatus.EXPANSION_LIMIT, expansions, heap_pushes=pushes)
+            if deadline is not None and expansions % 256 == 0 and time.perf_counter() > deadline:
+                return PlanResult(None, PlanStatus.TIME_LIMIT, expansions, heap_pushes=pushes)
+            if t_max is not None and t >= t_max:
+                pruned = True
+                continue
+
+            g = g_score[(current, t)]
+            successors = topology.runs(current)
+            if current == start or topology.is_node(current):
+                successors = successors + [[current]]  # Wait one frame
+
+            for run in successors:
+                if len(run) == 1:
+                    end = run[0]
+                    key = (end, t + 1)
+                    if key in closed or table.is_reserved(end[0], end[1], t + 1) or \
+                            table.is_edge_reserved(current, end, t + 1):
+                        continue
+                else:
+                    if goal in run:
+                        run = run[:run.index(goal) + 1]
+                    end = run[-1]
+                    key = (end, t + len(run))
+                    if key in closed or not self._run_is_free(current, run, t):
+                        continue
+                tentative_g = g + len(run)
+                if tentative_g < g_score.get(key, INF):
+                    g_score[key] = tentative_g
+                    came_from[key] = ((current, t), run)
+                    heapq.heappush(open_set, (tentative_g + h(end), key[1], end))
+                    pushes += 1
+
+        status = PlanStatus.HORIZON_EXCEEDED if pruned else PlanStatus.NO_PATH
+        return PlanResult(None, status, expansions, heap_pushes=pushes)
+
+    def _run_is_free(self, cell, run, t):
+        """True if no cell or edge of ``run`` (entered from ``cell`` at ``t``) is reserved at its frame."""
+        table = self.reservation_table
+        previous = cell
+        for offset, nxt in enumerate(run, start=1):
+            if table.is_reserved(nxt[0], nxt[1], t + offset) or table.is_edge_reserved(previous, nxt, t + offset):
+                return False
+            previous = nxt
+        return True
+
+    @staticmethod
+    def _unroll(came_from, state):
+        runs = []
+        while state in came_from:
+            state, run = came_from[state]
+            runs.append(run)
+        path = [state[0]]
+        for run in reversed(runs):
+            path.extend(run)
+        return path
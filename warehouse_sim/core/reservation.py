@@ -1,24 +1,124 @@
 ## warehouse_sim/core/reservation.py
 """
 Reservation table for time-extended spatial and edge conflict avoidance.
+
+Reservations are stored in per-frame buckets so that, in rolling-horizon mode,
+everything older than the current frame can be dropped in bulk when the world
+advances the ``now`` cursor.
 """
 
+from bisect import bisect_left, insort
+
+import numpy as np
+
+
 class ReservationTable:
-    def __init__(self):
-        self.cell_reservations = {}  # (x, y) -> {time: robot_id}
-        self.edge_reservations = set()  # ((from_x, from_y), (to_x, to_y), time)
+    def __init__(self, rolling_horizon=False):
+        """
+        Args:
+            rolling_horizon (bool): If True, buckets older than ``now`` are
+                evicted on every ``advance`` so memory stays flat over long runs.
+        """
+        self.rolling_horizon = rolling_horizon
+        self.now = 0
+        self.cell_reservations = {}  # time -> {(x, y): robot_id}
+        self.edge_reservations = {}  # time -> {((from_x, from_y), (to_x, to_y)): robot_id}
+        self.live_reservations = 0   # cell + edge entries currently held
+        self.cell_times = {}         # (x, y) -> sorted list of reserved times (per-cell index)
+        # Per-robot index for release_robot, built on its first call: robot_id ->
+        # {time: cells / edges the robot still owns}, for times from ``now`` on
+        self.robot_cells = None
+        self.robot_edges = None
+        self._floor = 0              # oldest time that may still hold a bucket
+        self._index_floor = 0        # oldest time that may still be in the robot index
+
+    def advance(self, now):
+        """
+        Move the "now" cursor. Past frames leave the robot index; in
+        rolling-horizon mode all buckets before ``now`` are evicted too.
+        """
+        self.now = now
+        if self.robot_cells is not None:
+            for t in range(self._index_floor, now):
+                for owner in set(self.cell_reservations.get(t, {}).values()):
+                    self.robot_cells.get(owner, {}).pop(t, None)
+                for owner in set(self.edge_reservations.get(t, {}).values()):
+                    self.robot_edges.get(owner, {}).pop(t, None)
+            self._index_floor = max(self._index_floor, now)
+        if not self.rolling_horizon:
+            return
+        for t in range(self._floor, now):
+            cells = self.cell_reservations.pop(t, None)
+            if cells:
+                self.live_reservations -= len(cells)
+                for cell in cells:
+                    self._drop_cell_index(cell, t)
+            edges = self.edge_reservations.pop(t, None)
+            if edges:
+                self.live_reservations -= len(edges)
+        self._floor = max(self._floor, now)
+
+    def stats(self):
+        return {
+            "now": self.now,
+            "live_reservations": self.live_reservations,
+            "cell_buckets": len(self.cell_reservations),
+            "edge_buckets": len(self.edge_reservations),
+        }
 
     def is_reserved(self, x, y, time):
-        return time in self.cell_reservations.get((x, y), {})
+        bucket = self.cell_reservations.get(time)
+        return bucket is not None and (x, y) in bucket
+
+    def get_owner(self, x, y, time):
+        """Return the robot id holding (x, y) at ``time``, or None."""
+        bucket = self.cell_reservations.get(time)
+        if bucket is None:
+            return None
+        return bucket.get((x, y))
+
+    def reserved_times(self, x, y, t_start, t_end):
+        """Return the sorted times in [t_start, t_end) at which (x, y) is reserved."""
+        times = self.cell_times.get((x, y))
+        if not times:
+            return []
+        return times[bisect_left(times, t_start):bisect_left(times, t_end)]
 
     def is_edge_reserved(self, from_pos, to_pos, time):
-        return (to_pos, from_pos, time) in self.edge_reservations
+        bucket = self.edge_reservations.get(time)
+        return bucket is not None and (to_pos, from_pos) in bucket
+
+    def owners_at(self, xs, ys, time):
+        """Batched get_owner: robot id per (xs[i], ys[i]) at ``time``, -1 where unowned."""
+        bucket = self.cell_reservations.get(time, {})
+        owners = [bucket.get(cell) for cell in zip(xs.tolist(), ys.tolist())]
+        return np.array([-1 if owner is None else owner for owner in owners], dtype=np.int64)
+
+    def edges_reserved(self, from_cells, to_cells, time):
+        """Batched is_edge_reserved over (N, 2) arrays of moves."""
+        bucket = self.edge_reservations.get(time)
+        if not bucket:
+            return np.zeros(len(from_cells), dtype=bool)
+        return np.array([
+            (tuple(to_pos), tuple(from_pos)) in bucket
+            for from_pos, to_pos in zip(from_cells.tolist(), to_cells.tolist())
+        ], dtype=bool)
 
     def reserve_cell(self, x, y, time, robot_id=None):
-        self.cell_reservations.setdefault((x, y), {})[time] = robot_id
+        if self.rolling_horizon and time < self._floor:
+            return
+        bucket = self.cell_reservations.setdefault(time, {})
+        if (x, y) not in bucket:
+            self.live_reservations += 1
+            insort(self.cell_times.setdefault((x, y), []), time)
+        elif self.robot_cells is not None:
+            _unindex(self.robot_cells, bucket[(x, y)], time, (x, y))  # Overwritten
+        bucket[(x, y)] = robot_id
+        if self.robot_cells is not None and robot_id is not None and time >= self._index_floor:
+            self.robot_cells.setdefault(robot_id, {}).setdefault(time, set()).add((x, y))
 
-    def reserve_path(self, path, robot_id=None):
-        for t, (x, y) in enumerate(path):
+    def reserve_path(self, path, robot_id=None, t0=0):
+        for t, (x, y) in enumerate(path, start=t0):
             self.reserve_cell(x, y, t, robot_id)
 
     def reserve_goal(self, x, y, t_start, duration, robot_id=None):
@@ -29,11 +129,160 @@ class ReservationTable:
         for t in range(start_time, start_time + 50):  # Default duration = 50
             self.reserve_cell(x, y, t, robot_id)
 
-    def reserve_edges(self, path):
+    def reserve_edges(self, path, t0=0, robot_id=None):
         for t in range(1, len(path)):
             from_pos = path[t - 1]
             to_pos = path[t]
-            self.edge_reservations.add((from_pos, to_pos, t))
+            self.reserve_edge(from_pos, to_pos, t0 + t, robot_id)
+
+    def reserve_edge(self, from_pos, to_pos, time, robot_id=None):
+        if self.rolling_horizon and time < self._floor:
+            return
+        bucket = self.edge_reservations.setdefault(time, {})
+        if (from_pos, to_pos) not in bucket:
+            self.live_reservations += 1
+        elif self.robot_edges is not None:
+            _unindex(self.robot_edges, bucket[(from_pos, to_pos)], time, (from_pos, to_pos))  # Overwritten
+        bucket[(from_pos, to_pos)] = robot_id
+        if self.robot_edges is not None and robot_id is not None and time >= self._index_floor:
+            self.robot_edges.setdefault(robot_id, {}).setdefault(time, set()).add((from_pos, to_pos))
+
+    def release_robot(self, robot_id, from_time):
+        """
+        Drop every cell and edge reservation ``robot_id`` holds at or after
+        ``from_time`` (past frames are no longer tracked, so at most from ``now``).
+        """
+        if self.robot_cells is None:
+            self._build_robot_index()
+        from_time = max(from_time, self._index_floor)
+        owned = self.robot_cells.get(robot_id)
+        if owned:
+            for t in [t for t in owned if t >= from_time]:
+                bucket = self.cell_reservations[t]
+                for cell in owned.pop(t):
+                    del bucket[cell]
+                    self.live_reservations -= 1
+                    self._drop_cell_index(cell, t)
+        owned = self.robot_edges.get(robot_id)
+        if owned:
+            for t in [t for t in owned if t >= from_time]:
+                bucket = self.edge_reservations[t]
+                for edge in owned.pop(t):
+                    del bucket[edge]
+                    self.live_reservations -= 1
+
+    def _build_robot_index(self):
+        """Index current and future reservations by owner; kept up to date from then on."""
+        self.robot_cells, self.robot_edges = {}, {}
+        self._index_floor = self.now
+        for buckets, index in ((self.cell_reservations, self.robot_cells),
+                               (self.edge_reservations, self.robot_edges)):
+            for t, bucket in buckets.items():
+                if t >= self.now:
+                    for key, owner in bucket.items():
+                        if owner is not None:
+                            index.setdefault(owner, {}).setdefault(t, set()).add(key)
+
+    def _drop_cell_index(self, cell, t):
+        times = self.cell_times.get(cell)
+        if times is not None:
+            i = bisect_left(times, t)
+            if i < len(times) and times[i] == t:
+                del times[i]
+            if not times:
+                del self.cell_times[cell]
+
+    def first_conflict(self, path, t0=0, robot_id=None):
+        """
+        Return the index of the first step of ``path`` (starting at ``t0``)
+        that hits another robot's cell or swaps with it, or None if it is clear.
+        """
+        for i, (x, y) in enumerate(path):
+            t = t0 + i
+            bucket = self.cell_reservations.get(t)
+            if bucket is not None and (x, y) in bucket and bucket[(x, y)] != robot_id:
+                return i
+            if i > 0 and path[i - 1] != (x, y):
+                edges = self.edge_reservations.get(t)
+                swap = ((x, y), path[i - 1])
+                if edges is not None and swap in edges and edges[swap] != robot_id:
+                    return i
+        return None
+
+
+def _unindex(index, owner, t, key):
+    """Drop ``key`` from ``owner``'s entries at ``t`` in a robot index."""
+    owned = index.get(owner)
+    if owned is not None and t in owned:
+        owned[t].discard(key)
+        if not owned[t]:
+            del owned[t]
+
+
+class WindowedReservationTable:
+    """
+    Windowed view over a reservation table for WHCA* / RHCR-style planning.
+
+    Planners see other robots' reservations only for the next ``window``
+    frames and may only commit that far ahead; everything beyond the window
+    looks free. The world re-plans active robots before the window runs out.
+    All other attributes are forwarded to the wrapped table.
+    """
+
+    def __init__(self, table, window):
+        self.table = table
+        self.window = window
+        self.window_end = table.now + window  # Last frame inside the window
+
+    def __getattr__(self, name):
+        if name == "table":
+            raise AttributeError(name)
+        return getattr(self.table, name)
+
+    def advance(self, now):
+        self.table.advance(now)
+        self.window_end = self.table.now + self.window
+
+    def is_reserved(self, x, y, time):
+        return time <= self.window_end and self.table.is_reserved(x, y, time)
+
+    def is_edge_reserved(self, from_pos, to_pos, time):
+        return time <= self.window_end and self.table.is_edge_reserved(from_pos, to_pos, time)
+
+    def owners_at(self, xs, ys, time):
+        if time > self.window_end:
+            return np.full(len(xs), -1, dtype=np.int64)
+        return self.table.owners_at(xs, ys, time)
+
+    def edges_reserved(self, from_cells, to_cells, time):
+        if time > self.window_end:
+            return np.zeros(len(from_cells), dtype=bool)
+        return self.table.edges_reserved(from_cells, to_cells, time)
+
+    def reserved_times(self, x, y, t_start, t_end):
+        return self.table.reserved_times(x, y, t_start, min(t_end, self.window_end + 1))
+
+    def first_conflict(self, path, t0=0, robot_id=None):
+        return self.table.first_conflict(path[:max(0, self.window_end - t0 + 1)], t0=t0, robot_id=robot_id)
+
+    def reserve_cell(self, x, y, time, robot_id=None):
+        if time <= self.window_end:
+            self.table.reserve_cell(x, y, time, robot_id)
 
     def reserve_edge(self, from_pos, to_pos, time, robot_id=None):
-        self.edge_reservations.add((from_pos, to_pos, time))
\ No newline at end of file
+        if time <= self.window_end:
+            self.table.reserve_edge(from_pos, to_pos, time, robot_id)
+
+    def reserve_path(self, path, robot_id=None, t0=0):
+        self.table.reserve_path(path[:max(0, self.window_end - t0 + 1)], robot_id=robot_id, t0=t0)
+
+    def reserve_edges(self, path, t0=0, robot_id=None):
+        self.table.reserve_edges(path[:max(0, self.window_end - t0 + 1)], t0=t0, robot_id=robot_id)
+
+    def reserve_goal(self, x, y, t_start, duration, robot_id=None):
+        duration = min(duration, self.window_end - t_start + 1)
+        if duration > 0:
+            self.table.reserve_goal(x, y, t_start, duration, robot_id=robot_id)
+
+    def reserve_goal_forever(self, x, y, start_time, robot_id=None):
+        self.reserve_goal(x, y, start_time, 50, robot_id=robot_id)  # Default duration = 50
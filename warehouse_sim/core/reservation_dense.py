@@ -0,0 +1,287 @@
+## warehouse_sim/core/reservation_dense.py
+"""
+Dense, NumPy-backed reservation table.
+
+Drop-in alternative to ``ReservationTable`` that stores a time ring of
+``horizon x grid_width x grid_height`` robot ids. Edges are encoded compactly
+as the direction each robot entered a cell from, which is all a swap check
+needs. Reservations outside ``[now, now + horizon)`` are not held: writes are
+dropped and reads report the cell as free.
+"""
+
+import numpy as np
+from warehouse_sim import config
+
+FREE = -1
+ANONYMOUS = -2  # Reservation made without a robot id
+
+# Move (dx, dy) -> code stored at the destination cell; 0 means "no edge".
+_MOVE_CODES = {(-1, 0): 1, (1, 0): 2, (0, -1): 3, (0, 1): 4}
+_CODE_LUT = np.zeros((3, 3), dtype=np.int8)
+for (_dx, _dy), _code in _MOVE_CODES.items():
+    _CODE_LUT[_dx + 1, _dy + 1] = _code
+
+
+class DenseReservationTable:
+    def __init__(self, grid_width, grid_height, horizon=config.DENSE_RESERVATION_HORIZON):
+        """
+        Args:
+            grid_width (int): Grid width in cells.
+            grid_height (int): Grid height in cells.
+            horizon (int): Number of future frames held in the ring.
+        """
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.horizon = horizon
+        self.rolling_horizon = True  # The ring always forgets the past
+        self.now = 0
+        self.cells = np.full((horizon, grid_width, grid_height), FREE, dtype=np.int32)
+        self.edges = np.zeros((horizon, grid_width, grid_height), dtype=np.int8)
+        self.live_reservations = 0
+        self.robot_reach = {}  # robot_id -> last frame it reserved a cell at
+
+    @classmethod
+    def from_arrays(cls, cells, edges, now=0):
+        """
+        Wrap existing ring arrays (e.g. views into shared memory) without
+        copying them. ``cells`` and ``edges`` must be (horizon, width, height).
+        """
+        table = cls.__new__(cls)
+        table.horizon, table.grid_width, table.grid_height = cells.shape
+        table.rolling_horizon = True
+        table.now = now
+        table.cells = cells
+        table.edges = edges
+        table.live_reservations = 0
+        table.robot_reach = {}
+        return table
+
+    def load_from(self, table):
+        """
+        Overwrite this ring with a snapshot of ``table`` (dense, dict or a
+        windowed view of either) covering ``[table.now, table.now + horizon)``.
+        """
+        window_end = getattr(table, "window_end", None)
+        source = table
+        while hasattr(source, "table"):  # Unwrap windowed / instrumented views
+            source = source.table
+        self.now = source.now
+        self.robot_reach = {}
+
+        if isinstance(source, DenseReservationTable) and source.horizon == self.horizon:
+            np.copyto(self.cells, source.cells)
+            np.copyto(self.edges, source.edges)
+            self.robot_reach = dict(source.robot_reach)
+        else:
+            self.cells.fill(FREE)
+            self.edges.fill(0)
+            end = self.now + self.horizon
+            for time, cells in source.cell_reservations.items():
+                if not self.now <= time < end:
+                    continue
+                slot = time % self.horizon
+                for (x, y), robot_id in cells.items():
+                    self.cells[slot, x, y] = ANONYMOUS if robot_id is None else robot_id
+            for time, edges in source.edge_reservations.items():
+                if not self.now <= time < end:
+                    continue
+                slot = time % self.horizon
+                for (from_pos, to_pos), _ in edges.items():
+                    dx, dy = to_pos[0] - from_pos[0], to_pos[1] - from_pos[1]
+                    if abs(dx) + abs(dy) == 1:
+                        self.edges[slot, to_pos[0], to_pos[1]] = _CODE_LUT[dx + 1, dy + 1]
+
+        if window_end is not None and window_end + 1 < self.now + self.horizon:
+            # Frames past the window look free to the planners
+            slots = np.arange(window_end + 1, self.now + self.horizon) % self.horizon
+            self.cells[slots] = FREE
+            self.edges[slots] = 0
+        self.live_reservations = int(np.count_nonzero(self.cells != FREE)) + int(np.count_nonzero(self.edges))
+
+    # --- Time cursor ---
+
+    def advance(self, now):
+        """Move the "now" cursor, clearing the ring slots that fall behind it."""
+        if now <= self.now:
+            self.now = now
+            return
+        if now - self.now >= self.horizon:
+            self.cells.fill(FREE)
+            self.edges.fill(0)
+            self.live_reservations = 0
+        else:
+            slots = np.arange(self.now, now) % self.horizon
+            self.live_reservations -= int(np.count_nonzero(self.cells[slots] != FREE))
+            self.live_reservations -= int(np.count_nonzero(self.edges[slots]))
+            self.cells[slots] = FREE
+            self.edges[slots] = 0
+        self.now = now
+
+    def _in_window(self, time):
+        return self.now <= time < self.now + self.horizon
+
+    def _window_mask(self, times):
+        return (times >= self.now) & (times < self.now + self.horizon)
+
+    def stats(self):
+        return {
+            "now": self.now,
+            "live_reservations": self.live_reservations,
+            "horizon": self.horizon,
+            "bytes": self.cells.nbytes + self.edges.nbytes,
+        }
+
+    # --- Scalar queries (planner inner loop) ---
+
+    def is_reserved(self, x, y, time):
+        if not self._in_window(time):
+            return False
+        return self.cells[time % self.horizon, x, y] != FREE
+
+    def get_owner(self, x, y, time):
+        """Return the robot id holding (x, y) at ``time``, or None."""
+        if not self._in_window(time):
+            return None
+        owner = int(self.cells[time % self.horizon, x, y])
+        return None if owner < 0 else owner
+
+    def reserved_times(self, x, y, t_start, t_end):
+        """Return the sorted times in [t_start, t_end) at which (x, y) is reserved."""
+        t_start = max(t_start, self.now)
+        t_end = min(t_end, self.now + self.horizon)
+        if t_end <= t_start:
+            return []
+        times = np.arange(t_start, t_end)
+        column = self.cells[times % self.horizon, x, y]
+        return times[column != FREE].tolist()
+
+    def is_edge_reserved(self, from_pos, to_pos, time):
+        # A swap means somebody entered ``from_pos`` from ``to_pos`` at ``time``.
+        dx, dy = from_pos[0] - to_pos[0], from_pos[1] - to_pos[1]
+        if abs(dx) + abs(dy) != 1 or not self._in_window(time):
+            return False
+        return self.edges[time % self.horizon, from_pos[0], from_pos[1]] == _CODE_LUT[dx + 1, dy + 1]
+
+    # --- Batched queries (vectorized world) ---
+
+    def owners_at(self, xs, ys, time):
+        """Batched get_owner: robot id per (xs[i], ys[i]) at ``time``, -1 where unowned."""
+        if not self._in_window(time):
+            return np.full(len(xs), FREE, dtype=np.int64)
+        owners = self.cells[time % self.horizon, xs, ys].astype(np.int64)
+        owners[owners < 0] = FREE
+        return owners
+
+    def edges_reserved(self, from_cells, to_cells, time):
+        """Batched is_edge_reserved over (N, 2) arrays of moves."""
+        from_cells = np.asarray(from_cells, dtype=np.intp).reshape(-1, 2)
+        to_cells = np.asarray(to_cells, dtype=np.intp).reshape(-1, 2)
+        if not self._in_window(time):
+            return np.zeros(len(from_cells), dtype=bool)
+        delta = from_cells - to_cells
+        unit = np.abs(delta).sum(axis=1) == 1
+        codes = _CODE_LUT[np.clip(delta[:, 0], -1, 1) + 1, np.clip(delta[:, 1], -1, 1) + 1]
+        entered = self.edges[time % self.horizon, from_cells[:, 0], from_cells[:, 1]]
+        return unit & (entered == codes)
+
+    # --- Scalar writes ---
+
+    def reserve_cell(self, x, y, time, robot_id=None):
+        if not self._in_window(time):
+            return
+        slot = time % self.horizon
+        if self.cells[slot, x, y] == FREE:
+            self.live_reservations += 1
+        self.cells[slot, x, y] = ANONYMOUS if robot_id is None else robot_id
+        if robot_id is not None and time > self.robot_reach.get(robot_id, -1):
+            self.robot_reach[robot_id] = time
+
+    def reserve_edge(self, from_pos, to_pos, time, robot_id=None):
+        dx, dy = to_pos[0] - from_pos[0], to_pos[1] - from_pos[1]
+        if abs(dx) + abs(dy) != 1 or not self._in_window(time):
+            return
+        slot = time % self.horizon
+        if self.edges[slot, to_pos[0], to_pos[1]] == 0:
+            self.live_reservations += 1
+        self.edges[slot, to_pos[0], to_pos[1]] = _CODE_LUT[dx + 1, dy + 1]
+
+    def release_robot(self, robot_id, from_time):
+        """Drop every cell and edge reservation ``robot_id`` holds at or after ``from_time``."""
+        start = max(from_time, self.now)
+        end = min(self.now + self.horizon, self.robot_reach.get(robot_id, -1) + 1)
+        if start >= end:
+            return
+        slots = np.arange(start, end) % self.horizon
+        owned = self.cells[slots] == robot_id
+        slot_idx, xs, ys = np.nonzero(owned)
+        slot_idx = slots[slot_idx]
+        self.live_reservations -= len(xs)
+        self.live_reservations -= int(np.count_nonzero(self.edges[slot_idx, xs, ys]))
+        self.cells[slot_idx, xs, ys] = FREE
+        self.edges[slot_idx, xs, ys] = 0
+        if from_time <= self.now:
+            self.robot_reach.pop(robot_id, None)
+
+    # --- Vectorized bulk operations ---
+
+    def _reserve_cells(self, xs, ys, times, robot_id):
+        mask = self._window_mask(times)
+        slots, xs, ys = times[mask] % self.horizon, xs[mask], ys[mask]
+        self.live_reservations += int(np.count_nonzero(self.cells[slots, xs, ys] == FREE))
+        self.cells[slots, xs, ys] = ANONYMOUS if robot_id is None else robot_id
+        if robot_id is not None and mask.any():
+            reach = int(times[mask].max())
+            if reach > self.robot_reach.get(robot_id, -1):
+                self.robot_reach[robot_id] = reach
+
+    def reserve_path(self, path, robot_id=None, t0=0):
+        path = np.asarray(path, dtype=np.intp).reshape(-1, 2)
+        times = t0 + np.arange(len(path))
+        self._reserve_cells(path[:, 0], path[:, 1], times, robot_id)
+
+    def reserve_edges(self, path, t0=0, robot_id=None):
+        path = np.asarray(path, dtype=np.intp).reshape(-1, 2)
+        if len(path) < 2:
+            return
+        delta = path[1:] - path[:-1]
+        unit = np.abs(delta).sum(axis=1) == 1
+        times = t0 + np.arange(1, len(path))
+        mask = unit & self._window_mask(times)
+        dest = path[1:][mask]
+        slots = times[mask] % self.horizon
+        codes = _CODE_LUT[delta[mask, 0] + 1, delta[mask, 1] + 1]
+        self.live_reservations += int(np.count_nonzero(self.edges[slots, dest[:, 0], dest[:, 1]] == 0))
+        self.edges[slots, dest[:, 0], dest[:, 1]] = codes
+
+    def reserve_goal(self, x, y, t_start, duration, robot_id=None):
+        times = np.arange(t_start, t_start + duration)
+        self._reserve_cells(np.full(len(times), x), np.full(len(times), y), times, robot_id)
+
+    def reserve_goal_forever(self, x, y, start_time, robot_id=None):
+        self.reserve_goal(x, y, start_time, 50, robot_id=robot_id)  # Default duration = 50
+
+    def first_conflict(self, path, t0=0, robot_id=None):
+        """
+        Return the index of the first step of ``path`` (starting at ``t0``)
+        that hits another robot's cell or swaps with it, or None if it is clear.
+        """
+        path = np.asarray(path, dtype=np.intp).reshape(-1, 2)
+        times = t0 + np.arange(len(path))
+        mask = self._window_mask(times)
+        slots = times % self.horizon
+        owners = self.cells[slots, path[:, 0], path[:, 1]]
+        own = ANONYMOUS if robot_id is None else robot_id
+        vertex = mask & (owners != FREE) & (owners != own)
+
+        swap = np.zeros(len(path), dtype=bool)
+        if len(path) > 1:
+            # Moving a -> b at t collides with whoever entered a from b at t.
+            back = path[:-1] - path[1:]
+            unit = np.abs(back).sum(axis=1) == 1
+            codes = _CODE_LUT[np.clip(back[:, 0], -1, 1) + 1, np.clip(back[:, 1], -1, 1) + 1]
+            entered = self.edges[slots[1:], path[:-1, 0], path[:-1, 1]]
+            prev_owner = self.cells[slots[1:], path[:-1, 0], path[:-1, 1]]
+            swap[1:] = mask[1:] & unit & (entered == codes) & (prev_owner != own)
+
+        hits = np.flatnonzero(vertex | swap)
+        return int(hits[0]) if len(hits) else None
@@ -0,0 +1,179 @@
+## warehouse_sim/core/spatial_index.py
+"""
+Grid-aligned cell sets used by goal assignment: ``CoverageGrid`` answers
+fixed-radius proximity queries, ``CellPool`` samples from a changing set of
+cells.
+"""
+
+import random
+
+import numpy as np
+
+_NO_CELLS = np.zeros(0, dtype=np.int64)
+
+
+class CoverageGrid:
+    """
+    Keeps, for every cell, the number of indexed points within Manhattan
+    ``radius`` of it. Insert and delete add or subtract a precomputed diamond
+    on the count array, so "is any point within radius of this cell" is one
+    lookup and the cells with no point in range are a single array mask.
+    ``add`` and ``discard`` return the cells whose count crossed zero, so
+    callers can keep their own uncovered sets in step.
+    """
+
+    def __init__(self, shape, radius):
+        """
+        Args:
+            shape (tuple): (grid_width, grid_height).
+            radius (int): Query distance in cells (inclusive).
+        """
+        self.shape = shape
+        self.radius = radius
+        self.counts = np.zeros(shape, dtype=np.int32)
+        self.points = set()
+        offsets = np.arange(-radius, radius + 1)
+        self._diamond = (np.abs(offsets[:, None]) + np.abs(offsets[None, :]) <= radius).astype(np.int32)
+
+    def _stamp(self, point, sign):
+        """Add ``sign`` times the diamond at ``point``; return the encoded cells whose count crossed zero."""
+        x, y = point
+        r = self.radius
+        x0, x1 = max(0, x - r), min(self.shape[0], x + r + 1)
+        y0, y1 = max(0, y - r), min(self.shape[1], y + r + 1)
+        diamond = self._diamond[x0 - (x - r):x1 - (x - r), y0 - (y - r):y1 - (y - r)]
+        window = self.counts[x0:x1, y0:y1]
+        if sign > 0:
+            window += diamond
+            crossed = (window == 1) & (diamond > 0)
+        else:
+            window -= diamond
+            crossed = (window == 0) & (diamond > 0)
+        dx, dy = np.nonzero(crossed)
+        return (dx + x0) * self.shape[1] + (dy + y0)
+
+    def add(self, point):
+        """Index ``point``; returns the encoded cells it newly covers."""
+        if point in self.points:
+            return _NO_CELLS
+        self.points.add(point)
+        return self._stamp(point, 1)
+
+    def discard(self, point):
+        """Drop ``point``; returns the encoded cells left with no point in range."""
+        if point not in self.points:
+            return _NO_CELLS
+        self.points.remove(point)
+        return self._stamp(point, -1)
+
+    def __contains__(self, point):
+        return point in self.points
+
+    def __len__(self):
+        return len(self.points)
+
+    def any_within(self, point):
+        """True if some indexed point is within ``radius`` of ``point``."""
+        return self.counts[point] > 0
+
+    def uncovered(self):
+        """Boolean (W, H) mask of cells with no indexed point within ``radius``."""
+        return self.counts == 0
+
+
+class CellPool:
+    """
+    A set of grid cells (encoded ``x * grid_height + y``) in a dense array,
+    with O(1) insert, swap-remove and uniform sampling.
+    """
+
+    def __init__(self, shape, cells=()):
+        """
+        Args:
+            shape (tuple): (grid_width, grid_height).
+            cells (array-like): Initial encoded cells.
+        """
+        self.width, self.height = shape
+        self.cells = np.zeros(shape[0] * shape[1], dtype=np.int64)
+        self.slot = np.full(shape[0] * shape[1], -1, dtype=np.int64)  # Cell -> index in cells
+        cells = np.asarray(cells, dtype=np.int64)
+        self.cells[:len(cells)] = cells
+        self.slot[cells] = np.arange(len(cells))
+        self.size = len(cells)
+
+    def encode(self, point):
+        return point[0] * self.height + point[1]
+
+    def decode(self, code):
+        x, y = divmod(int(code), self.height)
+        return x, y
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, point):
+        return self._slot_of(point) >= 0
+
+    def _slot_of(self, point):
+        if not (0 <= point[0] < self.width and 0 <= point[1] < self.height):
+            return -1
+        return int(self.slot[self.encode(point)])
+
+    def add(self, point):
+        code = self.encode(point)
+        if self.slot[code] >= 0:
+            return
+        self.cells[self.size] = code
+        self.slot[code] = self.size
+        self.size += 1
+
+    def discard(self, point):
+        code = self.encode(point)
+        index = self.slot[code]
+        if index < 0:
+            return
+        last = self.cells[self.size - 1]
+        self.cells[index] = last
+        self.slot[last] = index
+        self.slot[code] = -1
+        self.size -= 1
+
+    def add_many(self, codes):
+        """Insert encoded cells (duplicates and members are ignored)."""
+        codes = np.unique(np.asarray(codes, dtype=np.int64))
+        codes = codes[self.slot[codes] < 0]
+        end = self.size + len(codes)
+        self.cells[self.size:end] = codes
+        self.slot[codes] = np.arange(self.size, end)
+        self.size = end
+
+    def discard_many(self, codes):
+        """Remove encoded cells (non-members are ignored), filling the holes from the tail."""
+        codes = np.unique(np.asarray(codes, dtype=np.int64))
+        slots = self.slot[codes]
+        codes, slots = codes[slots >= 0], slots[slots >= 0]
+        if not len(codes):
+            return
+        end = self.size - len(codes)
+        self.slot[codes] = -1
+        holes = slots[slots < end]
+        tail = self.cells[end:self.size]
+        movers = tail[self.slot[tail] >= 0]
+        self.cells[holes] = movers
+        self.slot[movers] = holes
+        self.size = end
+
+    def sample(self, exclude=None):
+        """A uniformly random member other than ``exclude``, or None if there is none."""
+        skip = self._slot_of(exclude) if exclude is not None else -1
+        count = self.size - (skip >= 0)
+        if count <= 0:
+            return None
+        index = random.randrange(count)
+        if 0 <= skip <= index:
+            index += 1
+        return self.decode(self.cells[index])
+
+    def members(self):
+        """Encoded cells currently in the pool (a view; order is arbitrary)."""
+        return self.cells[:self.size]
@@ -3,11 +3,18 @@
 Planner strategy factory for selecting different planning algorithms.
 """
 
+from warehouse_sim import config
 from warehouse_sim.core.planner.astar import AStarPlanner
+from warehouse_sim.core.planner.cbs import CBSPlanner
+from warehouse_sim.core.planner.heuristics import DistanceMapHeuristic, ManhattanHeuristic
+from warehouse_sim.core.planner.hpa import HPAStarPlanner
+from warehouse_sim.core.planner.mstar_planner import MStarPlanner
+from warehouse_sim.core.planner.sipp import SIPPPlanner
+from warehouse_sim.core.planner.topology import TopologyPlanner
+from warehouse_sim.core.reservation import ReservationTable, WindowedReservationTable
 # from warehouse_sim.core.planner.greedy import GreedyPlanner  # Future extension
-# from warehouse_sim.core.planner.mstar import MStarPlanner    # Future extension
 
-def get_planner(strategy: str, occupancy, reservation_table):
+def get_planner(strategy: str, occupancy, reservation_table, heuristic=None, workers=0):
     """
     Returns a planner instance based on the given strategy name.
 
@@ -15,20 +22,97 @@ def get_planner(strategy: str, occupancy, reservation_table):
         strategy (str): The name of the planning strategy.
         occupancy (np.ndarray): The occupancy grid.
         reservation_table (ReservationTable): The shared reservation system.
+        heuristic: Optional heuristic provider (see get_heuristic).
+        workers (int): Plan same-frame batches on this many processes
+            ("astar", "sipp", "hpa" and "topology" only; 0 or 1 plans in-process).
 
     Returns:
         Planner instance.
     """
     strategy = strategy.lower()
 
+    if workers and workers > 1:
+        from warehouse_sim.core.planner.parallel import ParallelPlanner
+        return ParallelPlanner(get_planner(strategy, occupancy, reservation_table, heuristic), workers)
+
     if strategy == "astar":
-        return AStarPlanner(occupancy, reservation_table)
+        return AStarPlanner(occupancy, reservation_table, heuristic=heuristic)
+
+    elif strategy == "sipp":
+        return SIPPPlanner(occupancy, reservation_table, heuristic=heuristic)
+
+    elif strategy == "hpa":
+        return HPAStarPlanner(occupancy, reservation_table, heuristic=heuristic)
+
+    elif strategy == "topology":
+        return TopologyPlanner(occupancy, reservation_table, heuristic=heuristic)
+
+    elif strategy == "mstar":
+        return MStarPlanner(occupancy, reservation_table, heuristic=heuristic)
+
+    elif strategy == "cbs":
+        return CBSPlanner(occupancy, reservation_table, heuristic=heuristic)
+
+    elif strategy == "ecbs":
+        return CBSPlanner(occupancy, reservation_table, heuristic=heuristic,
+                          suboptimality=config.ECBS_SUBOPTIMALITY)
 
     # elif strategy == "greedy":
     #     return GreedyPlanner(occupancy, reservation_table)
 
-    # elif strategy == "mstar":
-    #     return MStarPlanner(occupancy, reservation_table)
-
     else:
         raise ValueError(f"Unknown planner strategy: {strategy}")
+
+
+def get_heuristic(kind: str, occupancy):
+    """
+    Returns a heuristic provider that planners can share.
+
+    Args:
+        kind (str): "manhattan" or "distance_map" (cached BFS distances).
+        occupancy (np.ndarray): The occupancy grid.
+
+    Returns:
+        Heuristic provider instance.
+    """
+    kind = kind.lower()
+
+    if kind == "manhattan":
+        return ManhattanHeuristic()
+
+    elif kind == "distance_map":
+        return DistanceMapHeuristic(occupancy)
+
+    else:
+        raise ValueError(f"Unknown heuristic: {kind}")
+
+
+def get_reservation_table(kind: str, environment, rolling_horizon=False, window=None):
+    """
+    Returns a reservation table implementation by name.
+
+    Args:
+        kind (str): "dict" (sparse, time-bucketed) or "dense" (NumPy ring).
+        environment (Environment): Provides the grid dimensions.
+        rolling_horizon (bool): Evict past frames (always on for "dense").
+        window (int, optional): Only plan against / commit the next ``window``
+            frames (WHCA* / RHCR); the world must re-plan before it runs out.
+
+    Returns:
+        Reservation table instance.
+    """
+    kind = kind.lower()
+
+    if kind == "dict":
+        table = ReservationTable(rolling_horizon=rolling_horizon)
+
+    elif kind == "dense":
+        from warehouse_sim.core.reservation_dense import DenseReservationTable
+        table = DenseReservationTable(environment.grid_width, environment.grid_height)
+
+    else:
+        raise ValueError(f"Unknown reservation table: {kind}")
+
+    if window is not None:
+        return WindowedReservationTable(table, window)
+    return table
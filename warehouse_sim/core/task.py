@@ -2,15 +2,71 @@
 """
 TaskManager is responsible for assigning unique goal positions to robots,
 with support for multiple assignment strategies.
+
+Goals are either handed out greedily, one per ``get_goal`` call, or in
+``batch`` mode: ``get_goals`` matches every robot that needs work in a frame
+to a pool of pending tasks, minimizing total grid travel distance plus a
+discount for how long each task has been waiting, so far tasks are not
+passed over forever.
 """
 
 import random
 
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.core.assignment import solve_assignment
+from warehouse_sim.core.planner.heuristics import DistanceMapHeuristic
+from warehouse_sim.core.spatial_index import CellPool, CoverageGrid
+
+NO_CELL = (-1, -1)  # Start for goals drawn without a robot (pending tasks)
+
 class TaskManager:
-    def __init__(self, environment, strategy="random"):
+    def __init__(self, environment, strategy="random", assignment="greedy",
+                 pool_size=config.TASK_POOL_SIZE, distances=None, age_weight=config.TASK_AGE_WEIGHT,
+                 age_grace=config.TASK_AGE_GRACE):
+        """
+        Args:
+            environment (Environment): Layout goals are drawn from.
+            strategy (str): "random", "spread" or "high_density".
+            assignment (str): "greedy" (one goal per request) or "batch"
+                (``get_goals`` solves robots x pending tasks at once).
+            pool_size (int): Pending tasks kept in batch mode.
+            distances (optional): The planner's heuristic provider; its cached
+                BFS maps are reused for batch costs when it is a
+                DistanceMapHeuristic, otherwise a private one is built.
+            age_weight (int): Batch mode: cells of travel a task's cost drops
+                per frame it has been pending beyond ``age_grace``.
+            age_grace (int): Frames a task may wait before it is aged.
+        """
+        if assignment not in ("greedy", "batch"):
+            raise ValueError(f"Unknown assignment mode: {assignment}")
         self.env = environment
         self.strategy = strategy
+        self.assignment = assignment
+        self.pool_size = pool_size
+        if not isinstance(distances, DistanceMapHeuristic):
+            distances = DistanceMapHeuristic(environment.occupancy)
+        self.distances = distances
+        self.pending = []  # Batch mode: drawn (and held) goals not yet given to a robot
+        self.pending_since = []  # Frame each pending goal was drawn, parallel to ``pending``
+        self.age_weight = age_weight
+        self.age_grace = age_grace
+        self.assigned_tasks = 0  # Batch mode: tasks given to a robot, and their summed / worst wait
+        self.total_wait = 0
+        self.max_wait = 0
         self.assigned_goals = set()
+        self.coverage = {}  # Spread distance (cells) -> CoverageGrid of assigned goals
+        self.spread_pools = {}  # Spread distance (cells) -> CellPool of pool cells no goal covers
+
+        # The layout is fixed once tasks are handed out: index the free cells
+        # and obstacle density once, then keep the unassigned pool up to date.
+        # Cells outside the largest connected area could never be reached.
+        shape = (environment.grid_width, environment.grid_height)
+        self.pool = CellPool(shape, environment.reachable_cells())  # Reachable and unassigned
+        self.sat = np.zeros((shape[0] + 1, shape[1] + 1), dtype=np.int64)  # Summed-area table
+        self.sat[1:, 1:] = environment.occupancy.astype(np.int64).cumsum(axis=0).cumsum(axis=1)
+        self.density = {}  # Neighborhood -> flat per-cell obstacle counts
+        self.dense_pools = {}  # (neighborhood, min_density) -> CellPool of dense unassigned cells
 
     def get_goal(self, start):
         """
@@ -25,67 +81,172 @@ class TaskManager:
         else:
             raise ValueError(f"Unknown strategy: {self.strategy}")
 
-    def _get_random_goal(self, start):
-        for _ in range(1000):
-            x = random.randint(0, self.env.grid_width - 1)
-            y = random.randint(0, self.env.grid_height - 1)
-            candidate = (x, y)
-            if self._is_valid_goal(candidate, start):
-                self.assigned_goals.add(candidate)
-                return candidate
-        return start
-
-    def _get_spread_goal(self, start, min_distance=10):
-        min_dist_cells = int(min_distance / self.env.resolution)
-        for _ in range(1000):
-            x = random.randint(0, self.env.grid_width - 1)
-            y = random.randint(0, self.env.grid_height - 1)
-            candidate = (x, y)
-            if not self._is_valid_goal(candidate, start):
-                continue
-            if all(
-                abs(x - gx) + abs(y - gy) > min_dist_cells
-                for gx, gy in self.assigned_goals
-            ):
-                self.assigned_goals.add(candidate)
-                return candidate
-        return self._get_random_goal(start)
+    @property
+    def batch(self):
+        return self.assignment == "batch"
 
-    def _get_high_density_goal(self, start, neighborhood=5):
-        best = None
-        max_density = -1
+    def get_goals(self, starts, frame=0):
+        """
+        Returns one goal per start cell, chosen together: the pending pool is
+        topped up with goals from the strategy, then robots are matched to
+        tasks minimizing the summed shortest-path distance, less
+        ``age_weight`` cells per frame each task has waited beyond
+        ``age_grace``. A robot left
+        without a task (pool exhausted, or no pending task reachable from its
+        cell) gets its own cell, as ``get_goal`` does.
 
-        for _ in range(3000):
-            x = random.randint(0, self.env.grid_width - 1)
-            y = random.randint(0, self.env.grid_height - 1)
-            candidate = (x, y)
+        Args:
+            starts (list): Cells of the robots that need a task.
+            frame (int): Current frame, used to age pending tasks.
+        """
+        if not starts:
+            return []
+        while len(self.pending) < max(self.pool_size, len(starts)):
+            goal = self.get_goal(NO_CELL)
+            if goal == NO_CELL:
+                break
+            self.pending.append(goal)
+            self.pending_since.append(frame)
+        if not self.pending:
+            return list(starts)
 
-            if not self._is_valid_goal(candidate, start):
-                continue
+        height = self.env.grid_height
+        codes = np.array([x * height + y for x, y in self.pending], dtype=np.int64)
+        # Distances are symmetric on the grid, so each robot's BFS map prices every task
+        cost = np.stack([self.distances.distance_map(start).ravel()[codes] for start in starts])
+        unreachable = ~np.isfinite(cost) | (cost == 0)  # 0 = the robot's own cell
+        # Overdue tasks are cheaper; offset by the oldest so costs stay non-negative integers
+        age = frame - np.array(self.pending_since, dtype=np.int64)
+        discount = self.age_weight * np.maximum(age - self.age_grace, 0)
+        cost += discount.max() - discount
+        cost[unreachable] = self.env.grid_width * height + discount.max()
 
-            x0, x1 = max(0, x - neighborhood), min(self.env.grid_width, x + neighborhood + 1)
-            y0, y1 = max(0, y - neighborhood), min(self.env.grid_height, y + neighborhood + 1)
-            density = self.env.occupancy[x0:x1, y0:y1].sum()
+        goals = list(starts)
+        taken = set()
+        for row, col in zip(*solve_assignment(cost)):
+            if unreachable[row, col]:
+                continue  # Only left-over tasks fit this robot; it waits and they stay pending
+            goals[row] = self.pending[col]
+            taken.add(int(col))
+            wait = int(age[col])
+            self.assigned_tasks += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        kept = [k for k in range(len(self.pending)) if k not in taken]
+        self.pending = [self.pending[k] for k in kept]
+        self.pending_since = [self.pending_since[k] for k in kept]
+        return goals
 
-            if density > max_density:
-                max_density = density
-                best = candidate
+    def task_latency(self, frame):
+        """
+        Frames tasks waited between being drawn and given to a robot (batch
+        mode; greedy goals are drawn on request and never wait). Tasks still
+        pending at ``frame`` count towards the worst wait.
 
-            if density >= 10:
-                break
+        Returns:
+            dict: assigned, mean_wait and max_wait.
+        """
+        oldest = frame - min(self.pending_since) if self.pending_since else 0
+        return {
+            "assigned": self.assigned_tasks,
+            "mean_wait": self.total_wait / self.assigned_tasks if self.assigned_tasks else 0.0,
+            "max_wait": max(self.max_wait, oldest),
+        }
 
-        if best:
-            self.assigned_goals.add(best)
-            return best
+    def _get_random_goal(self, start):
+        candidate = self.pool.sample(exclude=start)
+        if candidate is None:
+            return start
+        self._assign(candidate)
+        return candidate
 
+    def _get_spread_goal(self, start, min_distance=config.SPREAD_MIN_DISTANCE):
+        # An unassigned cell farther than min_distance from all assigned goals, sampled directly
+        candidate = self._spread_pool(int(min_distance / self.env.resolution)).sample(exclude=start)
+        if candidate is not None:
+            self._assign(candidate)
+            return candidate
         return self._get_random_goal(start)
 
-    def _is_valid_goal(self, candidate, start):
-        return (
-            self.env.is_free(*candidate) and
-            candidate != start and
-            candidate not in self.assigned_goals
-        )
+    def _spread_pool(self, radius):
+        """Pool cells with no assigned goal within ``radius``, kept in step by ``_assign`` / ``release_goal``."""
+        pool = self.spread_pools.get(radius)
+        if pool is None:
+            coverage = CoverageGrid((self.env.grid_width, self.env.grid_height), radius)
+            for goal in self.assigned_goals:
+                coverage.add(goal)
+            cells = self.pool.members()
+            pool = CellPool((self.env.grid_width, self.env.grid_height), cells[coverage.counts.ravel()[cells] == 0])
+            self.coverage[radius] = coverage
+            self.spread_pools[radius] = pool
+        return pool
+
+    def _get_high_density_goal(self, start, neighborhood=5, min_density=10):
+        """A random unassigned cell with at least ``min_density`` obstacle cells nearby, else the densest one."""
+        candidate = self._dense_pool(neighborhood, min_density).sample(exclude=start)
+        if candidate is not None:
+            self._assign(candidate)
+            return candidate
+        cells = self.pool.members()
+        cells = cells[cells != self._encode(start)]
+        if not len(cells):
+            return start
+        density = self._density(neighborhood)[cells]
+        densest = np.flatnonzero(density == density.max())
+        return self._assign_code(cells[densest[random.randrange(len(densest))]])
+
+    def _dense_pool(self, neighborhood, min_density):
+        key = (neighborhood, min_density)
+        pool = self.dense_pools.get(key)
+        if pool is None:
+            cells = self.pool.members()
+            cells = cells[self._density(neighborhood)[cells] >= min_density]
+            pool = CellPool((self.env.grid_width, self.env.grid_height), cells)
+            self.dense_pools[key] = pool
+        return pool
+
+    def _density(self, neighborhood):
+        """Obstacle cells in the clipped (2n+1)^2 window around every cell, from the summed-area table."""
+        density = self.density.get(neighborhood)
+        if density is None:
+            width, height = self.env.grid_width, self.env.grid_height
+            x0 = np.clip(np.arange(width) - neighborhood, 0, width)[:, None]
+            x1 = np.clip(np.arange(width) + neighborhood + 1, 0, width)[:, None]
+            y0 = np.clip(np.arange(height) - neighborhood, 0, height)[None, :]
+            y1 = np.clip(np.arange(height) + neighborhood + 1, 0, height)[None, :]
+            sat = self.sat
+            density = (sat[x1, y1] - sat[x0, y1] - sat[x1, y0] + sat[x0, y0]).ravel()
+            self.density[neighborhood] = density
+        return density
+
+    def _encode(self, cell):
+        """Flat index of ``cell``, or -1 when it lies off the grid."""
+        x, y = cell
+        if 0 <= x < self.env.grid_width and 0 <= y < self.env.grid_height:
+            return x * self.env.grid_height + y
+        return -1
+
+    def _assign_code(self, code):
+        goal = self.pool.decode(code)
+        self._assign(goal)
+        return goal
+
+    def _assign(self, goal):
+        self.assigned_goals.add(goal)
+        self.pool.discard(goal)
+        for pool in self.dense_pools.values():
+            pool.discard(goal)
+        for radius, coverage in self.coverage.items():
+            self.spread_pools[radius].discard_many(coverage.add(goal))
 
     def release_goal(self, pos):
+        if pos not in self.assigned_goals:
+            return
         self.assigned_goals.discard(pos)
+        self.pool.add(pos)
+        for (neighborhood, min_density), pool in self.dense_pools.items():
+            if self.density[neighborhood][self._encode(pos)] >= min_density:
+                pool.add(pos)
+        for radius, coverage in self.coverage.items():
+            uncovered = coverage.discard(pos)
+            self.spread_pools[radius].add_many(uncovered[self.pool.slot[uncovered] >= 0])
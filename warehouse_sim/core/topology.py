@@ -0,0 +1,128 @@
+## warehouse_sim/core/topology.py
+"""
+Sparse corridor topology of an occupancy grid.
+
+A free cell with exactly two free neighbours can only be passed through, so
+maximal chains of such cells are collapsed into corridors. Every other free
+cell (junctions, open floor, dead ends) is a node. A corridor joins the two
+nodes at its ends and records its interior cells and its length (moves from
+end to end). Rings made only of corridor cells get one cell promoted to a
+node so every corridor has ends.
+"""
+
+import numpy as np
+
+
+class Corridor:
+    __slots__ = ("ends", "cells")
+
+    def __init__(self, ends, cells):
+        self.ends = ends    # (node at cells[0]'s side, node at cells[-1]'s side)
+        self.cells = cells  # Interior cells in order
+
+    @property
+    def length(self):
+        return len(self.cells) + 1
+
+
+class TopologyGraph:
+    def __init__(self, occupancy):
+        """
+        Args:
+            occupancy (np.ndarray): Grid of 0 (free) / 1 (obstacle).
+        """
+        free = np.asarray(occupancy) == 0
+        padded = np.pad(free, 1)
+        degree = (padded[:-2, 1:-1].astype(np.int8) + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:])
+        self.shape = free.shape
+        self.free = free
+        self.node_mask = free & (degree != 2)
+        self.corridors = []
+        self.where = {}  # Corridor cell -> (corridor index, position in its cells)
+        self._runs = {}  # Cell -> runs() result
+        self._extract(free & (degree == 2))
+
+    def neighbours(self, cell):
+        x, y = cell
+        width, height = self.shape
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < width and 0 <= ny < height and self.free[nx, ny]:
+                yield nx, ny
+
+    def _extract(self, corridor_mask):
+        # Chains are walked from their cells next to a node; what is left
+        # afterwards are rings, which get a node promoted and are walked again.
+        near_node = np.zeros_like(corridor_mask)
+        padded = np.pad(self.node_mask, 1)
+        near_node |= padded[:-2, 1:-1] | padded[2:, 1:-1] | padded[1:-1, :-2] | padded[1:-1, 2:]
+        pending = [tuple(map(int, cell)) for cell in np.argwhere(corridor_mask & near_node)]
+        while True:
+            for cell in pending:
+                if cell in self.where:
+                    continue
+                node = next(n for n in self.neighbours(cell) if self.node_mask[n])
+                self._walk(node, cell)
+            remaining = np.argwhere(corridor_mask & ~self.node_mask)
+            remaining = [tuple(map(int, cell)) for cell in remaining if tuple(map(int, cell)) not in self.where]
+            if not remaining:
+                break
+            ring_node = remaining[0]
+            self.node_mask[ring_node] = True
+            pending = [n for n in self.neighbours(ring_node) if n not in self.where and not self.node_mask[n]]
+
+    def _walk(self, node, cell):
+        index = len(self.corridors)
+        cells = []
+        previous, current = node, cell
+        while not self.node_mask[current]:
+            self.where[current] = (index, len(cells))
+            cells.append(current)
+            previous, current = current, next(n for n in self.neighbours(current) if n != previous)
+        self.corridors.append(Corridor((node, current), cells))
+
+    def is_node(self, cell):
+        return bool(self.node_mask[cell])
+
+    def run(self, cell, step):
+        """
+        Cells visited when moving from ``cell`` onto its free neighbour
+        ``step`` and following the corridor (if any) to the next node, ending
+        with that node.
+        """
+        located = self.where.get(step)
+        if located is None:
+            return [step]  # Node to node
+        index, position = located
+        corridor = self.corridors[index]
+        here = self.where.get(cell)
+        if here is not None and here[0] == index:
+            forward = position > here[1]
+        elif len(corridor.cells) == 1:
+            forward = cell == corridor.ends[0]
+        else:
+            forward = position == 0
+        if forward:
+            return corridor.cells[position:] + [corridor.ends[1]]
+        return corridor.cells[position::-1] + [corridor.ends[0]]
+
+    def runs(self, cell):
+        """``run`` for every free neighbour of ``cell`` (cached)."""
+        runs = self._runs.get(cell)
+        if runs is None:
+            runs = [self.run(cell, step) for step in self.neighbours(cell)]
+            self._runs[cell] = runs
+        return runs
+
+    def stats(self):
+        lengths = [corridor.length for corridor in self.corridors]
+        free = int(self.free.sum())
+        nodes = int(self.node_mask.sum())
+        return {
+            "free_cells": free,
+            "nodes": nodes,
+            "corridors": len(self.corridors),
+            "corridor_cells": len(self.where),
+            "mean_corridor_length": round(float(np.mean(lengths)), 2) if lengths else 0.0,
+            "max_corridor_length": max(lengths, default=0),
+            "compression": round(free / max(1, nodes), 2),  # Free cells per node
+        }
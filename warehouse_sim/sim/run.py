@@ -6,36 +6,99 @@ Entry point for running the warehouse simulation.
 import argparse
 import logging
 import os
-from collections import defaultdict
 
 from warehouse_sim import config
 from warehouse_sim.core.environment import Environment
-from warehouse_sim.core.reservation import ReservationTable
 from warehouse_sim.core.task import TaskManager
-from warehouse_sim.core.strategies import get_planner
-from warehouse_sim.core.conflict_resolver import ConflictResolver
-from warehouse_sim.agents.robot import Robot
+from warehouse_sim.core.strategies import get_heuristic, get_planner, get_reservation_table
+from warehouse_sim.core.conflict_resolver import ALIASES, STRATEGIES, ConflictResolver
+from warehouse_sim.core.planner.incremental import REPLAN_MODES
+from warehouse_sim.agents.robot import spawn_robots
+from warehouse_sim.sim.trajectory import Trajectory, TrajectoryRecorder
+from warehouse_sim.utils.debug import profiler
+from warehouse_sim.utils.logger import setup_global_logging
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Warehouse multi-robot simulation")
     parser.add_argument("--goal-strategy", type=str, default="random",
                         choices=["random", "spread", "high_density"],
                         help="Goal assignment strategy")
+    parser.add_argument("--task-assignment", type=str, default="greedy",
+                        choices=["greedy", "batch"],
+                        help="batch = match all idle robots to pending tasks by travel distance")
     parser.add_argument("--planner-strategy", type=str, default="astar",
-                        choices=["astar"],
+                        choices=["astar", "sipp", "hpa", "topology", "mstar", "cbs", "ecbs"],
                         help="Path planning algorithm to use")
+    parser.add_argument("--heuristic", type=str, default="manhattan",
+                        choices=["manhattan", "distance_map"],
+                        help="Planner heuristic (distance_map = cached BFS distances)")
     parser.add_argument("--conflict-strategy", type=str, default="wait_then_replan",
-                        choices=["wait", "replan", "idle", "wait_then_replan"],
-                        help="Conflict resolution strategy")
+                        choices=list(STRATEGIES) + list(ALIASES),
+                        help="Conflict resolution strategy (wait / replan / idle are short for always_wait / "
+                             "always_replan / idle_on_block)")
+    parser.add_argument("--replan-mode", type=str, default=config.REPLAN_MODE, choices=list(REPLAN_MODES),
+                        help="REPLAN action: repair each robot's kept D* Lite search, plan from scratch, "
+                             "or auto (incremental with the astar planner only)")
+    parser.add_argument("--layout", type=str, default=None,
+                        help="Load the layout from an image, .csv or .npy file instead of generating one")
+    parser.add_argument("--resolution", type=float, default=None,
+                        help="Meters per cell of --layout (default: its sidecar .json, then config)")
     parser.add_argument("--num-robots", type=int, default=config.NUM_ROBOTS,
                         help="Number of robots")
     parser.add_argument("--export-format", type=str, default="both",
                         choices=["gif", "mp4", "both"],
                         help="Export format")
+    parser.add_argument("--renderer", type=str, default="raster",
+                        choices=["raster", "matplotlib"],
+                        help="raster = cached background streamed to the encoders; matplotlib = FuncAnimation")
+    parser.add_argument("--render-workers", type=int, default=1,
+                        help="Render frame ranges on N processes and join the segments (raster renderer)")
     parser.add_argument("--world-version", type=str, default="default",
-                        choices=["default", "two-phase"],
+                        choices=["default", "two-phase", "vectorized"],
                         help="World stepper version to use")
-    return parser.parse_args()
+    parser.add_argument("--rolling-horizon", action="store_true",
+                        help="Evict reservations older than the current frame")
+    parser.add_argument("--reservation-table", type=str, default="dict",
+                        choices=["dict", "dense"],
+                        help="Reservation table implementation")
+    parser.add_argument("--planner-workers", type=int, default=0,
+                        help="Plan same-frame batches on N processes (astar/sipp/hpa/topology)")
+    parser.add_argument("--window", type=int, default=None,
+                        help="Only reserve the next W frames and re-plan periodically (WHCA*/RHCR)")
+    parser.add_argument("--replan-interval", type=int, default=None,
+                        help="Frames between windowed re-plans (default: the window size)")
+    parser.add_argument("--event-log", type=str, default=None,
+                        help="Write robot events to this .jsonl or .bin file")
+    parser.add_argument("--log-level", type=str, default="INFO", choices=["DEBUG", "INFO", "WARNING"],
+                        help="Minimum event level recorded (MOVE events are DEBUG)")
+    parser.add_argument("--trajectory", type=str, default=os.path.join("logs", "trajectory"),
+                        help="Base path of the recorded trajectory files (.positions/.states/.json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Collect phase timers and counters into logs/profile.json")
+    parser.add_argument("--profile-frames", type=int, nargs=2, metavar=("FIRST", "LAST"), default=None,
+                        help="Also capture cProfile and tracemalloc over these frames (implies --profile)")
+    args = parser.parse_args()
+    if args.resolution is not None and args.layout is None:
+        parser.error("--resolution requires --layout")
+    if args.planner_workers > 1 and args.planner_strategy not in ("astar", "sipp", "hpa", "topology"):
+        parser.error("--planner-workers only supports the astar, sipp, hpa and topology strategies")
+    if args.replan_mode == "incremental" and (args.planner_strategy not in ("astar", "hpa", "topology")
+                                              or args.planner_workers > 1):
+        parser.error("--replan-mode incremental needs the astar, hpa or topology strategy without --planner-workers")
+    if args.render_workers < 1:
+        parser.error("--render-workers must be positive")
+    if args.render_workers > 1 and args.renderer != "raster":
+        parser.error("--render-workers requires the raster renderer")
+    if args.window is not None:
+        if args.window < 1:
+            parser.error("--window must be positive")
+        if args.replan_interval is None:
+            args.replan_interval = args.window
+        if not 1 <= args.replan_interval <= args.window:
+            parser.error("--replan-interval must be between 1 and --window")
+    elif args.replan_interval is not None:
+        parser.error("--replan-interval requires --window")
+    return args
 
 def main():
     args = parse_args()
@@ -43,10 +106,12 @@ def main():
     # Import the appropriate World class
     if args.world_version == "two-phase":
         from warehouse_sim.sim.world_two_phase import World
+    elif args.world_version == "vectorized":
+        from warehouse_sim.sim.world_vectorized import World
     else:
         from warehouse_sim.sim.world import World
 
-    from warehouse_sim.sim.visualizer import animate
+    from warehouse_sim.sim.visualizer import animate, export
 
     # Setup logging
     log_dir = "logs"
@@ -59,31 +124,38 @@ def main():
         format='[%(asctime)s] [%(levelname)s] %(message)s'
     )
 
+    event_log = setup_global_logging(level=getattr(logging, args.log_level), path=args.event_log)
+
+    if args.profile or args.profile_frames:
+        profiler.configure(enabled=True, capture_frames=args.profile_frames,
+                           cprofile=bool(args.profile_frames), tracemalloc=bool(args.profile_frames))
+
     print("[INIT] Setting up environment...")
-    env = Environment(config.WAREHOUSE_WIDTH, config.WAREHOUSE_HEIGHT, config.GRID_RESOLUTION)
-    env.place_shelves()
-    env.place_pallets(config.NUM_PALLETS)
+    if args.layout:
+        env = Environment.from_file(args.layout, resolution=args.resolution)
+        print(f"[INIT] Loaded {args.layout}: {env.grid_width}x{env.grid_height} cells "
+              f"at {env.resolution} m, {len(env.reachable_cells())} reachable")
+    else:
+        env = Environment(config.WAREHOUSE_WIDTH, config.WAREHOUSE_HEIGHT, config.GRID_RESOLUTION)
+        env.place_shelves()
+        env.place_pallets(config.NUM_PALLETS)
 
     print("[INIT] Initializing planner and reservation table...")
-    reservation_table = ReservationTable()
-    planner = get_planner(args.planner_strategy, env.occupancy, reservation_table)
-    task_manager = TaskManager(env, strategy=args.goal_strategy)
+    reservation_table = get_reservation_table(
+        args.reservation_table, env, rolling_horizon=args.rolling_horizon, window=args.window
+    )
+    reservation_table = profiler.wrap_table(reservation_table)
+    heuristic = get_heuristic(args.heuristic, env.occupancy)
+    planner = get_planner(args.planner_strategy, env.occupancy, reservation_table, heuristic=heuristic,
+                          workers=args.planner_workers)
+    task_manager = TaskManager(env, strategy=args.goal_strategy, assignment=args.task_assignment,
+                               distances=heuristic)
 
     print("[INIT] Initializing conflict resolver...")
     conflict_resolver = ConflictResolver(strategy=args.conflict_strategy, max_retries=3, cooldown=2)
 
     print("[INIT] Spawning robots...")
-    robots = []
-    used_starts = set()
-    for i in range(args.num_robots):
-        for _ in range(1000):
-            start = task_manager.get_goal((0, 0))
-            if start not in used_starts:
-                used_starts.add(start)
-                break
-        end = task_manager.get_goal(start)
-        robot = Robot(i, start, end, planner)
-        robots.append(robot)
+    robots = spawn_robots(planner, task_manager, args.num_robots)
 
     print("[INIT] Creating world...")
     world = World(
@@ -91,40 +163,55 @@ def main():
         planner=planner,
         robots=robots,
         conflict_resolver=conflict_resolver,
-        task_manager=task_manager
+        task_manager=task_manager,
+        replan_interval=args.replan_interval,
+        replan_mode=args.replan_mode
     )
 
-    print("[RUN] Stepping simulation and capturing frames...")
-    all_frames = []
+    print("[RUN] Stepping simulation and recording the trajectory...")
+    recorder = TrajectoryRecorder(args.trajectory, [robot.id for robot in robots])
     for _ in range(config.ANIMATION_MAX_STEPS):
         world.step(
             get_goal_fn=task_manager.get_goal,
             release_goal_fn=task_manager.release_goal
         )
-        frame_snapshot = []
-        seen_positions = defaultdict(list)
-
-        for robot in robots:
-            pos = robot.current_position()
-            frame_snapshot.append(pos)
-            seen_positions[pos].append(robot.id)
-
-        for pos, ids in seen_positions.items():
-            if len(ids) > 1:
-                for i in range(len(ids)):
-                    for j in range(i + 1, len(ids)):
-                        logging.info(f"[OVERLAP] Robots {ids[i]} and {ids[j]} at {pos} on frame {world.frame}")
+        recorder.record(world.positions(), world.states())
 
-        all_frames.append(frame_snapshot)
+    recorder.close()
+    print(f"[DONE] Trajectory: {recorder.frames} frames written to {args.trajectory}.*")
+    for line in world.validator.describe():
+        logging.info(line)
+    print(f"[DONE] Violations: {world.validator.summary()} (details in {overlap_log})")
 
     print("[DONE] Final Summary:")
     print(world.get_summary())
+    if task_manager.batch:
+        print(f"[DONE] Task latency (frames pending): {task_manager.task_latency(world.frame)}")
+    print(f"[DONE] Events: {event_log.counters()}")
+    event_log.close()
+    print(f"[DONE] Heuristic: {heuristic.stats()}")
+    print(f"[DONE] Planner: {planner.stats.as_dict()}")
+    if world.replanner is not None:
+        print(f"[DONE] Incremental re-planning: {world.replanner.stats()}")
+    if hasattr(planner, "close"):
+        print(f"[DONE] Parallel re-plans after commit conflicts: {planner.replanned}")
+        planner.close()
+    if profiler.enabled:
+        profile_path = os.path.join(log_dir, "profile.json")
+        profiler.dump(profile_path)
+        print(f"[DONE] Profile written to {profile_path}")
 
     print("[VIS] Starting animation...")
+    all_frames = Trajectory(args.trajectory)
     gif_path = "warehouse_sim_output.gif"
     mp4_path = "warehouse_sim_output.mp4"
 
-    if args.export_format in ("gif", "both"):
+    if args.renderer == "raster":
+        export(env, all_frames,
+               filename_gif=gif_path if args.export_format in ("gif", "both") else None,
+               filename_mov=mp4_path if args.export_format in ("mp4", "both") else None,
+               workers=args.render_workers)
+    elif args.export_format in ("gif", "both"):
         animate(world, all_frames, gif_path, filename_mov=mp4_path if args.export_format == "both" else None)
     elif args.export_format == "mp4":
         animate(world, all_frames, None, filename_mov=mp4_path)
@@ -0,0 +1,169 @@
+# warehouse_sim/sim/sweep.py
+"""
+Headless parameter sweeps.
+
+Runs every combination of the given goal strategies, task assignment modes,
+planners, conflict strategies, re-plan modes, world versions, robot counts
+and seeds across a process pool, without visualization or log files, and
+writes one row per run.
+
+    python -m warehouse_sim.sim.sweep --planners astar sipp --robots 10 20 \\
+        --seeds 0 1 2 --output results.csv
+"""
+
+import argparse
+import csv
+import importlib
+import itertools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from warehouse_sim import config
+from warehouse_sim.agents.robot import spawn_robots
+from warehouse_sim.bench.common import make_environment
+from warehouse_sim.core.conflict_resolver import STRATEGIES, ConflictResolver
+from warehouse_sim.core.planner.incremental import REPLAN_MODES
+from warehouse_sim.core.strategies import get_heuristic, get_planner, get_reservation_table
+from warehouse_sim.core.task import TaskManager
+
+WORLD_MODULES = {
+    "default": "warehouse_sim.sim.world",
+    "two-phase": "warehouse_sim.sim.world_two_phase",
+    "vectorized": "warehouse_sim.sim.world_vectorized",
+}
+
+FIELDS = [
+    "goal_strategy", "task_assignment", "planner", "conflict_strategy", "replan_mode", "world_version",
+    "num_robots", "seed", "frames", "completed_tasks", "throughput", "task_wait_mean", "task_wait_max", "overlaps", "swaps",
+    "teleports", "planner_calls", "planner_failures", "planner_time_s", "wall_time_s",
+]
+
+
+def run_experiment(params):
+    """
+    Run one headless simulation.
+
+    Args:
+        params (dict): goal_strategy, task_assignment, planner,
+            conflict_strategy, replan_mode, world_version, num_robots, seed, frames,
+            heuristic, reservation_table and layout (a layout file, or
+            None for the seeded random layout).
+
+    Returns:
+        dict: One results row (see FIELDS).
+    """
+    started = time.perf_counter()
+    env = make_environment(params["seed"], layout=params["layout"])
+    # Past frames are never read again, so evict them to keep long runs flat in memory
+    table = get_reservation_table(params["reservation_table"], env, rolling_horizon=True)
+    heuristic = get_heuristic(params["heuristic"], env.occupancy)
+    planner = get_planner(params["planner"], env.occupancy, table, heuristic=heuristic)
+    task_manager = TaskManager(env, strategy=params["goal_strategy"], assignment=params["task_assignment"],
+                               distances=heuristic)
+    conflict_resolver = ConflictResolver(strategy=params["conflict_strategy"], max_retries=3, cooldown=2)
+    World = importlib.import_module(WORLD_MODULES[params["world_version"]]).World
+
+    robots = spawn_robots(planner, task_manager, params["num_robots"])
+    world = World(env, planner, robots, conflict_resolver=conflict_resolver, task_manager=task_manager,
+                  replan_mode=params["replan_mode"])
+    for _ in range(params["frames"]):
+        world.step(task_manager.get_goal, task_manager.release_goal)
+
+    summary = world.get_summary()
+    violations = summary["violations"]
+    completed = sum(summary["completed_tasks"].values())
+    latency = task_manager.task_latency(summary["frame"])
+    return {
+        **{key: params[key] for key in FIELDS[:8]},
+        "frames": summary["frame"],
+        "completed_tasks": completed,
+        "throughput": completed / summary["frame"] if summary["frame"] else 0.0,
+        "task_wait_mean": round(latency["mean_wait"], 2),
+        "task_wait_max": latency["max_wait"],
+        "overlaps": violations["vertex"],
+        "swaps": violations["swap"],
+        "teleports": violations["teleport"],
+        "planner_calls": planner.stats.calls,
+        "planner_failures": planner.stats.failures,
+        "planner_time_s": round(planner.stats.time_s, 4),
+        "wall_time_s": round(time.perf_counter() - started, 4),
+    }
+
+
+def _init_worker():
+    logging.disable(logging.WARNING)  # Planner fallbacks would flood the console
+
+
+def write_results(rows, path):
+    """Write rows as CSV, or as Parquet when ``path`` ends in .parquet (needs pandas)."""
+    if path.endswith(".parquet"):
+        import pandas as pd
+        pd.DataFrame(rows, columns=FIELDS).to_parquet(path, index=False)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless parameter sweep")
+    parser.add_argument("--goal-strategies", nargs="+", default=["random"],
+                        choices=["random", "spread", "high_density"])
+    parser.add_argument("--task-assignments", nargs="+", default=["greedy"], choices=["greedy", "batch"])
+    parser.add_argument("--planners", nargs="+", default=["astar"],
+                        choices=["astar", "sipp", "hpa", "topology", "mstar", "cbs", "ecbs"])
+    parser.add_argument("--conflict-strategies", nargs="+", default=["wait_then_replan"],
+                        choices=list(STRATEGIES))
+    parser.add_argument("--replan-modes", nargs="+", default=[config.REPLAN_MODE], choices=list(REPLAN_MODES),
+                        help="REPLAN action (auto = incremental with astar only, full for other planners)")
+    parser.add_argument("--world-versions", nargs="+", default=["default"], choices=sorted(WORLD_MODULES))
+    parser.add_argument("--robots", nargs="+", type=int, default=[config.NUM_ROBOTS])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--frames", type=int, default=config.ANIMATION_MAX_STEPS)
+    parser.add_argument("--heuristic", type=str, default="manhattan",
+                        choices=["manhattan", "distance_map"])
+    parser.add_argument("--reservation-table", type=str, default="dict",
+                        choices=["dict", "dense"])
+    parser.add_argument("--layout", type=str, default=None,
+                        help="Layout file shared by every run (default: a random layout per seed)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--output", type=str, default="sweep_results.csv",
+                        help="Results table (.csv or .parquet)")
+    args = parser.parse_args()
+    if "incremental" in args.replan_modes and set(args.planners) - {"astar", "hpa", "topology"}:
+        parser.error("--replan-modes incremental only applies to the astar, hpa and topology planners")
+    return args
+
+
+def main():
+    args = parse_args()
+    grid = [
+        {
+            "goal_strategy": goal, "task_assignment": assignment, "planner": planner,
+            "conflict_strategy": conflict, "replan_mode": replan_mode, "world_version": world,
+            "num_robots": robots, "seed": seed, "frames": args.frames,
+            "heuristic": args.heuristic, "reservation_table": args.reservation_table, "layout": args.layout,
+        }
+        for goal, assignment, planner, conflict, replan_mode, world, robots, seed in itertools.product(
+            args.goal_strategies, args.task_assignments, args.planners, args.conflict_strategies,
+            args.replan_modes, args.world_versions, args.robots, args.seeds)
+    ]
+    print(f"[SWEEP] {len(grid)} runs")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+        for row in pool.map(run_experiment, grid):
+            rows.append(row)
+            print(f"[SWEEP] {len(rows)}/{len(grid)} {row['planner']} {row['world_version']} "
+                  f"n={row['num_robots']} seed={row['seed']}: {row['completed_tasks']} tasks, "
+                  f"{row['overlaps']} overlaps, {row['swaps']} swaps, {row['teleports']} teleports")
+
+    write_results(rows, args.output)
+    print(f"[SWEEP] Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
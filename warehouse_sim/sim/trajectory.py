@@ -0,0 +1,162 @@
+# warehouse_sim/sim/trajectory.py
+"""
+Disk-backed trajectory recording.
+
+Every frame stores each robot's cell as an int16 ``(x, y)`` pair and its
+state code (``agents.robot.STATE_CODES``) as an int8, in two raw files next to
+a small JSON header:
+
+    <path>.positions   int16 (frames, robots, 2)
+    <path>.states      int8  (frames, robots)
+    <path>.json        {"robots", "frames", "ids", "chunk_frames"}
+
+The recorder grows the files one chunk of frames at a time and writes
+through a memory map of the current chunk, so memory use does not depend on
+run length. The header is rewritten at every chunk boundary, so a run that
+dies early stays readable up to its last full chunk. ``Trajectory`` maps the
+files back read-only; indexing it only touches the frames asked for.
+"""
+
+import json
+import os
+
+import numpy as np
+from warehouse_sim import config
+
+POSITION_DTYPE = np.int16
+STATE_DTYPE = np.int8
+
+
+def _files(path):
+    return path + ".positions", path + ".states", path + ".json"
+
+
+class TrajectoryRecorder:
+    def __init__(self, path, robot_ids, chunk_frames=config.TRAJECTORY_CHUNK_FRAMES):
+        """
+        Args:
+            path (str): Base path; the three files get their suffixes appended.
+            robot_ids (list): Robot ids, in the order positions are recorded.
+            chunk_frames (int): Frames mapped (and allocated on disk) at a time.
+        """
+        self.path = path
+        self.ids = [int(robot_id) for robot_id in robot_ids]
+        self.num_robots = len(self.ids)
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self._positions = None  # Memory map of the current chunk
+        self._states = None
+        self._chunk_start = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        positions_path, states_path, _ = _files(path)
+        for name in (positions_path, states_path):
+            open(name, "wb").close()
+        self._write_header()
+
+    def record(self, positions, states=None):
+        """
+        Append one frame.
+
+        Args:
+            positions (np.ndarray): (robots, 2) cells, e.g. ``world.positions()``.
+            states (np.ndarray, optional): (robots,) state codes, e.g.
+                ``world.states()``; recorded as -1 when omitted.
+        """
+        offset = self.frames - self._chunk_start
+        if self._positions is None or offset == self.chunk_frames:
+            self._next_chunk()
+            offset = 0
+        self._positions[offset] = positions
+        self._states[offset] = -1 if states is None else states
+        self.frames += 1
+
+    def _next_chunk(self):
+        self._flush()
+        self._chunk_start = self.frames
+        positions_path, states_path, _ = _files(self.path)
+        shape = (self.chunk_frames, self.num_robots)
+        self._positions = self._map_chunk(positions_path, shape + (2,), POSITION_DTYPE)
+        self._states = self._map_chunk(states_path, shape, STATE_DTYPE)
+
+    def _map_chunk(self, filename, shape, dtype):
+        offset = self._chunk_start * int(np.prod(shape[1:], dtype=np.int64)) * np.dtype(dtype).itemsize
+        size = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+        if not size:
+            return np.zeros(shape, dtype=dtype)  # No robots: nothing to map
+        with open(filename, "r+b") as f:
+            f.truncate(offset + size)
+        return np.memmap(filename, dtype=dtype, mode="r+", offset=offset, shape=shape)
+
+    def _flush(self):
+        if self._positions is None:
+            return
+        for chunk in (self._positions, self._states):
+            if isinstance(chunk, np.memmap):
+                chunk.flush()
+        self._write_header()
+
+    def _write_header(self):
+        header = {
+            "robots": self.num_robots,
+            "frames": self.frames,
+            "ids": self.ids,
+            "chunk_frames": self.chunk_frames,
+        }
+        with open(_files(self.path)[2], "w") as f:
+            json.dump(header, f)
+
+    def close(self):
+        """Flush the last chunk and trim the files to the recorded frames."""
+        self._flush()
+        self._positions = self._states = None
+        positions_path, states_path, _ = _files(self.path)
+        for name, frame_bytes in ((positions_path, self.num_robots * 2 * np.dtype(POSITION_DTYPE).itemsize),
+                                  (states_path, self.num_robots * np.dtype(STATE_DTYPE).itemsize)):
+            with open(name, "r+b") as f:
+                f.truncate(self.frames * frame_bytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class Trajectory:
+    """
+    Read-only view of a recorded run.
+
+    ``trajectory[frame]`` is that frame's (robots, 2) positions, so a
+    ``Trajectory`` can be passed to ``animate`` wherever a list of frames was.
+    """
+
+    def __init__(self, path):
+        positions_path, states_path, header_path = _files(path)
+        with open(header_path) as f:
+            header = json.load(f)
+        self.path = path
+        self.ids = header["ids"]
+        self.num_robots = header["robots"]
+        self.frames = header["frames"]
+        self.positions = self._map(positions_path, (self.frames, self.num_robots, 2), POSITION_DTYPE)
+        self.states = self._map(states_path, (self.frames, self.num_robots), STATE_DTYPE)
+
+    @staticmethod
+    def _map(filename, shape, dtype):
+        if not int(np.prod(shape)):
+            return np.zeros(shape, dtype=dtype)  # np.memmap cannot map an empty file
+        return np.memmap(filename, dtype=dtype, mode="r", shape=shape)
+
+    def __len__(self):
+        return self.frames
+
+    def __getitem__(self, index):
+        return self.positions[index]
+
+    def robot(self, robot_id, start=0, stop=None):
+        """(frames, 2) cells of one robot between ``start`` and ``stop``."""
+        return self.positions[start:stop, self.ids.index(robot_id)]
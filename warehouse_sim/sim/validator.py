@@ -0,0 +1,126 @@
+# warehouse_sim/sim/validator.py
+"""
+Per-frame safety checks on robot positions.
+
+Cells are encoded as ``x * grid_height + y`` and each frame is compared with
+the previous one using sorts and lookups over all robots at once:
+
+- VERTEX: two robots on the same cell (one row per robot beyond the first,
+  paired with the lowest-index robot there)
+- SWAP: two robots exchanged cells
+- TELEPORT: a robot moved more than one cell (4-connected)
+
+Violations are appended to an int32 table with the columns in ``FIELDS``.
+"""
+
+import numpy as np
+
+VERTEX = 0
+SWAP = 1
+TELEPORT = 2
+
+VIOLATION_NAMES = ["VERTEX", "SWAP", "TELEPORT"]
+FIELDS = ("frame", "kind", "robot", "other", "x", "y")
+NONE = -1
+
+
+class Validator:
+    def __init__(self, robot_ids, grid_width, grid_height, positions, capacity=1024):
+        """
+        Args:
+            robot_ids (array-like): Robot ids, in the order positions are given.
+            grid_width (int): Grid size, used to encode cells.
+            grid_height (int):
+            positions (np.ndarray): (N, 2) cells before the first checked frame.
+            capacity (int): Initial rows of the violation table (grows as needed).
+        """
+        self.ids = np.asarray(robot_ids, dtype=np.int64)
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.previous = self._encode(positions)
+        self.table = np.full((capacity, len(FIELDS)), NONE, dtype=np.int32)
+        self.size = 0
+        self.counts = [0] * len(VIOLATION_NAMES)
+
+    def _encode(self, positions):
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        return positions[:, 0] * self.grid_height + positions[:, 1]
+
+    def check(self, frame, positions):
+        """Check one frame against the previous one; returns the number of new violations."""
+        current = self._encode(positions)
+        previous, self.previous = self.previous, current
+        found = 0
+
+        # Vertex: equal neighbours after a stable sort share a cell
+        order = np.argsort(current, kind="stable")
+        cells = current[order]
+        same = cells[1:] == cells[:-1]
+        if same.any():
+            run_start = np.zeros(len(order), dtype=np.int64)
+            starts = np.flatnonzero(np.concatenate(([True], ~same)))
+            run_start[starts] = starts
+            np.maximum.accumulate(run_start, out=run_start)
+            dup = np.flatnonzero(same) + 1
+            found += self._append(frame, VERTEX, order[dup], order[run_start[dup]], current[order[dup]])
+
+        moved = np.flatnonzero(current != previous)
+        if len(moved):
+            # Swap: some other mover's edge is this mover's edge reversed
+            size = self.grid_width * self.grid_height
+            edges = previous[moved] * size + current[moved]
+            reverse = current[moved] * size + previous[moved]
+            edge_order = np.argsort(edges)
+            sorted_edges = edges[edge_order]
+            lo = np.searchsorted(sorted_edges, reverse, side="left")
+            matches = np.searchsorted(sorted_edges, reverse, side="right") - lo
+            # Expand to every matching mover (several only when robots already overlap)
+            robot = np.repeat(moved, matches)
+            offset = np.arange(len(robot)) - np.repeat(np.cumsum(matches) - matches, matches)
+            other = moved[edge_order[np.repeat(lo, matches) + offset]]
+            first = robot < other  # Report each pair once
+            found += self._append(frame, SWAP, robot[first], other[first], current[robot[first]])
+
+            # Teleport: more than one 4-connected step
+            dx = np.abs(current[moved] // self.grid_height - previous[moved] // self.grid_height)
+            dy = np.abs(current[moved] % self.grid_height - previous[moved] % self.grid_height)
+            jumped = moved[dx + dy > 1]
+            found += self._append(frame, TELEPORT, jumped, None, current[jumped])
+        return found
+
+    def _append(self, frame, kind, robots, others, cells):
+        n = len(robots)
+        if not n:
+            return 0
+        if self.size + n > len(self.table):
+            grown = np.full((max(2 * len(self.table), self.size + n), len(FIELDS)), NONE, dtype=np.int32)
+            grown[:self.size] = self.table[:self.size]
+            self.table = grown
+        rows = self.table[self.size:self.size + n]
+        rows[:, 0] = frame
+        rows[:, 1] = kind
+        rows[:, 2] = self.ids[robots]
+        if others is not None:
+            rows[:, 3] = self.ids[others]
+        rows[:, 4] = cells // self.grid_height
+        rows[:, 5] = cells % self.grid_height
+        self.size += n
+        self.counts[kind] += n
+        return n
+
+    def violations(self):
+        """Recorded violations as an (n, 6) int32 array (see FIELDS)."""
+        return self.table[:self.size]
+
+    def summary(self):
+        """Violations seen per kind."""
+        return dict(zip((name.lower() for name in VIOLATION_NAMES), self.counts))
+
+    def describe(self, limit=None):
+        """One line per violation (the last ``limit`` when given), for logs and UIs."""
+        rows = self.violations()[-limit:] if limit else self.violations()
+        lines = []
+        for frame, kind, robot, other, x, y in rows.tolist():
+            pair = f"Robots {robot} and {other}" if other != NONE else f"Robot {robot}"
+            lines.append(f"[{VIOLATION_NAMES[kind]}] Frame {frame}: {pair} at ({x}, {y})")
+        return lines
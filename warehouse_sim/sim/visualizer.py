@@ -1,6 +1,12 @@
 ## warehouse_sim/sim/visualizer.py
 """
 Handles drawing and animating the simulation.
+
+``animate`` draws every frame through matplotlib. ``export`` is the faster
+path: ``RasterRenderer`` rasterizes the shelves and pallets once, stamps the
+robot markers onto a copy of that background with NumPy and the frames are
+streamed straight to ffmpeg and to a GIF writer, so only one frame is held in
+memory at a time. Long runs can be split across worker processes.
 """
 
 import matplotlib
@@ -8,21 +14,36 @@ matplotlib.use("Agg")  # Use non-interactive backend for faster rendering
 
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+import matplotlib.colors as mcolors
 from warehouse_sim import config
 import imageio.v3 as iio
 import ffmpeg
 import numpy as np
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from PIL import GifImagePlugin, Image
 
 COLORS = ['red', 'blue', 'green', 'orange', 'purple', 'cyan', 'magenta', 'yellow', 'pink', 'lime']
 
 def animate(world, all_frames, filename_gif, filename_mov=None):
+    environment = world.environment
     fig, ax = plt.subplots(figsize=(12, 8))
-    ax.set_xlim(0, config.WAREHOUSE_WIDTH)
-    ax.set_ylim(0, config.WAREHOUSE_HEIGHT)
+    ax.set_xlim(0, environment.width_m)
+    ax.set_ylim(0, environment.height_m)
     ax.set_aspect('equal')
     ax.set_title("Warehouse Robot Simulation")
 
+    # Obstacles not covered by object metadata (loaded layouts) come from the grid itself
+    blocked = np.asarray(environment.occupancy) != 0
+    for _, (gx, gy, gw, gh) in environment.objects:
+        blocked[gx:gx + gw, gy:gy + gh] = False
+    if blocked.any():
+        ax.imshow(np.ma.masked_equal(blocked.T, False), cmap=mcolors.ListedColormap(['gray']), alpha=0.5,
+                  origin='lower', interpolation='nearest',
+                  extent=(0, environment.grid_width * environment.resolution,
+                          0, environment.grid_height * environment.resolution))
     for label, (gx, gy, gw, gh) in world.environment.objects:
         color = 'gray' if label == 'shelf' else 'orange'
         x, y = world.environment.to_world_coords(gx, gy)
@@ -44,19 +65,6 @@ def animate(world, all_frames, filename_gif, filename_mov=None):
         for i, robot_dot in enumerate(robot_dots):
             gx, gy = all_frames[frame][i]
             wx, wy = world.environment.to_world_coords(gx, gy)
-
-            # 🚨 Jump detection
-            if not hasattr(update, "last_positions"):
-                update.last_positions = [None] * len(world.robots)
-
-            last_pos = update.last_positions[i]
-            if last_pos:
-                last_gx, last_gy = last_pos
-                dx, dy = abs(gx - last_gx), abs(gy - last_gy)
-                if dx > 1 or dy > 1:
-                    print(f"[JUMP DETECTED] Robot {i} frame {frame}: ({last_gx},{last_gy}) -> ({gx},{gy})")
-
-            update.last_positions[i] = (gx, gy)
             robot_dot.set_data([wx + 0.25], [wy + 0.25])
         return robot_dots
 
@@ -97,3 +105,199 @@ def animate(world, all_frames, filename_gif, filename_mov=None):
         process.stdin.close()
         process.wait()
         print(f"[VIS] MP4 saved to {filename_mov}")
+
+
+class RasterRenderer:
+    def __init__(self, environment, num_robots, cell_px=config.RENDER_CELL_PX):
+        """
+        Frames are drawn as palette indices (white, shelf, pallet, then one
+        entry per marker color), so the GIF needs no quantization and RGB is
+        a single lookup.
+
+        Args:
+            environment (Environment): Layout drawn into the cached background.
+            num_robots (int): Robots per frame (marker colors cycle through COLORS).
+            cell_px (int): Pixels per grid cell.
+        """
+        self.cell_px = cell_px
+        self.grid_height = environment.grid_height
+        width, height = environment.grid_width * cell_px, environment.grid_height * cell_px
+        # libx264 / yuv420p need even frame dimensions
+        self.width, self.height = width + width % 2, height + height % 2
+
+        self.palette = np.array(
+            [_blend('white'), _blend('gray', alpha=0.5), _blend('orange', alpha=0.5)]
+            + [_blend(color) for color in COLORS], dtype=np.uint8)
+        background = np.zeros((self.height, self.width), dtype=np.uint8)
+        # Every blocked cell in shelf grey, then pallets recolored from the object list
+        blocked = np.asarray(environment.occupancy)[:, ::-1].T.astype(bool)
+        background[:height, :width] = np.repeat(np.repeat(blocked, cell_px, axis=0), cell_px, axis=1)
+        for label, (gx, gy, gw, gh) in environment.objects:
+            top = (self.grid_height - gy - gh) * cell_px
+            background[top:top + gh * cell_px, gx * cell_px:(gx + gw) * cell_px] = 1 if label == 'shelf' else 2
+        self.background = background
+
+        # Marker pixel offsets within a cell (a disc), and one palette entry per robot
+        centre = (cell_px - 1) / 2.0
+        rows, cols = np.nonzero(
+            np.hypot(*(np.mgrid[0:cell_px, 0:cell_px] - centre)) <= max(cell_px * 0.45, 0.5))
+        self._marker_rows, self._marker_cols = rows, cols
+        self.robot_colors = (3 + np.arange(num_robots) % len(COLORS)).astype(np.uint8)
+
+    def draw_indices(self, positions):
+        """Palette-index frame (height, width) with robots at ``positions`` ((N, 2) cells)."""
+        positions = np.asarray(positions, dtype=np.int64).reshape(-1, 2)
+        frame = self.background.copy()
+        top = (self.grid_height - 1 - positions[:, 1]) * self.cell_px
+        left = positions[:, 0] * self.cell_px
+        frame[top[:, None] + self._marker_rows, left[:, None] + self._marker_cols] = \
+            self.robot_colors[:len(positions), None]
+        return frame
+
+    def draw(self, positions):
+        """RGB frame (height, width, 3) with robots at ``positions``."""
+        return self.palette[self.draw_indices(positions)]
+
+
+def _blend(color, alpha=1.0):
+    """``color`` over a white background, as uint8 RGB."""
+    rgb = np.array(mcolors.to_rgb(color))
+    return np.round((alpha * rgb + (1.0 - alpha)) * 255).astype(np.uint8)
+
+
+class _GifStream:
+    """
+    Appends palette frames to a looping GIF as they arrive (Pillow only
+    buffers whole animations). A ``fragment`` holds frame blocks only, with
+    no header or trailer, so fragments rendered apart can be concatenated.
+    """
+
+    def __init__(self, filename, palette, size, duration_ms, fragment=False):
+        self.file = open(filename, "wb")
+        self.palette = palette.tobytes()
+        self.duration_ms = duration_ms
+        self.fragment = fragment
+        if not fragment:
+            header, _ = GifImagePlugin.getheader(self._image(np.zeros(size[::-1], dtype=np.uint8)),
+                                                 info={"optimize": False, "loop": 0})
+            self.file.writelines(header)
+
+    def _image(self, indices):
+        im = Image.fromarray(indices, "P")
+        im.putpalette(self.palette)
+        return im
+
+    def write(self, indices):
+        self.file.writelines(GifImagePlugin.getdata(self._image(indices), duration=self.duration_ms))
+
+    def close(self):
+        if not self.fragment:
+            self.file.write(b";")
+        self.file.close()
+
+
+def _open_mp4(filename_mov, width, height):
+    return (
+        ffmpeg
+        .input('pipe:', format='rawvideo', pix_fmt='rgb24', s=f'{width}x{height}', framerate=1000/config.ANIMATION_INTERVAL_MS)
+        .output(filename_mov, vcodec='libx264', pix_fmt='yuv420p', movflags='faststart')
+        .overwrite_output()
+        .run_async(pipe_stdin=True, quiet=True)
+    )
+
+
+def _render(renderer, all_frames, filename_gif=None, filename_mov=None, fragment=False):
+    """Stream every frame of ``all_frames`` to the GIF and/or MP4 file."""
+    size = (renderer.width, renderer.height)
+    gif = _GifStream(filename_gif, renderer.palette, size, config.ANIMATION_INTERVAL_MS,
+                     fragment=fragment) if filename_gif else None
+    mp4 = _open_mp4(filename_mov, *size) if filename_mov else None
+    try:
+        for index in range(len(all_frames)):
+            frame = renderer.draw_indices(all_frames[index])
+            if gif is not None:
+                gif.write(frame)
+            if mp4 is not None:
+                mp4.stdin.write(renderer.palette[frame].tobytes())
+    finally:
+        if gif is not None:
+            gif.close()
+        if mp4 is not None:
+            mp4.stdin.close()
+            mp4.wait()
+
+
+def _render_segment(environment, source, start, stop, num_robots, cell_px, gif_part, mp4_part):
+    """Worker task: render frames [start, stop) of ``source`` (a trajectory path or a list of frames)."""
+    if isinstance(source, str):
+        from warehouse_sim.sim.trajectory import Trajectory
+        source = Trajectory(source)
+    renderer = RasterRenderer(environment, num_robots, cell_px=cell_px)
+    _render(renderer, source[start:stop], gif_part, mp4_part, fragment=True)
+
+
+def _export_parallel(environment, all_frames, filename_gif, filename_mov, cell_px, workers):
+    from warehouse_sim.sim.trajectory import Trajectory
+
+    total = len(all_frames)
+    num_robots = len(all_frames[0])
+    bounds = np.linspace(0, total, min(workers, total) + 1).astype(int)
+    with tempfile.TemporaryDirectory() as tmpdir, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures, gif_parts, mp4_parts = [], [], []
+        for k, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+            gif_part = os.path.join(tmpdir, f"part{k:04d}.gif") if filename_gif else None
+            mp4_part = os.path.join(tmpdir, f"part{k:04d}.mp4") if filename_mov else None
+            # A trajectory is re-opened by path in the worker; plain lists ship their slice
+            if isinstance(all_frames, Trajectory):
+                task = (all_frames.path, int(start), int(stop))
+            else:
+                task = (list(all_frames[start:stop]), 0, int(stop - start))
+            futures.append(pool.submit(_render_segment, environment, *task, num_robots, cell_px,
+                                       gif_part, mp4_part))
+            gif_parts.append(gif_part)
+            mp4_parts.append(mp4_part)
+        for future in futures:
+            future.result()
+
+        if filename_gif:
+            renderer = RasterRenderer(environment, num_robots, cell_px=cell_px)
+            gif = _GifStream(filename_gif, renderer.palette, (renderer.width, renderer.height),
+                             config.ANIMATION_INTERVAL_MS)
+            for part in gif_parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, gif.file)
+            gif.close()
+        if filename_mov:
+            concat_list = os.path.join(tmpdir, "segments.txt")
+            with open(concat_list, "w") as f:
+                f.writelines(f"file '{part}'\n" for part in mp4_parts)
+            (
+                ffmpeg
+                .input(concat_list, format='concat', safe=0)
+                .output(filename_mov, c='copy', movflags='faststart')
+                .overwrite_output()
+                .run(quiet=True)
+            )
+
+
+def export(environment, all_frames, filename_gif=None, filename_mov=None, cell_px=config.RENDER_CELL_PX,
+           workers=1):
+    """
+    Render ``all_frames`` (a ``Trajectory`` or a list of per-frame positions)
+    with ``RasterRenderer``, streaming each frame to the GIF and/or MP4 file.
+
+    With ``workers`` > 1 the frames are split into contiguous ranges rendered
+    in separate processes (each writes its own GIF fragment / MP4 segment),
+    which are then joined: GIF fragments byte-wise under one header, MP4
+    segments with ffmpeg's concat demuxer (no re-encode).
+    """
+    if workers > 1 and len(all_frames) > 1:
+        _export_parallel(environment, all_frames, filename_gif, filename_mov, cell_px, workers)
+    else:
+        num_robots = len(all_frames[0]) if len(all_frames) else 0
+        _render(RasterRenderer(environment, num_robots, cell_px=cell_px), all_frames, filename_gif, filename_mov)
+
+    if filename_gif:
+        print(f"[VIS] Animation saved to {filename_gif}")
+    if filename_mov:
+        print(f"[VIS] MP4 saved to {filename_mov}")
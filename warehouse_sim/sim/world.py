@@ -3,19 +3,39 @@
 Simulates a world of multiple robots, stepping each frame.
 """
 
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.agents.robot import STATE_CODES, reassign_batch, replan_batch, replan_blocked
 from warehouse_sim.core.conflict_resolver import ConflictResolver, ResolutionAction
+from warehouse_sim.core.planner.incremental import IncrementalReplanner, use_incremental
+from warehouse_sim.sim.validator import Validator
+from warehouse_sim.utils import logger as events
+from warehouse_sim.utils.debug import profiler
 
 class World:
-    def __init__(self, environment, planner, robots, conflict_resolver=None, task_manager=None):
+    def __init__(self, environment, planner, robots, conflict_resolver=None, task_manager=None,
+                 replan_interval=None, validate=True, replan_mode=config.REPLAN_MODE):
         self.environment = environment
         self.planner = planner
         self.robots = robots
         self.frame = 0
         self.conflict_resolver = conflict_resolver
-        self.task_manager = task_manager  # Required for replanning
+        self.task_manager = task_manager
+        self.replan_interval = replan_interval
+        # Kept per-robot searches for the REPLAN conflict action
+        self.replanner = IncrementalReplanner(planner) if use_incremental(replan_mode, planner) else None
+        if hasattr(planner, "update"):
+            environment.add_listener(planner.update)  # Obstacles placed mid-run rebuild its abstraction
+        # Vertex / swap / teleport checks on every frame's positions
+        self.validator = Validator([robot.id for robot in robots], environment.grid_width,
+                                   environment.grid_height, self.positions()) if validate else None
 
     def step(self, get_goal_fn, release_goal_fn):
         self.frame += 1
+        profiler.frame_start(self.frame)
+        self.planner.reservation_table.advance(self.frame)
+        profiler.lap("step.advance")
+        needs_task = []
 
         for robot in self.robots:
             if robot.state.name == "MOVING" and 0 <= robot.step_index < len(robot.path):
@@ -25,13 +45,13 @@ class World:
                 blocked = False
 
                 # Check for reservation conflicts
-                reserved_by_other = self.planner.reservation_table.cell_reservations.get(next_pos, {}).get(self.frame)
+                reserved_by_other = self.planner.reservation_table.get_owner(next_pos[0], next_pos[1], self.frame)
                 if reserved_by_other is not None and reserved_by_other != robot.id:
-                    robot.log_event("BLOCKED", f"Cell {next_pos} at frame {self.frame} reserved by Robot {reserved_by_other}")
+                    robot.log_event(events.BLOCKED_CELL, self.frame, current_pos, next_pos, other=reserved_by_other)
                     blocked = True
 
                 if self.planner.reservation_table.is_edge_reserved(current_pos, next_pos, self.frame):
-                    robot.log_event("BLOCKED", f"Edge conflict: {current_pos} → {next_pos} at frame {self.frame}")
+                    robot.log_event(events.BLOCKED_EDGE, self.frame, current_pos, next_pos)
                     blocked = True
 
                 if blocked:
@@ -39,22 +59,19 @@ class World:
                         action = self.conflict_resolver.resolve(robot.id, self.frame)
 
                         if action == ResolutionAction.REPLAN:
-                            new_start = robot.current_position()
-                            new_goal = self.task_manager.get_goal(new_start)
-                            new_path = self.planner.plan_and_reserve(new_start, new_goal, robot_id=robot.id)
-
+                            route = robot.path[robot.step_index:]
+                            new_path = replan_blocked(self.planner, robot.id, current_pos, robot.end, route,
+                                                      replanner=self.replanner, blocked=[next_pos])
+                            robot.adopt_route(new_path or route)
                             if new_path:
-                                robot.path = new_path
-                                robot.step_index = 0
-                                robot.end = new_goal
                                 self.conflict_resolver.reset(robot.id)
-                                robot.log_event("RESOLVE", "Replanned path.")
+                                robot.log_event(events.REPLANNED, self.frame, current_pos)
                             else:
-                                robot.log_event("RESOLVE", "Replan failed, waiting.")
+                                robot.log_event(events.REPLAN_FAILED, self.frame, current_pos)
 
                         elif action == ResolutionAction.IDLE:
                             robot.state = robot.state.IDLE
-                            robot.log_event("RESOLVE", "Idled due to conflict.")
+                            robot.log_event(events.IDLED, self.frame, current_pos)
                         # WAIT: no-op
 
                     continue  # Skip this robot’s move/reservation
@@ -74,13 +91,48 @@ class World:
             robot.update(
                 frame=self.frame,
                 get_goal_fn=get_goal_fn,
-                release_goal_fn=release_goal_fn
+                release_goal_fn=release_goal_fn,
+                defer_reassign=True
+            )
+            if robot.needs_reassignment():
+                needs_task.append(robot)
+
+        profiler.lap("step.movement")  # Checks, conflict handling and moves are interleaved here
+
+        # Robots that finished this frame are planned together
+        assign_fn = None
+        if self.task_manager and self.task_manager.batch:
+            assign_fn = lambda starts: self.task_manager.get_goals(starts, frame=self.frame)
+        reassign_batch(needs_task, self.planner, get_goal_fn, release_goal_fn, assign_fn=assign_fn)
+        profiler.lap("step.reassignment")
+
+        # Windowed mode: periodically re-plan every active robot (RHCR)
+        if self.replan_interval and self.frame % self.replan_interval == 0:
+            replan_batch(
+                [r for r in self.robots if r.state.name == "MOVING" and r.step_index < len(r.path)],
+                self.planner
             )
+            profiler.lap("step.replan")
+
+        if self.validator is not None:
+            self.validator.check(self.frame, self.positions())
+            profiler.lap("step.validate")
+        profiler.frame_end(self.frame)
+
+    def positions(self):
+        """(N, 2) array of current robot cells, in robot order."""
+        return np.array([robot.current_position() for robot in self.robots]).reshape(-1, 2)
+
+    def states(self):
+        """(N,) int8 array of robot state codes (``STATE_CODES``), in robot order."""
+        return np.array([STATE_CODES[robot.state] for robot in self.robots], dtype=np.int8)
 
     def get_summary(self):
         return {
             "frame": self.frame,
             "completed_tasks": {
                 robot.id: robot.completed_tasks for robot in self.robots
-            }
+            },
+            "live_reservations": self.planner.reservation_table.live_reservations,
+            "violations": self.validator.summary() if self.validator is not None else None
         }
\ No newline at end of file
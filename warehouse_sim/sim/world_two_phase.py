@@ -1,19 +1,38 @@
 # warehouse_sim/sim/world_two_phase.py
 
 from collections import defaultdict
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.agents.robot import STATE_CODES, reassign_batch, replan_batch, replan_blocked
 from warehouse_sim.core.conflict_resolver import ConflictResolver, ResolutionAction
+from warehouse_sim.core.planner.incremental import IncrementalReplanner, use_incremental
+from warehouse_sim.sim.validator import Validator
+from warehouse_sim.utils import logger as events
+from warehouse_sim.utils.debug import profiler
 
 class World:
-    def __init__(self, environment, planner, robots, conflict_resolver=None, task_manager=None):
+    def __init__(self, environment, planner, robots, conflict_resolver=None, task_manager=None,
+                 replan_interval=None, validate=True, replan_mode=config.REPLAN_MODE):
         self.environment = environment
         self.planner = planner
         self.robots = robots
         self.frame = 0
         self.conflict_resolver = conflict_resolver
         self.task_manager = task_manager
+        self.replan_interval = replan_interval
+        # Kept per-robot searches for the REPLAN conflict action
+        self.replanner = IncrementalReplanner(planner) if use_incremental(replan_mode, planner) else None
+        if hasattr(planner, "update"):
+            environment.add_listener(planner.update)  # Obstacles placed mid-run rebuild its abstraction
+        # Vertex / swap / teleport checks on every frame's positions
+        self.validator = Validator([robot.id for robot in robots], environment.grid_width,
+                                   environment.grid_height, self.positions()) if validate else None
 
     def step(self, get_goal_fn, release_goal_fn):
         self.frame += 1
+        profiler.frame_start(self.frame)
+        self.planner.reservation_table.advance(self.frame)
+        profiler.lap("step.advance")
 
         intents = {}            # robot_id -> next_pos
         conflicts = defaultdict(list)  # next_pos -> list of robot_ids
@@ -26,6 +45,8 @@ class World:
                 intents[robot.id] = next_pos
                 conflicts[next_pos].append(robot.id)
 
+        profiler.lap("step.intents")
+
         # --- Phase 2: Resolve Conflicts ---
         for pos, robot_ids in conflicts.items():
             if len(robot_ids) == 1:
@@ -36,22 +57,25 @@ class World:
                 for loser in robot_ids:
                     if loser != winner:
                         loser_robot = self.robots[loser]
-                        loser_robot.log_event("BLOCKED", f"Conflict at {pos}, blocked by Robot {winner}")
+                        loser_robot.log_event(events.BLOCKED_ROBOT, self.frame, loser_robot.current_position(), pos, other=winner)
                         if self.conflict_resolver:
                             action = self.conflict_resolver.resolve(loser_robot.id, self.frame)
                             if action == ResolutionAction.REPLAN:
                                 new_start = loser_robot.current_position()
-                                new_goal = self.task_manager.get_goal(new_start)
-                                new_path = self.planner.plan_and_reserve(new_start, new_goal, robot_id=loser_robot.id)
+                                route = loser_robot.path[loser_robot.step_index:]
+                                new_path = replan_blocked(self.planner, loser_robot.id, new_start, loser_robot.end,
+                                                          route, replanner=self.replanner, blocked=[pos])
+                                loser_robot.adopt_route(new_path or route)
                                 if new_path:
-                                    loser_robot.path = new_path
-                                    loser_robot.step_index = 0
-                                    loser_robot.end = new_goal
                                     self.conflict_resolver.reset(loser_robot.id)
-                                    loser_robot.log_event("RESOLVE", "Replanned path.")
+                                    loser_robot.log_event(events.REPLANNED, self.frame, new_start)
+                                else:
+                                    loser_robot.log_event(events.REPLAN_FAILED, self.frame, new_start)
                             elif action == ResolutionAction.IDLE:
                                 loser_robot.state = loser_robot.state.IDLE
-                                loser_robot.log_event("RESOLVE", "Idled due to conflict.")
+                                loser_robot.log_event(events.IDLED, self.frame, loser_robot.current_position())
+
+        profiler.lap("step.conflicts")
 
         # --- Phase 3: Move Approved Robots ---
         for robot in self.robots:
@@ -67,17 +91,17 @@ class World:
             # Prevent teleportation
             dx, dy = abs(next_pos[0] - current_pos[0]), abs(next_pos[1] - current_pos[1])
             if dx > 1 or dy > 1:
-                robot.log_event("JUMP DETECTED", f"From {current_pos} to {next_pos} at frame {self.frame}")
+                robot.log_event(events.JUMP, self.frame, current_pos, next_pos)
                 continue
 
             # Final reservation checks
-            reserved_by_other = self.planner.reservation_table.cell_reservations.get(next_pos, {}).get(self.frame)
+            reserved_by_other = self.planner.reservation_table.get_owner(next_pos[0], next_pos[1], self.frame)
             if reserved_by_other is not None and reserved_by_other != robot.id:
-                robot.log_event("BLOCKED", f"Final check failed: Cell {next_pos} reserved by Robot {reserved_by_other}")
+                robot.log_event(events.BLOCKED_CELL, self.frame, current_pos, next_pos, other=reserved_by_other)
                 continue
 
             if self.planner.reservation_table.is_edge_reserved(current_pos, next_pos, self.frame):
-                robot.log_event("BLOCKED", f"Final check failed: Edge {current_pos}->{next_pos} reserved")
+                robot.log_event(events.BLOCKED_EDGE, self.frame, current_pos, next_pos)
                 continue
 
             # Reserve and move
@@ -97,20 +121,55 @@ class World:
                 robot.state = robot.state.IDLE
                 robot.waiting_for_reassignment = True
 
-            robot.log_event("MOVE", f"Moved to {next_pos} at frame {self.frame}")
+            robot.log_event(events.MOVE, self.frame, current_pos, next_pos)
 
-        # --- Phase 4: Update robots (including IDLE state reassignments) ---
+        profiler.lap("step.movement")
+
+        # --- Phase 4: Update robots, then plan new tasks as one batch ---
+        needs_task = []
         for robot in self.robots:
             robot.update(
                 frame=self.frame,
                 get_goal_fn=get_goal_fn,
-                release_goal_fn=release_goal_fn
+                release_goal_fn=release_goal_fn,
+                defer_reassign=True
+            )
+            if robot.needs_reassignment():
+                needs_task.append(robot)
+
+        assign_fn = None
+        if self.task_manager and self.task_manager.batch:
+            assign_fn = lambda starts: self.task_manager.get_goals(starts, frame=self.frame)
+        reassign_batch(needs_task, self.planner, get_goal_fn, release_goal_fn, assign_fn=assign_fn)
+        profiler.lap("step.reassignment")
+
+        # Windowed mode: periodically re-plan every active robot (RHCR)
+        if self.replan_interval and self.frame % self.replan_interval == 0:
+            replan_batch(
+                [r for r in self.robots if r.state.name == "MOVING" and r.step_index < len(r.path)],
+                self.planner
             )
+            profiler.lap("step.replan")
+
+        if self.validator is not None:
+            self.validator.check(self.frame, self.positions())
+            profiler.lap("step.validate")
+        profiler.frame_end(self.frame)
+
+    def positions(self):
+        """(N, 2) array of current robot cells, in robot order."""
+        return np.array([robot.current_position() for robot in self.robots]).reshape(-1, 2)
+
+    def states(self):
+        """(N,) int8 array of robot state codes (``STATE_CODES``), in robot order."""
+        return np.array([STATE_CODES[robot.state] for robot in self.robots], dtype=np.int8)
 
     def get_summary(self):
         return {
             "frame": self.frame,
             "completed_tasks": {
                 robot.id: robot.completed_tasks for robot in self.robots
-            }
+            },
+            "live_reservations": self.planner.reservation_table.live_reservations,
+            "violations": self.validator.summary() if self.validator is not None else None
         }
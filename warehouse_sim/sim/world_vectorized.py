@@ -0,0 +1,276 @@
+# warehouse_sim/sim/world_vectorized.py
+"""
+Struct-of-arrays world stepper for large fleets.
+
+Positions, path cursors, states and goals are NumPy arrays and all paths live
+in one packed ragged array (``path_cells`` sliced by ``path_offset`` /
+``path_len``). Each frame proposes every robot's next cell at once, checks the
+reservation table in bulk and resolves vertex and swap conflicts between
+robots with array ops; Python only loops over the robots that need a planner
+call. The ``Robot`` objects passed in seed the arrays and are not updated
+afterwards; use ``positions()`` and ``get_summary()`` to read the state.
+"""
+
+import numpy as np
+from warehouse_sim import config
+from warehouse_sim.agents.robot import replan_blocked
+from warehouse_sim.core.conflict_resolver import ResolutionAction
+from warehouse_sim.core.planner.incremental import IncrementalReplanner, use_incremental
+from warehouse_sim.sim.validator import Validator
+from warehouse_sim.utils import logger as events
+from warehouse_sim.utils.debug import profiler
+
+IDLE = 0    # Same codes as agents.robot.STATE_CODES
+MOVING = 1
+
+
+class World:
+    def __init__(self, environment, planner, robots, conflict_resolver=None, task_manager=None,
+                 replan_interval=None, validate=True, replan_mode=config.REPLAN_MODE):
+        self.environment = environment
+        self.planner = planner
+        self.robots = robots
+        self.frame = 0
+        self.conflict_resolver = conflict_resolver
+        self.task_manager = task_manager
+        self.replan_interval = replan_interval
+        # Kept per-robot searches for the REPLAN conflict action
+        self.replanner = IncrementalReplanner(planner) if use_incremental(replan_mode, planner) else None
+        if hasattr(planner, "update"):
+            environment.add_listener(planner.update)  # Obstacles placed mid-run rebuild its abstraction
+
+        n = len(robots)
+        self.ids = np.array([robot.id for robot in robots], dtype=np.int64)
+        self.pos = np.array([robot.current_position() for robot in robots], dtype=np.int64).reshape(n, 2)
+        self.goal = np.array([robot.end for robot in robots], dtype=np.int64).reshape(n, 2)
+        self.state = np.array([MOVING if robot.state.name == "MOVING" else IDLE for robot in robots], dtype=np.int8)
+        self.needs_task = np.array([robot.waiting_for_reassignment for robot in robots], dtype=bool)
+        self.completed = np.array([robot.completed_tasks for robot in robots], dtype=np.int64)
+
+        # Packed ragged paths; stale slices are dropped by _compact
+        self.path_cells = np.zeros((max(64, 4 * n), 2), dtype=np.int64)
+        self.path_offset = np.zeros(n, dtype=np.int64)
+        self.path_len = np.zeros(n, dtype=np.int64)
+        self.cursor = np.zeros(n, dtype=np.int64)
+        self._tail = 0
+        # Cell -> robot index scratch for _resolve_conflicts; -1 between frames
+        self._occupant = np.full(environment.grid_width * environment.grid_height, -1, dtype=np.int64)
+        self._store_paths(np.arange(n), [robot.path[robot.step_index:] or [robot.current_position()]
+                                         for robot in robots])
+        self.validator = Validator(self.ids, environment.grid_width, environment.grid_height,
+                                   self.pos) if validate else None
+
+    # --- Packed path storage ---
+
+    def _store_paths(self, indices, paths):
+        """Point robots ``indices`` at ``paths`` (cursor reset to 0)."""
+        if not len(indices):
+            return
+        lengths = np.array([len(path) for path in paths], dtype=np.int64)
+        needed = int(lengths.sum())
+        if self._tail + needed > len(self.path_cells):
+            self._compact(needed)
+        cells = np.array([cell for path in paths for cell in path], dtype=np.int64).reshape(-1, 2)
+        self.path_cells[self._tail:self._tail + needed] = cells
+        self.path_offset[indices] = self._tail + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        self.path_len[indices] = lengths
+        self.cursor[indices] = 0
+        self._tail += needed
+
+    def _compact(self, extra):
+        """Copy the unfinished part of every live path to a fresh buffer."""
+        remaining = self.path_len - self.cursor
+        live = int(remaining.sum())
+        capacity = max(len(self.path_cells), 2 * (live + extra))
+        starts = self.path_offset + self.cursor
+        index = np.repeat(starts - np.concatenate(([0], np.cumsum(remaining)[:-1])), remaining) \
+            + np.arange(live)
+        cells = np.zeros((capacity, 2), dtype=np.int64)
+        cells[:live] = self.path_cells[index]
+        self.path_cells = cells
+        self.path_offset = np.concatenate(([0], np.cumsum(remaining)[:-1]))
+        self.path_len = remaining
+        self.cursor = np.zeros_like(self.cursor)
+        self._tail = live
+
+    def _next_cells(self):
+        step = np.minimum(self.cursor + 1, self.path_len - 1)
+        return self.path_cells[self.path_offset + step]
+
+    # --- Frame update ---
+
+    def step(self, get_goal_fn, release_goal_fn):
+        self.frame += 1
+        profiler.frame_start(self.frame)
+        table = self.planner.reservation_table
+        table.advance(self.frame)
+        profiler.lap("step.advance")
+
+        active = (self.state == MOVING) & (self.cursor + 1 < self.path_len)
+        target = np.where(active[:, None], self._next_cells(), self.pos)
+        profiler.lap("step.intents")
+
+        # Reservation checks for every mover at once
+        owners = table.owners_at(target[:, 0], target[:, 1], self.frame)
+        blocked_cell = active & (owners >= 0) & (owners != self.ids)
+        blocked_edge = active & ~blocked_cell & table.edges_reserved(self.pos, target, self.frame)
+        blocked = blocked_cell | blocked_edge
+        moving = self._resolve_conflicts(active & ~blocked, target)
+        lost = active & ~blocked & ~moving
+        blocked |= lost
+        profiler.lap("step.conflicts")
+
+        log = events.event_log
+        for code, mask in ((events.BLOCKED_CELL, blocked_cell), (events.BLOCKED_EDGE, blocked_edge),
+                           (events.BLOCKED_ROBOT, lost), (events.MOVE, moving)):
+            if mask.any():
+                log.record_batch(self.frame, self.ids[mask], code, self.pos[mask], target[mask])
+
+        self.pos[moving] = target[moving]
+        self.cursor[moving] += 1
+        if self.conflict_resolver:
+            # Only robots the resolver is tracking (blocked since they last moved) can need a reset
+            tracked = self.conflict_resolver.robot_state
+            if tracked:
+                ids = np.fromiter(tracked, dtype=np.int64, count=len(tracked))
+                for robot_id in ids[np.isin(ids, self.ids[moving])].tolist():
+                    self.conflict_resolver.reset(robot_id)
+            self._handle_blocked(np.flatnonzero(blocked), target)
+
+        arrived = (self.state == MOVING) & (self.cursor + 1 >= self.path_len)
+        self.state[arrived] = IDLE
+        self.needs_task |= arrived
+        profiler.lap("step.movement")
+
+        # Robots that finished this frame are planned together
+        self._reassign(np.flatnonzero(self.needs_task & (self.state == IDLE)), get_goal_fn, release_goal_fn)
+        profiler.lap("step.reassignment")
+
+        # Windowed mode: periodically re-plan every active robot (RHCR)
+        if self.replan_interval and self.frame % self.replan_interval == 0:
+            self._replan(np.flatnonzero((self.state == MOVING) & (self.cursor + 1 < self.path_len)))
+            profiler.lap("step.replan")
+
+        if self.validator is not None:
+            self.validator.check(self.frame, self.pos)
+            profiler.lap("step.validate")
+        profiler.frame_end(self.frame)
+
+    def _resolve_conflicts(self, moving, target):
+        """
+        Drop movers that would share a cell with another robot or swap places
+        with one. Robots that stay put keep their cell; among movers heading to
+        the same cell the lowest id wins. Repeats until no conflicts remain,
+        since every dropped mover becomes an obstacle for the others.
+        """
+        height = self.environment.grid_height
+        here = self.pos[:, 0] * height + self.pos[:, 1]
+        there = target[:, 0] * height + target[:, 1]
+        occupant = self._occupant
+        occupant[here] = np.arange(len(here))
+        other = occupant[there]  # Robot standing on each target cell
+        occupant[here] = -1  # Reset only the cells written this frame
+        standing = other >= 0
+        other = np.maximum(other, 0)
+
+        while True:
+            entering = moving & (there != here)  # Wait steps hold their cell like stayers
+            final = np.where(moving, there, here)
+            order = np.lexsort((self.ids, entering, final))  # Stayers sort first within a cell
+            sorted_cells = final[order]
+            duplicate = np.zeros(len(order), dtype=bool)
+            duplicate[1:] = sorted_cells[1:] == sorted_cells[:-1]
+            losers = np.zeros(len(order), dtype=bool)
+            losers[order] = duplicate & entering[order]
+
+            swap = entering & standing & entering[other] & (there[other] == here)
+
+            dropped = losers | swap
+            if not dropped.any():
+                return moving
+            moving = moving & ~dropped
+
+    def _handle_blocked(self, blocked, target):
+        for i in blocked.tolist():
+            robot_id = int(self.ids[i])
+            action = self.conflict_resolver.resolve(robot_id, self.frame)
+            if action == ResolutionAction.REPLAN:
+                start = tuple(self.pos[i].tolist())
+                first = self.path_offset[i] + self.cursor[i]
+                route = [tuple(cell) for cell in self.path_cells[first:self.path_offset[i] + self.path_len[i]].tolist()]
+                new_path = replan_blocked(self.planner, robot_id, start, tuple(self.goal[i].tolist()), route,
+                                          replanner=self.replanner, blocked=[tuple(target[i].tolist())])
+                self._store_paths(np.array([i]), [new_path or route])
+                if new_path:
+                    self.conflict_resolver.reset(robot_id)
+                    events.event_log.record(self.frame, robot_id, events.REPLANNED, start)
+                else:
+                    events.event_log.record(self.frame, robot_id, events.REPLAN_FAILED, start)
+            elif action == ResolutionAction.IDLE:
+                self.state[i] = IDLE
+                events.event_log.record(self.frame, robot_id, events.IDLED, tuple(self.pos[i].tolist()))
+
+    def _reassign(self, indices, get_goal_fn, release_goal_fn):
+        if not len(indices):
+            return
+        for i in indices.tolist():
+            release_goal_fn(tuple(self.goal[i].tolist()))
+        starts = [tuple(cell) for cell in self.pos[indices].tolist()]
+        if self.task_manager and self.task_manager.batch:
+            goals = self.task_manager.get_goals(starts, frame=self.frame)
+        else:
+            goals = [get_goal_fn(start) for start in starts]
+        requests = [(int(self.ids[i]), start, goal) for i, start, goal in zip(indices.tolist(), starts, goals)]
+
+        paths = self.planner.plan_batch_and_reserve(requests)
+        done, new_paths = [], []
+        for i, (robot_id, _, goal) in zip(indices.tolist(), requests):
+            self.goal[i] = goal  # Kept on failure so the next frame releases it and retries
+            path = paths.get(robot_id)
+            if path:
+                done.append(i)
+                new_paths.append(path)
+        done = np.array(done, dtype=np.int64)
+        self._store_paths(done, new_paths)
+        self.state[done] = MOVING
+        self.needs_task[done] = False
+        self.completed[done] += 1
+
+    def _replan(self, indices):
+        if not len(indices):
+            return
+        table = self.planner.reservation_table
+        now = table.now
+        requests = []
+        for i in indices.tolist():
+            table.release_robot(int(self.ids[i]), now)
+            requests.append((int(self.ids[i]), tuple(self.pos[i].tolist()), tuple(self.goal[i].tolist())))
+
+        paths = self.planner.plan_batch_and_reserve(requests)
+        new_paths = []
+        for i, (robot_id, _, _) in zip(indices.tolist(), requests):
+            path = paths.get(robot_id)
+            if not path:
+                start = self.path_offset[i] + self.cursor[i]
+                path = [tuple(cell) for cell in self.path_cells[start:self.path_offset[i] + self.path_len[i]].tolist()]
+                self.planner.reserve_plan(path, robot_id=robot_id, t0=now)
+            new_paths.append(path)
+        self._store_paths(indices, new_paths)
+
+    # --- Read-out ---
+
+    def positions(self):
+        """(N, 2) array of current robot cells, in robot order."""
+        return self.pos.copy()
+
+    def states(self):
+        """(N,) int8 array of robot state codes, in robot order."""
+        return self.state.copy()
+
+    def get_summary(self):
+        return {
+            "frame": self.frame,
+            "completed_tasks": dict(zip(self.ids.tolist(), self.completed.tolist())),
+            "live_reservations": self.planner.reservation_table.live_reservations,
+            "violations": self.validator.summary() if self.validator is not None else None
+        }
@@ -1,12 +1,218 @@
 """
 Optional utilities for printing, plotting, and profiling.
+
+Instrumentation goes through the module-level ``profiler``. It is off by
+default, and every hook then costs at most an attribute check:
+
+    from warehouse_sim.utils.debug import profiler
+    profiler.configure(enabled=True, capture_frames=(100, 120), cprofile=True)
+    table = profiler.wrap_table(table)   # count reservation lookups
+    ...run...
+    profiler.dump("logs/profile.json")
 """
 
+import cProfile
+import functools
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Reservation table methods counted by wrap_table
+_LOOKUPS = (
+    "is_reserved", "is_edge_reserved", "get_owner", "reserved_times",
+    "first_conflict", "owners_at", "edges_reserved",
+)
+
+
 def print_grid(grid):
     pass
 
 def plot_occupancy(grid):
     pass
 
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _CountingTable:
+    """Forwards to a reservation table, counting the lookup calls."""
+
+    def __init__(self, table, profiler):
+        self.table = table
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        if name == "table":
+            raise AttributeError(name)
+        attr = getattr(self.table, name)
+        if name not in _LOOKUPS:
+            return attr
+        counters = self._profiler.counters
+        key = f"reservation.{name}"
+
+        def counted(*args, **kwargs):
+            counters[key] += 1
+            return attr(*args, **kwargs)
+        return counted
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.capture_frames = None
+        self.use_cprofile = False
+        self.use_tracemalloc = False
+        self.reset()
+
+    def configure(self, enabled=True, capture_frames=None, cprofile=False, tracemalloc=False):
+        """
+        Args:
+            enabled (bool): Collect phase timers and counters.
+            capture_frames (tuple, optional): ``(first, last)`` frames to run
+                cProfile / tracemalloc over (inclusive).
+            cprofile (bool): Capture a cProfile report over ``capture_frames``.
+            tracemalloc (bool): Capture allocation statistics over ``capture_frames``.
+        """
+        self.enabled = enabled
+        self.capture_frames = capture_frames
+        self.use_cprofile = cprofile
+        self.use_tracemalloc = tracemalloc
+        self.reset()
+
+    def reset(self):
+        self.timers = defaultdict(float)   # phase -> seconds
+        self.calls = defaultdict(int)      # phase -> number of timed sections
+        self.counters = defaultdict(int)
+        self.frames = 0
+        self._frame_started = 0.0
+        self._lap_started = 0.0
+        self._cprofile = None
+        self.cprofile_report = None
+        self.tracemalloc_report = None
+
+    # --- Timers and counters ---
+
+    def phase(self, name):
+        """Context manager timing one section; a shared no-op when disabled."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        self.timers[name] += seconds
+        self.calls[name] += 1
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def wrap_table(self, table):
+        """Return ``table`` wrapped to count lookups, or unchanged when disabled."""
+        return _CountingTable(table, self) if self.enabled else table
+
+    # --- Frame hooks (called by World.step) ---
+
+    def frame_start(self, frame):
+        if not self.enabled:
+            return
+        self.frames += 1
+        self._frame_started = self._lap_started = time.perf_counter()
+        if self.capture_frames and frame == self.capture_frames[0]:
+            if self.use_cprofile:
+                self._cprofile = cProfile.Profile()
+                self._cprofile.enable()
+            if self.use_tracemalloc:
+                tracemalloc.start()
+
+    def lap(self, name):
+        """Charge the time since the previous lap (or frame start) to phase ``name``."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.add_time(name, now - self._lap_started)
+        self._lap_started = now
+
+    def frame_end(self, frame):
+        if not self.enabled:
+            return
+        self.add_time("step", time.perf_counter() - self._frame_started)
+        if not self.capture_frames or frame != self.capture_frames[1]:
+            return
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            out = io.StringIO()
+            pstats.Stats(self._cprofile, stream=out).sort_stats("cumulative").print_stats(30)
+            self.cprofile_report = out.getvalue()
+            self._cprofile = None
+        if self.use_tracemalloc and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.tracemalloc_report = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [str(stat) for stat in snapshot.statistics("lineno")[:20]],
+            }
+
+    # --- Output ---
+
+    def report(self):
+        return {
+            "frames": self.frames,
+            "phases": {
+                name: {
+                    "calls": self.calls[name],
+                    "total_s": round(total, 6),
+                    "mean_ms": round(total / self.calls[name] * 1000.0, 4),
+                }
+                for name, total in sorted(self.timers.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "cprofile": self.cprofile_report,
+            "tracemalloc": self.tracemalloc_report,
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+profiler = Profiler()
+
+
 def profile(func):
-    pass
+    """Time every call of ``func`` as a phase named after it (when enabled)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        with profiler.phase(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
@@ -1,9 +1,186 @@
 """
 Structured logger for robots and simulation events.
+
+Events are fixed-layout integer records ``(frame, robot, code, x, y, to_x,
+to_y, other)`` appended to a preallocated ring buffer; -1 marks an unused
+field. Events below the configured level are only counted. With a file
+attached, a full buffer is flushed in one write (``.jsonl`` or raw int32
+``.bin`` records, see ``read_events``); without one, the oldest records are
+overwritten.
 """
 
+import json
+import logging
+
+import numpy as np
+from warehouse_sim import config
+
+# Event codes
+MOVE = 0
+BLOCKED_CELL = 1    # Next cell reserved by another robot
+BLOCKED_EDGE = 2    # Move would swap with a reserved edge
+BLOCKED_ROBOT = 3   # Lost a same-frame conflict against another robot
+REPLANNED = 4
+REPLAN_FAILED = 5
+IDLED = 6
+JUMP = 7            # Non-adjacent step
+
+EVENT_NAMES = ["MOVE", "BLOCKED_CELL", "BLOCKED_EDGE", "BLOCKED_ROBOT",
+               "REPLANNED", "REPLAN_FAILED", "IDLED", "JUMP"]
+EVENT_LEVELS = [logging.DEBUG, logging.INFO, logging.INFO, logging.INFO,
+                logging.INFO, logging.INFO, logging.INFO, logging.WARNING]
+
+FIELDS = ("frame", "robot", "code", "x", "y", "to_x", "to_y", "other")
+NONE = -1
+
+
+class EventLog:
+    def __init__(self, capacity=config.EVENT_LOG_CAPACITY, level=logging.INFO, path=None):
+        """
+        Args:
+            capacity (int): Records held in memory before a flush / overwrite.
+            level (int): Minimum ``logging`` level recorded (MOVE is DEBUG).
+            path (str, optional): ``.jsonl`` or ``.bin`` file that full
+                buffers are flushed to (truncated on open).
+        """
+        self.path = None
+        self._file = None
+        self.reset(capacity, level, path)
+
+    def reset(self, capacity=config.EVENT_LOG_CAPACITY, level=logging.INFO, path=None):
+        """Close any open file, reallocate the buffer and clear the counters."""
+        self.close()
+        self.capacity = capacity
+        self.buffer = np.full((capacity, len(FIELDS)), NONE, dtype=np.int32)
+        self.head = 0       # Next slot to write
+        self.size = 0       # Valid records in the buffer
+        self.dropped = 0    # Records overwritten without a file attached
+        self.counts = [0] * len(EVENT_NAMES)
+        self.set_level(level)
+        self.path = None
+        if path:
+            self.open(path)
+
+    def set_level(self, level):
+        self.level = level
+        self.enabled = [event_level >= level for event_level in EVENT_LEVELS]
+
+    def open(self, path):
+        self.close()
+        self.path = path
+        self._file = open(path, "wb" if path.endswith(".bin") else "w")
+
+    # --- Recording ---
+
+    def record(self, frame, robot_id, code, cell=None, to_cell=None, other=None):
+        self.counts[code] += 1
+        if not self.enabled[code]:
+            return
+        if self.size == self.capacity:
+            self._make_room(1)
+        self.buffer[self.head] = (
+            frame, robot_id, code,
+            cell[0] if cell is not None else NONE, cell[1] if cell is not None else NONE,
+            to_cell[0] if to_cell is not None else NONE, to_cell[1] if to_cell is not None else NONE,
+            NONE if other is None else other,
+        )
+        self.head = (self.head + 1) % self.capacity
+        self.size += 1
+
+    def record_batch(self, frame, robot_ids, code, cells=None, to_cells=None):
+        """Append one event per robot from arrays (used by the vectorized world)."""
+        n = len(robot_ids)
+        self.counts[code] += n
+        if not self.enabled[code] or n == 0:
+            return
+        rows = np.full((n, len(FIELDS)), NONE, dtype=np.int32)
+        rows[:, 0] = frame
+        rows[:, 1] = robot_ids
+        rows[:, 2] = code
+        if cells is not None:
+            rows[:, 3:5] = cells
+        if to_cells is not None:
+            rows[:, 5:7] = to_cells
+        for start in range(0, n, self.capacity):
+            self._append_rows(rows[start:start + self.capacity])
+
+    def _append_rows(self, rows):
+        n = len(rows)
+        if self.size + n > self.capacity:
+            self._make_room(self.size + n - self.capacity)
+        slots = (self.head + np.arange(n)) % self.capacity
+        self.buffer[slots] = rows
+        self.head = (self.head + n) % self.capacity
+        self.size += n
+
+    def _make_room(self, needed):
+        if self._file is not None:
+            self.flush()
+        else:
+            self.size -= needed
+            self.dropped += needed
+
+    # --- Output ---
+
+    def records(self):
+        """Buffered records, oldest first, as an (n, 8) int32 array."""
+        start = (self.head - self.size) % self.capacity
+        return self.buffer[(start + np.arange(self.size)) % self.capacity]
+
+    def tail(self, n=50):
+        """The last ``n`` buffered events as dicts."""
+        return [_as_dict(row) for row in self.records()[-n:].tolist()]
+
+    def counters(self):
+        """Events seen per type, including those below the level."""
+        return {name: count for name, count in zip(EVENT_NAMES, self.counts) if count}
+
+    def flush(self):
+        if self._file is None or not self.size:
+            return
+        rows = self.records()
+        if self.path.endswith(".bin"):
+            rows.tofile(self._file)
+        else:
+            self._file.writelines(json.dumps(_as_dict(row)) + "\n" for row in rows.tolist())
+        self._file.flush()
+        self.size = 0
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def _as_dict(row):
+    frame, robot, code, x, y, to_x, to_y, other = row
+    return {
+        "frame": frame,
+        "robot": robot,
+        "event": EVENT_NAMES[code],
+        "cell": [x, y] if x != NONE else None,
+        "to": [to_x, to_y] if to_x != NONE else None,
+        "other": other if other != NONE else None,
+    }
+
+
+def read_events(path):
+    """Load a ``.bin`` event file back as an (n, 8) int32 array."""
+    return np.fromfile(path, dtype=np.int32).reshape(-1, len(FIELDS))
+
+
+event_log = EventLog()
+
+
 def get_robot_logger(robot_id):
-    pass
+    """Return ``log(frame, code, cell=None, to_cell=None, other=None)`` bound to one robot."""
+    def log(frame, code, cell=None, to_cell=None, other=None):
+        event_log.record(frame, robot_id, code, cell, to_cell, other)
+    return log
+
 
-def setup_global_logging():
-    pass
+def setup_global_logging(level=logging.INFO, path=None, capacity=config.EVENT_LOG_CAPACITY):
+    """Reset the shared event log with a new level, file and capacity."""
+    event_log.reset(capacity=capacity, level=level, path=path)
+    return event_log